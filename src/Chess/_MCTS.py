@@ -1,19 +1,64 @@
 import chess
 import random
 import math
+import time
+from functools import partial
 
 from Chess._Node import Node
+# Modules de Chess/final : chemin ajouté par Chess/__init__.py
+from transposition import SharedStatsMixin, stats_identity
+from rollout import Rollout
+from nodecache import COUNTERS as CACHE_COUNTERS
+
+
+class TranspositionNode(SharedStatsMixin, Node):
+    """Nœud dont visits/wins sont partagés avec les transpositions de sa position."""
+
+
+def random_rollout(board, rollout=None):
+    """
+    Joue de manière aléatoire depuis une copie de board jusqu'à la fin de la partie
+    (ou jusqu'à la troncature / l'adjudication prévue par `rollout`, un Rollout de Chess/final/rollout.py).
+    Retourne la récompense du point de vue des Blancs (1, -1 ou 0 ; entre -1 et 1 si tronquée).
+    """
+    board_copy = board.copy()
+    rollout = rollout or Rollout()
+    value, _ = rollout.play(board_copy)
+    if value is not None:
+        return 2 * value - 1
+    winner = rollout.winner(board_copy)
+    if winner is None:
+        return 0
+    return 1 if winner == chess.WHITE else -1
+
 
 class MCTS:
-    def __init__(self, simulations=1000):
+    def __init__(self, simulations=1000, transposition_table=None, rollout_pool=None, rollouts_per_leaf=1, batch_size=1,
+                 rollout=None):
+        """
+        :param simulations: nombre de simulations par coup
+        :param transposition_table: TranspositionTable (Chess/final/transposition.py) partagée par
+                                    les nœuds d'une même position, ou None
+        :param rollout_pool: RolloutPool (Chess/final/parallel.py) exécutant les simulations d'un lot
+        :param rollouts_per_leaf: nombre de simulations lancées depuis chaque feuille
+        :param batch_size: nombre de feuilles distinctes sélectionnées par lot (avec perte virtuelle)
+        :param rollout: Rollout (Chess/final/rollout.py) : profondeur maximale, évaluateur et adjudication
+                        des simulations (None : parties jouées jusqu'au bout)
+        """
         self.simulations = simulations
+        self.transpositions = transposition_table
+        self.rollout_pool = rollout_pool
+        self.rollouts_per_leaf = rollouts_per_leaf
+        self.batch_size = batch_size
+        self.rollout = rollout or Rollout()
+        self.stats = {}
 
     def selection(self, node):
         """
         Descend dans l'arbre tant que le nœud de départ n'est pas terminal
         et est entièrement développé.
         """
-        while (not node.board.is_game_over()) and node.is_fully_expanded():
+        while (not node.is_terminal()) and node.is_fully_expanded():
             node = node.best_child()
         return node
 
@@ -22,17 +67,21 @@ class MCTS:
         Si le nœud n'est pas terminal et non entièrement développé, ajoute
         un enfant correspondant à un coup non encore exploré.
         """
-        if node.board.is_game_over():
+        if node.is_terminal():
             return None
-        legal_moves = list(node.board.legal_moves)
-        random.shuffle(legal_moves)  # Pour varier les choix
-        for move in legal_moves:
-            if not any(child.move == move for child in node.children):
-                child = Node(node.board, parent=node, move=move)
-                child.board.push(move)
-                node.children.append(child)
-                return child
-        return None
+        # File des coups non explorés du nœud, mélangée une fois pour varier les choix
+        move = node.pop_untried_move()
+        if move is None:
+            return None
+        if self.transpositions is None:
+            # Même classe que le parent (Node ou VectorNode selon la racine fournie)
+            child = type(node)(node.board, parent=node, move=move)
+            child.board.push(move)
+        else:
+            child = TranspositionNode(node.board, parent=node, move=move)
+            child.board.push(move)
+            self.transpositions.attach(child, child.board)
+        return node.add_child(child)
 
     def simulation(self, node):
         """
@@ -42,41 +91,85 @@ class MCTS:
            -1  => victoire des Noirs,
             0  => match nul.
         """
-        board_copy = node.board.copy()
-        while not board_copy.is_game_over():
-            legal_moves = list(board_copy.legal_moves)
-            board_copy.push(random.choice(legal_moves))
-        outcome = board_copy.outcome()
-        if outcome.winner is None:
-            return 0
-        return 1 if outcome.winner == chess.WHITE else -1
-
-    def backpropagation(self, node, reward):
+        return random_rollout(node.board, self.rollout)
+
+    def backpropagation(self, node, reward, count=1):
         """
         Remonte dans l'arbre en mettant à jour le nombre de visites et le score.
         À chaque niveau, on inverse la récompense pour tenir compte de l'alternance.
+        `reward` peut être la somme de `count` simulations (rollouts par lots).
         """
+        # Avec transpositions, une entrée répétée sur le chemin n'est mise à jour qu'une fois
+        updated = set()
         while node is not None:
-            node.visits += 1
-            node.wins += reward
+            identity = stats_identity(node)
+            if identity not in updated:
+                updated.add(identity)
+                node.visits += count
+                node.wins += reward
             reward = -reward  # Inverse pour le parent
             node = node.parent
 
 
 
+    @staticmethod
+    def _virtual_loss(node, amount):
+        """
+        Perte virtuelle sur le chemin d'une simulation en attente : `amount` visites comptées
+        comme des défaites (-1) pour le joueur qui choisit chaque nœud, retirées (amount = -1)
+        juste avant la rétropropagation du vrai résultat.
+        """
+        while node is not None:
+            node.visits += amount
+            node.wins -= amount
+            node = node.parent
+
     def best_move(self, root):
         """
         Effectue un nombre fixé de simulations MCTS à partir de la racine et
         retourne le coup le plus visité ainsi que le nœud associé.
         """
-        for i in range(self.simulations):
-            if i % 100 == 0:
-                print(f"Simulation {i}/{self.simulations}")
-            leaf = self.selection(root)
-            child = self.expansion(leaf)
-            node_to_simulate = child if child is not None else leaf
-            reward = self.simulation(node_to_simulate)
-            self.backpropagation(node_to_simulate, reward)
+        self.stats = {"rollouts": 0, "rollout_seconds": 0.0}
+        self.rollout.reset()
+        cache_snapshot = CACHE_COUNTERS.snapshot()
+        rollout = partial(random_rollout, rollout=self.rollout)
+        i = 0
+        while i < self.simulations:
+            batch = []
+            for _ in range(min(self.batch_size, self.simulations - i)):
+                if i % 100 == 0:
+                    print(f"Simulation {i}/{self.simulations}")
+                leaf = self.selection(root)
+                child = self.expansion(leaf)
+                node_to_simulate = child if child is not None else leaf
+                if self.batch_size > 1:
+                    # Perte virtuelle : écarte les sélections suivantes du même chemin
+                    self._virtual_loss(node_to_simulate, 1)
+                batch.append(node_to_simulate)
+                i += 1
+
+            start = time.perf_counter()
+            boards = [node.board for node in batch]
+            if self.rollout_pool is not None:
+                rewards = self.rollout_pool.map(rollout, boards, self.rollouts_per_leaf)
+            else:
+                rewards = [[rollout(board) for _ in range(self.rollouts_per_leaf)] for board in boards]
+            self.stats["rollout_seconds"] += time.perf_counter() - start
+
+            for node_to_simulate, node_rewards in zip(batch, rewards):
+                if self.batch_size > 1:
+                    self._virtual_loss(node_to_simulate, -1)
+                self.backpropagation(node_to_simulate, sum(node_rewards), count=len(node_rewards))
+                self.stats["rollouts"] += len(node_rewards)
+        seconds = self.stats["rollout_seconds"]
+        self.stats["rollouts_per_sec"] = self.stats["rollouts"] / seconds if seconds > 0 else 0.0
+        # Longueur moyenne et troncatures : simulations faites dans ce processus (hors RolloutPool)
+        report = self.rollout.report()
+        self.stats["avg_rollout_length"] = report["avg_rollout_length"]
+        self.stats["cutoff_rate"] = report["cutoff_rate"]
+        self.stats["adjudication_rate"] = report["adjudication_rate"]
+        # Coups légaux et caractère terminal servis depuis le cache des nœuds (Chess/final/nodecache.py)
+        self.stats["node_cache"] = CACHE_COUNTERS.since(cache_snapshot)
 
         best_child = max(root.children, key=lambda c: c.visits, default=None)
         if best_child is not None:
@@ -2,7 +2,11 @@ import chess
 import random
 import math
 
-class Node:
+# Modules de Chess/final : chemin ajouté par Chess/__init__.py
+from selection import ArrayStatsMixin
+from nodecache import CachedStateMixin, ChildIndexMixin
+
+class Node(CachedStateMixin, ChildIndexMixin):
     def __init__(self, board, parent=None, move=None):
         self.board = board.copy()    # Copie de l'état de l'échiquier
         self.parent = parent         # Nœud parent
@@ -13,9 +17,8 @@ class Node:
 
     def is_fully_expanded(self):
         # Le nœud est entièrement développé si le nombre d'enfants correspond
-        # au nombre de coups légaux possibles.
-        legal_moves = list(self.board.legal_moves)
-        return len(self.children) == len(legal_moves)
+        # au nombre de coups légaux possibles (liste générée une seule fois par nœud).
+        return len(self.children) == len(self.legal_move_list())
 
     def best_child(self, exploration_weight=math.sqrt(2)):
         """Sélectionne le meilleur enfant en utilisant la formule UCB1."""
@@ -30,3 +33,15 @@ class Node:
                 best_val = ucb1_value
                 best = child
         return best
+
+
+class VectorNode(ArrayStatsMixin, Node):
+    """
+    Node dont les statistiques des enfants sont rangées dans des tableaux NumPy :
+    même formule UCB1 lissée, calculée pour tous les enfants en un seul appel.
+    """
+
+    formula = "ucb1-smoothed"
+
+    def best_child(self, exploration_weight=math.sqrt(2), formula=None):
+        return self.select_child(exploration_weight, formula)
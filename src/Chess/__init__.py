@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Les modules partagés de Chess/final s'importent entre eux à plat (from rollout import ...) :
+# leur dossier est ajouté au chemin une fois pour tout le paquet, avant le premier sous-module
+FINAL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "final")
+if FINAL_DIR not in sys.path:
+    sys.path.append(FINAL_DIR)
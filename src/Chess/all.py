@@ -1,8 +1,15 @@
 import chess
 import math
-import random
+import os
+import sys
 
-class Node:
+# Lancé comme script (python all.py), le paquet Chess n'ajoute pas Chess/final au chemin
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "final"))
+from selection import ArrayStatsMixin
+from rollout import Rollout
+from nodecache import CachedStateMixin, ChildIndexMixin, COUNTERS as CACHE_COUNTERS
+
+class Node(CachedStateMixin, ChildIndexMixin):
     def __init__(self, board, parent=None, move=None):
         self.board = board.copy()    # Copie de l'état de l'échiquier
         self.parent = parent         # Nœud parent
@@ -12,9 +19,8 @@ class Node:
         self.wins = 0                # Score total (récompenses cumulées)
 
     def is_fully_expanded(self):
-        """Vérifie si tous les coups légaux ont été explorés."""
-        legal_moves = list(self.board.legal_moves)
-        return len(self.children) == len(legal_moves)
+        """Vérifie si tous les coups légaux ont été explorés (liste générée une seule fois par nœud)."""
+        return len(self.children) == len(self.legal_move_list())
 
     def best_child(self, exploration_weight=math.sqrt(2)):
         """Sélectionne le meilleur enfant en utilisant la formule UCB1."""
@@ -31,9 +37,30 @@ class Node:
         return best
 
 
+class VectorNode(ArrayStatsMixin, Node):
+    """
+    Node dont la sélection UCB1 (même formule que Node.best_child) est calculée en un seul appel
+    vectorisé (tableaux NumPy). Pas plus rapide à une vingtaine d'enfants, voir selection.ChildStats.
+    """
+
+    formula = "ucb1-all"
+
+    def best_child(self, exploration_weight=math.sqrt(2), formula=None):
+        return self.select_child(exploration_weight, formula)
+
+
 class MCTSPlayer:
-    def __init__(self, iterations=1000):
+    def __init__(self, iterations=1000, node_class=Node, rollout=None):
+        """
+        :param iterations: nombre d'itérations MCTS par coup
+        :param node_class: Node, ou VectorNode pour la sélection vectorisée
+        :param rollout: Rollout (Chess/final/rollout.py) : profondeur maximale, évaluateur et adjudication
+                        des simulations (None : parties jouées jusqu'au bout)
+        """
         self.iterations = iterations
+        self.node_class = node_class
+        self.rollout = rollout or Rollout()
+        self.stats = {}
     
     def get_move(self, board):
         """Trouve le meilleur coup en utilisant MCTS."""
@@ -42,7 +69,9 @@ class MCTSPlayer:
         if not legal_moves:
             return None
             
-        root = Node(board)
+        root = self.node_class(board)
+        self.rollout.reset()
+        cache_snapshot = CACHE_COUNTERS.snapshot()
         
         # Effectuer les itérations MCTS
         for _ in range(self.iterations):
@@ -50,7 +79,7 @@ class MCTSPlayer:
             node = self.select(root)
             
             # Phase 2: Expansion
-            if not node.board.is_game_over():
+            if not node.is_terminal():
                 node = self.expand(node)
             
             # Phase 3: Simulation
@@ -58,6 +87,10 @@ class MCTSPlayer:
             
             # Phase 4: Propagation inverse
             self.backpropagate(node, reward)
+        # Longueur moyenne des simulations, simulations/s, part des simulations tronquées ou adjugées
+        self.stats = self.rollout.report()
+        # Coups légaux et caractère terminal servis depuis le cache des nœuds
+        self.stats["node_cache"] = CACHE_COUNTERS.since(cache_snapshot)
         
         # Sélectionner le coup avec le plus grand nombre de visites
         if not root.children:
@@ -74,7 +107,7 @@ class MCTSPlayer:
     
     def select(self, node):
         """Phase de sélection: traverse l'arbre pour trouver un nœud à développer."""
-        while not node.board.is_game_over() and node.is_fully_expanded():
+        while not node.is_terminal() and node.is_fully_expanded():
             if not node.children:
                 return node
             node = node.best_child()
@@ -82,43 +115,34 @@ class MCTSPlayer:
     
     def expand(self, node):
         """Phase d'expansion: ajoute un nouvel enfant au nœud."""
-        legal_moves = list(node.board.legal_moves)
-        
-        if not legal_moves or node.board.is_game_over():
+        if node.is_terminal():
             return node
             
-        # Trouver les coups inexplorés
-        explored_moves = [child.move for child in node.children]
-        unexplored_moves = [move for move in legal_moves if move not in explored_moves]
+        # Coup inexploré tiré de la file du nœud (mélangée une fois)
+        move = node.pop_untried_move()
         
-        if unexplored_moves:
-            move = random.choice(unexplored_moves)
-            new_board = node.board.copy()
-            new_board.push(move)
-            child = Node(new_board, parent=node, move=move)
-            node.children.append(child)
-            return child
+        if move is not None:
+            # Node copie déjà le plateau : on joue le coup sur sa copie
+            child = type(node)(node.board, parent=node, move=move)
+            child.board.push(move)
+            return node.add_child(child)
         
         return node
     
     def simulate(self, board):
-        """Phase de simulation: joue une partie aléatoire jusqu'à la fin."""
+        """Phase de simulation: joue une partie aléatoire jusqu'à la fin (ou jusqu'à la troncature de self.rollout)."""
         board_copy = board.copy()
+        value, _ = self.rollout.play(board_copy)
+        if value is not None:
+            # Simulation tronquée ou adjugée : valeur du point de vue des blancs, ramenée au joueur au trait
+            return value if board.turn == chess.WHITE else 1 - value
         
-        while not board_copy.is_game_over():
-            legal_moves = list(board_copy.legal_moves)
-            if not legal_moves:
-                break
-            move = random.choice(legal_moves)
-            board_copy.push(move)
-        
-        # Calculer la récompense
-        if board_copy.is_checkmate():
-            reward = 1 if board_copy.turn != board.turn else 0
-        elif board_copy.is_stalemate() or board_copy.is_insufficient_material() or board_copy.is_fifty_moves() or board_copy.is_repetition():
-            reward = 0.5
+        # Calculer la récompense (toute fin de partie autre que le mat est nulle)
+        winner = self.rollout.winner(board_copy)
+        if winner is not None:
+            reward = 1 if winner == board.turn else 0
         else:
-            reward = 0
+            reward = 0.5
         
         return reward
     
@@ -168,6 +192,8 @@ if __name__ == "__main__":
             move = mcts_player.get_move(board)
             if move:
                 print(f"MCTS joue: {move}")
+                print(f"Simulations : longueur moyenne {mcts_player.stats['avg_rollout_length']:.1f} demi-coups, "
+                      f"{mcts_player.stats['rollouts_per_sec']:.1f} simulations/s")
                 try:
                     board.push(move)
                 except AssertionError as e:
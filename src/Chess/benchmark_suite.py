@@ -0,0 +1,273 @@
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import chess
+
+try:
+    import resource
+except ImportError:     # Windows : pas de mesure de RSS
+    resource = None
+
+# Les variantes s'importent comme des modules du paquet Chess (src/ dans le chemin),
+# et les modules partagés de Chess/final à plat, comme dans ce dossier
+CHESS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(CHESS_DIR))
+sys.path.append(os.path.join(CHESS_DIR, "final"))
+from memory import node_bytes
+from profiling import SearchProfiler
+
+# Positions de référence (fixes : les résultats de deux commits restent comparables)
+POSITIONS = {
+    "start": chess.STARTING_FEN,
+    "italian": "r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3",
+    "kiwipete": "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "endgame": "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "mate-in-1": "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4",
+}
+
+PHASES = ("selection", "expansion", "simulation", "backpropagation")
+
+
+def _phase_split(profiler, total):
+    """
+    Part de chaque phase dans la durée totale (le reste va dans "other").
+    """
+    split = {name: {"seconds": values["seconds"], "share": values["seconds"] / total if total > 0 else 0.0}
+             for name, values in profiler.report()["phases"].items()}
+    other = max(total - sum(values["seconds"] for values in split.values()), 0.0)
+    split["other"] = {"seconds": other, "share": other / total if total > 0 else 0.0}
+    return split
+
+
+# Variantes : chacune prépare une recherche sur board et renvoie deux fonctions,
+# la recherche (qui renvoie le coup choisi) et la racine de l'arbre après la recherche
+
+FOUR_PHASES = {"selection": "selection", "expansion": "expansion",
+               "simulation": "simulation", "backpropagation": "backpropagation"}
+
+
+def _setup_mcts(board, iterations, profiler):
+    # Chess/_MCTS.py (avec Chess/_Node.py), tel qu'utilisé par Chess/main.py
+    variant = importlib.import_module("Chess._MCTS")
+    node_module = importlib.import_module("Chess._Node")
+    mcts = variant.MCTS(simulations=iterations)
+    profiler.instrument(mcts, {"selection": "selection", "expansion": "expansion",
+                            "backpropagation": "backpropagation"})
+    # best_move lance les simulations par random_rollout, sans passer par la méthode simulation
+    profiler.instrument(variant, {"simulation": "random_rollout"})
+    root = node_module.Node(board)
+    return lambda: mcts.best_move(root)[0], lambda: root
+
+
+def _setup_final(board, iterations, profiler):
+    # Chess/final/mcts.py, réglages par défaut : la recherche est celle de core.MCTSCore, dont seule
+    # la simulation est une méthode (voir _setup_core)
+    variant = importlib.import_module("mcts")
+    mcts = variant.MCTS(board, color_player=board.turn, iterations=iterations)
+    profiler.instrument(mcts.core.game, {"simulation": "rollout"})
+    return mcts.best_move, lambda: mcts.root
+
+
+def _setup_stockfish(board, iterations, profiler):
+    # Chess/stockfish/main.py, sur un MaterialBoard comme dans son main()
+    variant = importlib.import_module("Chess.stockfish.main")
+    mcts = variant.MCTS(variant.MaterialBoard.from_board(board))
+    profiler.instrument(mcts, FOUR_PHASES)
+    return lambda: mcts.get_best_move(simulations=iterations), lambda: mcts.root
+
+
+def _setup_all(board, iterations, profiler):
+    # Chess/all.py::MCTSPlayer : la racine est locale à get_move, on la retrouve à sa création
+    variant = importlib.import_module("Chess.all")
+    roots = []
+
+    class TrackedNode(variant.Node):
+        def __init__(self, board, parent=None, move=None):
+            super().__init__(board, parent, move)
+            if parent is None:
+                roots.append(self)
+
+    player = variant.MCTSPlayer(iterations=iterations, node_class=TrackedNode)
+    profiler.instrument(player, {"selection": "select", "expansion": "expand",
+                              "simulation": "simulate", "backpropagation": "backpropagate"})
+    return lambda: player.get_move(board), lambda: roots[-1]
+
+
+def _setup_test_vs_bot(board, iterations, profiler):
+    # Chess/test_vs_bot.py, sans statistiques d'ouverture
+    variant = importlib.import_module("Chess.test_vs_bot")
+    mcts = variant.MCTS(simulations=iterations)
+    profiler.instrument(mcts, FOUR_PHASES)
+    root = mcts.new_root(board)
+    return lambda: mcts.best_move(root)[0], lambda: root
+
+
+def _setup_core(board, iterations, profiler):
+    # Chess/final/core.py (MCTS commun à tous les jeux) avec l'adaptateur python-chess, et les
+    # mêmes simulations que final (parties complètes sur le chess.Board)
+    game = importlib.import_module("games").ChessGame(board, rollout=importlib.import_module("rollout").Rollout())
+    search = importlib.import_module("core").MCTSCore(game, iterations=iterations)
+    # Sélection, expansion et rétropropagation sont écrites dans la boucle : seule la simulation est une méthode
+    profiler.instrument(game, {"simulation": "rollout"})
+    return search.best_action, lambda: search.root
+
+
+VARIANTS = {
+    "_MCTS": _setup_mcts,
+    "final": _setup_final,
+    "core": _setup_core,
+    "stockfish": _setup_stockfish,
+    "all": _setup_all,
+    "test_vs_bot": _setup_test_vs_bot,
+}
+
+
+def _max_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kio sous Linux, octets sous macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _tree_nodes(root):
+    nodes = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        stack.extend(node.children)
+    return nodes
+
+
+def run_one(variant, position, iterations, seed):
+    """
+    Une recherche de `iterations` itérations d'une variante sur une position. Appelée dans un
+    processus neuf (voir run_suite) : le pic de RSS est alors celui de cette seule recherche.
+    """
+    random.seed(seed)
+    board = chess.Board(POSITIONS[position])
+    # Phases chronométrées en remplaçant les méthodes de la variante ; les primitives de
+    # python-chess ne le sont pas, pour ne pas ralentir la recherche mesurée
+    profiler = SearchProfiler(chess_primitives=False)
+    search, get_root = VARIANTS[variant](board, iterations, profiler)
+    rss_before = _max_rss_bytes()
+
+    # Les variantes affichent leur progression : on la fait taire pendant la mesure
+    with contextlib.redirect_stdout(io.StringIO()):
+        profiler.start()
+        move = search()
+        seconds = profiler.stop().seconds
+
+    rss_after = _max_rss_bytes()
+    nodes = _tree_nodes(get_root())
+    rollouts = profiler.phases.get("simulation", [0.0, 0])[1]
+    return {
+        "variant": variant,
+        "position": position,
+        "seed": seed,
+        "move": move.uci() if move is not None else None,
+        "iterations": iterations,
+        "seconds": seconds,
+        "iterations_per_sec": iterations / seconds if seconds > 0 else 0.0,
+        "rollouts": rollouts,
+        "rollouts_per_sec": rollouts / seconds if seconds > 0 else 0.0,
+        "nodes": len(nodes),
+        "nodes_per_sec": len(nodes) / seconds if seconds > 0 else 0.0,
+        "peak_rss_bytes": rss_after,
+        "rss_growth_bytes": rss_after - rss_before if rss_after is not None else None,
+        "bytes_per_node": sum(node_bytes(node) for node in nodes) / len(nodes),
+        "phases": _phase_split(profiler, seconds),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=CHESS_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(variants, positions, iterations, seeds):
+    """
+    Lance chaque (variante, position, graine) dans un processus neuf, l'un après l'autre.
+
+    :return: document JSON (métadonnées de l'exécution et résultats)
+    """
+    results = []
+    context = get_context("spawn")
+    for variant in variants:
+        for position in positions:
+            for seed in seeds:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    result = executor.submit(run_one, variant, position, iterations, seed).result()
+                results.append(result)
+                print(format_result(result), flush=True)
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "chess": chess.__version__,
+            "platform": platform.platform(),
+            "iterations": iterations,
+            "seeds": list(seeds),
+        },
+        "results": results,
+    }
+
+
+def format_result(result):
+    phases = ", ".join(f"{phase} {values['share']:.0%}" for phase, values in result["phases"].items())
+    rss = result["rss_growth_bytes"]
+    return (f"{result['variant']:12s} {result['position']:10s} : {result['iterations_per_sec']:7.1f} itérations/s, "
+            f"{result['rollouts_per_sec']:7.1f} simulations/s, {result['nodes_per_sec']:7.1f} nœuds/s, "
+            f"{result['bytes_per_node']:.0f} octets/nœud, RSS +{(rss or 0) / 2**20:.1f} Mo ({phases})")
+
+
+def compare(previous, current):
+    """
+    Rapport itérations/s (courant / précédent) pour chaque (variante, position, graine) des deux exécutions.
+    """
+    before = {(r["variant"], r["position"], r["seed"]): r for r in previous["results"]}
+    for result in current["results"]:
+        old = before.get((result["variant"], result["position"], result["seed"]))
+        if old is not None and old["iterations_per_sec"] > 0:
+            ratio = result["iterations_per_sec"] / old["iterations_per_sec"]
+            print(f"{result['variant']:12s} {result['position']:10s} : x{ratio:.2f} "
+                  f"({old['iterations_per_sec']:.1f} -> {result['iterations_per_sec']:.1f} itérations/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare les implémentations MCTS d'échecs sur des positions fixes.")
+    parser.add_argument("--variants", nargs="+", choices=sorted(VARIANTS), default=list(VARIANTS))
+    parser.add_argument("--positions", nargs="+", choices=sorted(POSITIONS), default=list(POSITIONS))
+    parser.add_argument("--iterations", type=int, default=100, help="itérations par recherche")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--output", default="benchmark_results.json", help="fichier JSON des résultats")
+    parser.add_argument("--compare", help="résultats JSON d'une exécution précédente (autre commit)")
+    args = parser.parse_args()
+
+    report = run_suite(args.variants, args.positions, args.iterations, args.seeds)
+    with open(args.output, "w") as stream:
+        json.dump(report, stream, indent=2)
+    print(f"Résultats écrits dans {args.output}")
+    if args.compare:
+        with open(args.compare) as stream:
+            compare(json.load(stream), report)
+
+
+if __name__ == "__main__":
+    main()
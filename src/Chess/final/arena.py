@@ -0,0 +1,433 @@
+import math
+import sys
+from array import array
+from collections import OrderedDict
+
+import chess
+import numpy as np
+
+from node import Node
+from nodecache import COUNTERS, position_outcome
+
+NO_NODE = -1        # Indice « nul » (pas de parent, pas d'enfant, pas de frère)
+NO_MOVE = -1        # Code de coup de la racine
+UNKNOWN = -1        # Caractère terminal pas encore calculé
+
+
+def encode_move(move):
+    """
+    Encode un coup sur 15 bits : case de départ (6 bits), case d'arrivée (6 bits)
+    et pièce de promotion (3 bits).
+    """
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+
+def decode_move(code):
+    """
+    Opération inverse de encode_move.
+    """
+    if code < 0:
+        return None
+    promotion = code >> 12
+    return chess.Move(code & 63, (code >> 6) & 63, promotion if promotion else None)
+
+
+def child_key(parent, code):
+    """
+    Clé entière de l'index des enfants : indice du parent et code du coup (15 bits).
+    """
+    return (int(parent) << 15) | int(code)
+
+
+class NodeArena:
+    """
+    Arbre MCTS stocké en « structure de tableaux » : les statistiques et les liens
+    de chaque nœud vivent dans des tableaux NumPy préalloués, indexés par l'identifiant
+    du nœud. Les enfants sont chaînés (premier enfant / frère suivant), dans l'ordre
+    de création, comme la liste `children` de Node.
+
+    Aucun plateau n'est stocké par nœud : seules les racines gardent le leur, les autres
+    sont reconstruits en rejouant les coups depuis l'ancêtre le plus proche présent dans
+    un petit cache LRU. Les coups non explorés ne sont générés qu'au premier développement
+    d'un nœud, gardés encodés sur 2 octets, et libérés dès qu'il est entièrement développé.
+    Un dictionnaire (parent, coup) -> enfant, à clé entière, donne l'enfant d'un coup en O(1).
+
+    Au re-enracinement (detach), l'arène est compactée : seul le sous-arbre de la nouvelle racine
+    est gardé, les nœuds des branches abandonnées et les plateaux des anciennes racines sont libérés.
+    """
+
+    def __init__(self, board, capacity=4096, board_cache_size=64):
+        """
+        :param board: plateau de la racine
+        :param capacity: nombre de nœuds préalloués (la capacité double si besoin)
+        :param board_cache_size: nombre de plateaux reconstruits gardés en cache
+        """
+        self.capacity = capacity
+        self.initial_capacity = capacity
+        self.size = 0
+        self.visits = np.zeros(capacity, dtype=np.int32)
+        self.wins = np.zeros(capacity, dtype=np.float64)
+        self.parent = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.first_child = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.last_child = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.next_sibling = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.move = np.full(capacity, NO_MOVE, dtype=np.int16)
+        self.terminal = np.full(capacity, UNKNOWN, dtype=np.int8)   # 1 : position terminale, 0 : partie en cours
+        self.proven = np.zeros(capacity, dtype=np.int8)             # Valeur prouvée (voir solver.py)
+
+        self.untried = {}               # indice -> coups non explorés encodés (nœuds en cours de développement)
+        self.outcomes = {}              # indice -> chess.Outcome, pour les positions terminales uniquement
+        self.root_boards = {}           # indice -> plateau, pour les racines uniquement
+        self.child_index = {}           # child_key(parent, code du coup) -> indice de l'enfant
+        self.board_cache = OrderedDict()
+        self.board_cache_size = board_cache_size
+
+        self.root = self.new_node(board)
+
+    def _columns(self):
+        return ("visits", "wins", "parent", "first_child", "last_child", "next_sibling", "move", "terminal", "proven")
+
+    def _grow(self):
+        """
+        Double la capacité de tous les tableaux.
+        """
+        for name in self._columns():
+            column = getattr(self, name)
+            fill = 0 if name in ("visits", "wins", "proven") else -1
+            extra = np.full(self.capacity, fill, dtype=column.dtype)
+            setattr(self, name, np.concatenate((column, extra)))
+        self.capacity *= 2
+
+    def new_node(self, board, move=None, parent=NO_NODE):
+        """
+        Alloue un nœud et le rattache à son parent.
+
+        :param board: plateau du nouveau nœud (gardé seulement en cache), ou None en mode "replay"
+        :param move: coup menant à ce nœud (None pour une racine)
+        :param parent: indice du parent (NO_NODE pour une racine)
+        :return: la vue ArenaNode du nœud créé
+        """
+        if self.size == self.capacity:
+            self._grow()
+        index = self.size
+        self.size += 1
+        self.move[index] = NO_MOVE if move is None else encode_move(move)
+        self.parent[index] = parent
+        if parent == NO_NODE:
+            # Copie : le plateau de l'appelant continue d'évoluer pendant la partie
+            self.root_boards[index] = board.copy()
+        else:
+            last = self.last_child[parent]
+            if last == NO_NODE:
+                self.first_child[parent] = index
+            else:
+                self.next_sibling[last] = index
+            self.last_child[parent] = index
+            self.child_index[child_key(parent, self.move[index])] = index
+            if board is not None:
+                self._cache_board(index, board)
+        return ArenaNode(self, index)
+
+    def _cache_board(self, index, board):
+        self.board_cache[index] = board
+        if len(self.board_cache) > self.board_cache_size:
+            self.board_cache.popitem(last=False)
+
+    def board_of(self, index):
+        """
+        Renvoie le plateau du nœud, reconstruit depuis l'ancêtre connu le plus proche.
+        """
+        board = self.root_boards.get(index)
+        if board is not None:
+            return board
+        board = self.board_cache.get(index)
+        if board is not None:
+            self.board_cache.move_to_end(index)
+            return board
+
+        path = []
+        current = index
+        while True:
+            path.append(current)
+            current = int(self.parent[current])
+            board = self.root_boards.get(current)
+            if board is None:
+                board = self.board_cache.get(current)
+            if board is not None:
+                break
+        for node_index in reversed(path):
+            board = board.copy()
+            board.push(decode_move(int(self.move[node_index])))
+            self._cache_board(node_index, board)
+        return board
+
+    def untried_codes(self, index, board=None):
+        """
+        Coups non encore explorés du nœud (encodés) ; la liste n'est générée qu'au premier appel.
+        Comme dans Node, les enfants sont créés en dépilant la fin de la liste des coups légaux.
+
+        :param board: plateau dans la position du nœud, s'il est déjà disponible (mode "replay")
+        """
+        codes = self.untried.get(index)
+        if codes is None:
+            if self.first_child[index] != NO_NODE:
+                return array("h")
+            if board is None:
+                board = self.board_of(index)
+            codes = array("h", (encode_move(move) for move in board.legal_moves))
+            if codes:
+                self.untried[index] = codes
+        return codes
+
+    def pop_untried(self, index, board=None):
+        codes = self.untried_codes(index, board)
+        move = decode_move(codes.pop())
+        if not codes:
+            del self.untried[index]
+        return move
+
+    def children_of(self, index):
+        children = []
+        child = int(self.first_child[index])
+        while child != NO_NODE:
+            children.append(child)
+            child = int(self.next_sibling[child])
+        return children
+
+    def detach(self, index):
+        """
+        Fait du nœud une nouvelle racine (son plateau est alors épinglé), puis compacte l'arène
+        autour de son sous-arbre.
+
+        :return: nouvel indice du nœud (les vues sur les autres nœuds ne sont plus valides)
+        """
+        if self.parent[index] != NO_NODE:
+            self.root_boards[index] = self.board_of(index)
+            self.parent[index] = NO_NODE
+        return self.compact(index)
+
+    def compact(self, index):
+        """
+        Ne garde que le sous-arbre du nœud index, renuméroté en largeur à partir de 0 (l'ordre
+        des enfants est conservé) ; la capacité redescend au plus petit multiple de la capacité
+        initiale qui le contient.
+
+        :return: nouvel indice du nœud, 0
+        """
+        first_child = self.first_child[:self.size].tolist()
+        next_sibling = self.next_sibling[:self.size].tolist()
+        order = [index]
+        position = 0
+        while position < len(order):
+            child = first_child[order[position]]
+            position += 1
+            while child != NO_NODE:
+                order.append(child)
+                child = next_sibling[child]
+        kept = np.array(order, dtype=np.int64)
+        # Ancien indice -> nouvel indice (NO_NODE pour les nœuds libérés)
+        mapping = np.full(self.size + 1, NO_NODE, dtype=np.int32)
+        mapping[kept] = np.arange(len(kept), dtype=np.int32)
+
+        capacity = self.initial_capacity
+        while capacity < len(kept):
+            capacity *= 2
+        for name in self._columns():
+            column = getattr(self, name)[kept]
+            if name in ("parent", "first_child", "last_child", "next_sibling"):
+                # NO_NODE (-1) désigne la dernière case de mapping, elle-même NO_NODE
+                column = mapping[column]
+            fill = 0 if name in ("visits", "wins", "proven") else -1
+            compacted = np.full(capacity, fill, dtype=column.dtype)
+            compacted[:len(kept)] = column
+            setattr(self, name, compacted)
+        self.capacity = capacity
+        self.size = len(kept)
+
+        self.untried = {int(mapping[old]): codes for old, codes in self.untried.items() if mapping[old] != NO_NODE}
+        self.outcomes = {int(mapping[old]): outcome for old, outcome in self.outcomes.items()
+                         if mapping[old] != NO_NODE}
+        self.root_boards = {0: self.root_boards[index]}
+        self.board_cache = OrderedDict((int(mapping[old]), board) for old, board in self.board_cache.items()
+                                       if mapping[old] != NO_NODE)
+        parents = self.parent[1:self.size].tolist()
+        codes = self.move[1:self.size].tolist()
+        self.child_index = {(parent << 15) | code: index
+                            for index, (parent, code) in enumerate(zip(parents, codes), start=1)}
+        self.root = ArenaNode(self, 0)
+        return 0
+
+    def bytes_per_node(self):
+        """
+        Coût mémoire fixe d'un nœud dans les tableaux (hors coups non explorés).
+        """
+        return sum(getattr(self, name).itemsize for name in self._columns())
+
+    def memory_report(self, projected_nodes=10**6):
+        """
+        Résumé de l'occupation mémoire de l'arène.
+
+        :param projected_nodes: taille d'arbre pour laquelle on extrapole le coût
+        :return: dictionnaire (octets par nœud, taille des tableaux, tables annexes, projection)
+        """
+        per_node = self.bytes_per_node()
+        side_tables = sum(codes.buffer_info()[1] * codes.itemsize for codes in self.untried.values())
+        return {
+            "nodes": self.size,
+            "capacity": self.capacity,
+            "bytes_per_node": per_node,
+            "array_bytes": per_node * self.capacity,
+            "untried_bytes": side_tables,
+            "child_index_bytes": sys.getsizeof(self.child_index),
+            "projected_bytes": per_node * projected_nodes,
+        }
+
+
+class ArenaNode(Node):
+    """
+    Vue légère sur un nœud de NodeArena, avec la même interface que Node.
+    Les attributs (visits, wins, parent, children...) lisent et écrivent directement
+    dans les tableaux de l'arène ; ucb1, update et is_terminal_node sont hérités de Node
+    (le caractère terminal est gardé dans l'arène, voir outcome).
+    """
+
+    __slots__ = ("arena", "index")
+
+    def __init__(self, arena, index):
+        self.arena = arena
+        self.index = index
+
+    def __eq__(self, other):
+        return isinstance(other, ArenaNode) and other.arena is self.arena and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.arena), self.index))
+
+    @property
+    def visits(self):
+        return int(self.arena.visits[self.index])
+
+    @visits.setter
+    def visits(self, value):
+        self.arena.visits[self.index] = value
+
+    @property
+    def wins(self):
+        return float(self.arena.wins[self.index])
+
+    @wins.setter
+    def wins(self, value):
+        self.arena.wins[self.index] = value
+
+    @property
+    def proven(self):
+        return int(self.arena.proven[self.index])
+
+    @proven.setter
+    def proven(self, value):
+        self.arena.proven[self.index] = value
+
+    @property
+    def parent(self):
+        parent = int(self.arena.parent[self.index])
+        return None if parent == NO_NODE else ArenaNode(self.arena, parent)
+
+    @parent.setter
+    def parent(self, value):
+        if value is not None:
+            raise ValueError("Un nœud de l'arène ne peut être rattaché qu'à sa création.")
+        # Cette vue suit le nœud dans l'arène compactée
+        self.index = self.arena.detach(self.index)
+
+    @property
+    def move(self):
+        return decode_move(int(self.arena.move[self.index]))
+
+    @property
+    def board(self):
+        return self.arena.board_of(self.index)
+
+    @property
+    def children(self):
+        return [ArenaNode(self.arena, child) for child in self.arena.children_of(self.index)]
+
+    @property
+    def untried_moves(self):
+        return [decode_move(code) for code in self.arena.untried_codes(self.index)]
+
+    def is_fully_expanded(self, board=None):
+        return len(self.arena.untried_codes(self.index, board)) == 0
+
+    def _has_moves(self, board):
+        arena = self.arena
+        return arena.first_child[self.index] != NO_NODE or len(arena.untried_codes(self.index, board)) > 0
+
+    def outcome(self, board=None):
+        """
+        Issue de la position, calculée une seule fois (voir CachedStateMixin) et gardée dans l'arène :
+        un octet par nœud, plus l'issue elle-même pour les seules positions terminales.
+        """
+        arena = self.arena
+        terminal = arena.terminal[self.index]
+        if terminal == UNKNOWN:
+            COUNTERS.outcomes += 1
+            if board is None:
+                board = self.board
+            outcome = position_outcome(board, self._has_moves(board))
+            arena.terminal[self.index] = outcome is not None
+            if outcome is not None:
+                arena.outcomes[self.index] = outcome
+            return outcome
+        COUNTERS.hits += 1
+        return arena.outcomes.get(self.index) if terminal else None
+
+    def child_for(self, move):
+        """
+        Enfant atteint par move, lu dans l'index (parent, coup) de l'arène.
+        """
+        arena = self.arena
+        child = arena.child_index.get(child_key(self.index, encode_move(move)))
+        return None if child is None else ArenaNode(arena, child)
+
+    def best_child(self, exploration_constant=1.41, skip_proven=False):
+        """
+        Même règle que Node.best_child, calculée directement sur les tableaux.
+        """
+        arena = self.arena
+        children = arena.children_of(self.index)
+        if skip_proven:
+            children = [child for child in children if not arena.proven[child]] or children
+        log_parent = None
+        best, best_value = None, None
+        for child in children:
+            visits = int(arena.visits[child])
+            if visits == 0:
+                value = float('inf')
+            else:
+                if log_parent is None:
+                    log_parent = math.log(int(arena.visits[self.index]))
+                value = float(arena.wins[child]) / visits + exploration_constant * math.sqrt(log_parent / visits)
+            if best is None or value > best_value:
+                best, best_value = child, value
+        return ArenaNode(arena, best)
+
+    def expand(self):
+        """
+        Développe un enfant à partir d'un coup non encore exploré.
+
+        :return: la vue sur le nœud enfant nouvellement créé
+        """
+        arena = self.arena
+        move = arena.pop_untried(self.index)
+        next_board = self.board.copy()
+        next_board.push(move)
+        return arena.new_node(next_board, move, self.index)
+
+    def expand_on(self, board):
+        """
+        Variante sans plateau de expand (voir Node.expand_on).
+        """
+        arena = self.arena
+        move = arena.pop_untried(self.index, board)
+        board.push(move)
+        return arena.new_node(None, move, self.index)
@@ -0,0 +1,806 @@
+import argparse
+import importlib
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+import chess
+import numpy as np
+
+from main import update_mcts_root
+from mcts import MCTS
+from node import Node, VectorNode
+from parallel import RolloutPool, RootParallelMCTS
+from transposition import TranspositionTable
+from evaluation import MaterialBoard, PIECE_SQUARE_TABLES
+from utils import material_score
+from rollout import Rollout, format_rollout_report
+from memory import TreeBudget
+from treestore import TreeStore, write_store, format_store_report
+from profiling import NULL_PHASE, SearchProfiler, format_profile
+from playout import BitboardRollout
+from nodecache import format_cache_report
+from opponent import HeuristicOpponent, PIECE_VALUES
+from solver import format_solver_report
+from budget import EarlyStop, format_early_stop_report
+from core import MCTSCore
+from games import ChessGame, ALEGame
+from stubs import StatsOnlyGame, StatsOnlyMCTS
+
+
+def _count_nodes(root):
+    count = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+    return count
+
+
+def bench_memory(iterations=5000, seed=0):
+    """
+    Mesure l'occupation mémoire par nœud des représentations de l'arbre (objets Node ou
+    arène NumPy, plateau copié par nœud ou rejoué) après `iterations` itérations depuis
+    la position initiale.
+    """
+    results = {}
+    for tree, board_mode in (("objects", "copy"), ("objects", "replay"), ("arena", "copy"), ("arena", "replay")):
+        name = f"{tree}/{board_mode}"
+        random.seed(seed)
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        # Nœuds de node.py et de l'arène : boucle de MCTS (core=False), pas celle de core.MCTSCore
+        mcts = StatsOnlyMCTS(chess.Board(), iterations=iterations, tree=tree, board_mode=board_mode, core=False)
+        start = time.perf_counter()
+        mcts.best_move()
+        elapsed = time.perf_counter() - start
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+        nodes = mcts.root.arena.size if tree == "arena" else _count_nodes(mcts.root)
+        results[name] = {
+            "nodes": nodes,
+            "bytes_per_node": allocated / nodes,
+            "seconds": elapsed,
+        }
+        if tree == "arena":
+            results[name]["report"] = mcts.root.arena.memory_report()
+
+    for name, result in results.items():
+        print(f"[{name:14s}] {result['nodes']} nœuds, {result['bytes_per_node']:.0f} octets/nœud, "
+              f"{result['seconds']:.2f} s, 10^6 nœuds ≈ {result['bytes_per_node'] * 1e6 / 2**20:.0f} Mo")
+    report = results["arena/replay"]["report"]
+    print(f"[arena         ] colonnes : {report['bytes_per_node']} octets/nœud, "
+          f"coups non explorés : {report['untried_bytes']} octets")
+    return results
+
+
+def bench_transpositions(iterations=3000, moves=4, seed=0, max_entries=200000, replacement="lru"):
+    """
+    Joue quelques coups en auto-jeu avec une table de transposition conservée d'un coup
+    à l'autre, et affiche par coup les hits/misses et les simulations héritées.
+    """
+    random.seed(seed)
+    board = chess.Board()
+    table = TranspositionTable(max_entries=max_entries, replacement=replacement)
+    mcts = StatsOnlyMCTS(board, iterations=iterations, transposition_table=table)
+    per_move = []
+    for ply in range(moves):
+        mcts.color_player = board.turn
+        move = mcts.best_move()
+        stats = table.stats()
+        per_move.append(stats)
+        print(f"coup {ply + 1} ({move.uci()}) : {stats['hits']} hits / {stats['misses']} misses "
+              f"({stats['hit_rate']:.1%}), {stats['rollouts_saved']} simulations héritées, "
+              f"{stats['entries']} entrées")
+        table.reset_counters()
+        board.push(move)
+        update_mcts_root(mcts, move, board)
+    return per_move
+
+
+def bench_root_parallel(iterations=100, workers=None, moves=2, seed=0):
+    """
+    Compare le débit (itérations/s) du MCTS mono-processus et de RootParallelMCTS,
+    chaque processus effectuant `iterations` itérations par coup.
+    """
+    workers = workers or os.cpu_count()
+    board = chess.Board()
+
+    random.seed(seed)
+    start = time.perf_counter()
+    for _ in range(moves):
+        MCTS(board, color_player=board.turn, iterations=iterations).best_move()
+    single_rate = moves * iterations / (time.perf_counter() - start)
+
+    with RootParallelMCTS(workers=workers, iterations=iterations, seed=seed) as parallel:
+        rates = []
+        for _ in range(moves):
+            parallel.best_move(board)
+            rates.append(parallel.stats["iterations_per_sec"])
+    parallel_rate = sum(rates) / len(rates)
+
+    print(f"mono-processus : {single_rate:.1f} itérations/s")
+    print(f"{workers} processus : {parallel_rate:.1f} itérations/s "
+          f"(accélération x{parallel_rate / single_rate:.2f})")
+    return {"workers": workers, "single": single_rate, "parallel": parallel_rate,
+            "speedup": parallel_rate / single_rate}
+
+
+def bench_leaf_parallel(iterations=32, workers=None, batch_sizes=(1, 4, 16), rollouts_per_leaf=(1, 4), seed=0):
+    """
+    Débit des simulations (rollouts/s) de la parallélisation aux feuilles pour chaque
+    combinaison batch_size x rollouts_per_leaf, afin de choisir les réglages d'une machine.
+    """
+    workers = workers or os.cpu_count()
+    results = []
+    with RolloutPool(workers=workers, seed=seed) as pool:
+        for batch_size in batch_sizes:
+            for per_leaf in rollouts_per_leaf:
+                mcts = MCTS(chess.Board(), iterations=iterations, rollout_pool=pool,
+                            batch_size=batch_size, rollouts_per_leaf=per_leaf)
+                mcts.best_move()
+                stats = mcts.stats
+                results.append({"batch_size": batch_size, "rollouts_per_leaf": per_leaf, **stats})
+                print(f"batch_size={batch_size:3d} rollouts_per_leaf={per_leaf:2d} : "
+                      f"{stats['rollouts']} simulations, {stats['rollouts_per_sec']:.1f} rollouts/s")
+    return results
+
+
+def _expanded_node(node_class, board, seed):
+    """
+    Nœud dont tous les coups légaux sont développés, avec des statistiques aléatoires.
+    """
+    rng = random.Random(seed)
+    node = node_class(board)
+    while not node.is_fully_expanded():
+        child = node.expand()
+        child.visits = rng.randint(1, 200)
+        child.wins = rng.random() * child.visits
+        node.visits += child.visits
+    return node
+
+
+def bench_selection(repeat=20000, seed=0):
+    """
+    Coût d'un choix d'enfant (un niveau de descente) : boucle Python (Node.best_child)
+    contre calcul vectorisé (VectorNode.best_child), pour différents facteurs de branchement.
+    """
+    positions = {
+        "ouverture (20 coups)": chess.Board(),
+        "milieu de partie": chess.Board("r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP2BPPP/R2QKB1R w KQ - 0 9"),
+        "position ouverte": chess.Board("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"),
+    }
+    results = {}
+    for name, board in positions.items():
+        timings = {}
+        for label, node_class, args in (("Node", Node, ()), ("VectorNode", VectorNode, ()),
+                                        ("VectorNode/puct", VectorNode, (1.41, "puct"))):
+            node = _expanded_node(node_class, board, seed)
+            seconds = timeit.timeit(lambda: node.best_child(*args), number=repeat)
+            timings[label] = seconds / repeat * 1e6
+        results[name] = timings
+        children = board.legal_moves.count()
+        print(f"{name:22s} ({children} enfants) : " +
+              ", ".join(f"{label} {micro:.1f} µs" for label, micro in timings.items()) +
+              f" (x{timings['Node'] / timings['VectorNode']:.1f})")
+    return results
+
+
+def bench_evaluation(repeat=20000, plies=40, seed=0):
+    """
+    Coût de utils.material_score sur un chess.Board (recalcul complet) et sur un MaterialBoard
+    (bilan incrémental, avec ou sans tables pièce-case), ainsi que le surcoût de push/pop.
+    """
+    rng = random.Random(seed)
+    moves = []
+    board = chess.Board()
+    for _ in range(plies):
+        move = rng.choice(list(board.legal_moves))
+        moves.append(move)
+        board.push(move)
+
+    results = {}
+    for label, position in (("chess.Board", board),
+                            ("MaterialBoard", MaterialBoard.from_board(board)),
+                            ("MaterialBoard + tables", MaterialBoard.from_board(board, PIECE_SQUARE_TABLES))):
+        score = timeit.timeit(lambda: material_score(position, chess.WHITE), number=repeat) / repeat
+        replay = position.copy()
+        for _ in moves:
+            replay.pop()
+        start = time.perf_counter()
+        for _ in range(repeat // plies):
+            for move in moves:
+                replay.push(move)
+            for _ in moves:
+                replay.pop()
+        push_pop = (time.perf_counter() - start) / (repeat // plies * plies)
+        results[label] = {"material_score_us": score * 1e6, "push_pop_us": push_pop * 1e6}
+        print(f"{label:24s} : material_score {score * 1e6:.2f} µs, push + pop {push_pop * 1e6:.2f} µs")
+    return results
+
+
+def bench_rollout_depth(rollouts=30, depths=(None, 80, 40, 20), adjudication_margins=(None, 900), seed=0):
+    """
+    Longueur moyenne et débit des simulations depuis la position initiale (sur un MaterialBoard)
+    pour chaque profondeur maximale et seuil d'adjudication : données pour choisir le compromis
+    vitesse/qualité de Rollout.
+    """
+    results = []
+    for depth in depths:
+        for margin in adjudication_margins:
+            random.seed(seed)
+            rollout = Rollout(max_depth=depth, adjudication_margin=margin)
+            for _ in range(rollouts):
+                rollout.play(MaterialBoard())
+            report = rollout.report()
+            results.append({"max_depth": depth, "adjudication_margin": margin, **report})
+            print(f"max_depth={str(depth):4s} adjudication_margin={str(margin):4s} : {format_rollout_report(report)}")
+    return results
+
+
+def bench_tree_budget(max_nodes=2000, iterations=20000, policies=("visits", "recent"), seed=0):
+    """
+    Arbre borné à max_nodes nœuds : nombre de nœuds et octets estimés en fin de recherche,
+    nœuds repliés, et durée de la plus longue tranche d'élagage (pic de latence par itération).
+    Compte de nœuds comparé à l'arbre réel : tests/test_memory.py.
+    """
+    results = {}
+    for policy in policies:
+        random.seed(seed)
+        budget = TreeBudget(max_nodes, policy=policy)
+        mcts = StatsOnlyMCTS(chess.Board(), iterations=iterations, tree_budget=budget)
+        step = budget.step
+        worst = [0.0]
+
+        def timed_step(root):
+            start = time.perf_counter()
+            evicted = step(root)
+            worst[0] = max(worst[0], time.perf_counter() - start)
+            return evicted
+
+        budget.step = timed_step
+        mcts.best_move()
+        report = budget.report()
+        results[policy] = {**report, "worst_step_ms": worst[0] * 1e3}
+        print(f"[{policy:6s}] {report['nodes']}/{max_nodes} nœuds, ~{report['approx_bytes'] / 2**20:.1f} Mo, "
+              f"{report['evicted']} nœuds repliés en {report['sweeps']} parcours, "
+              f"tranche d'élagage la plus longue : {worst[0] * 1e3:.2f} ms")
+    return results
+
+
+def bench_tree_store(entries=2_000_000, lookups=2000, iterations=500, seed=0):
+    """
+    Fichier de statistiques d'ouverture : écriture et ouverture (projection en mémoire) d'un
+    fichier de `entries` positions, coût d'une recherche, puis une partie de l'aller-retour réel
+    (arbre enregistré, relu et servant de point de départ à une nouvelle recherche).
+    """
+    rng = np.random.default_rng(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.mcts")
+        keys = rng.integers(0, 2**63, entries, dtype=np.uint64)
+        start = time.perf_counter()
+        write_store(path, keys, np.ones(entries, dtype=np.uint32), np.zeros(entries, dtype=np.float32), 20)
+        write_seconds = time.perf_counter() - start
+        store = TreeStore(path)
+        board = chess.Board()
+        lookup = timeit.timeit(lambda: store.lookup(board), number=lookups) / lookups
+        print(f"{entries} positions ({os.path.getsize(path) / 2**20:.1f} Mo) : écriture {write_seconds:.2f} s, "
+              f"ouverture {store.load_seconds * 1e3:.2f} ms, recherche {lookup * 1e6:.1f} µs (dont la clé Zobrist)")
+        results = {"entries": entries, "write_seconds": write_seconds, "load_ms": store.load_seconds * 1e3,
+                   "lookup_us": lookup * 1e6}
+        store.close()
+
+        path = os.path.join(directory, "game.mcts")
+        random.seed(seed)
+        store = TreeStore(path)
+        mcts = StatsOnlyMCTS(chess.Board(), iterations=iterations, tree_store=store)
+        mcts.best_move()
+        store.record(mcts.root, chess.Board())
+        store.flush()
+        store = TreeStore(path)
+        seeded = StatsOnlyMCTS(chess.Board(), iterations=iterations, tree_store=store)
+        seeded.best_move()
+        report = store.report()
+        print("Nouvelle recherche :", format_store_report(report))
+        results["seeded"] = report
+    return results
+
+
+def bench_profiling(iterations=1000, max_depth=20, repeat=3, seed=0):
+    """
+    Profil d'une recherche (phases et primitives python-chess), et surcoût du profilage :
+    désactivé (contextes NULL_PHASE, mesuré à part et rapporté au temps d'une itération),
+    phases seules, phases et primitives.
+    """
+    def search(profiler=None):
+        random.seed(seed)
+        mcts = MCTS(chess.Board(), iterations=iterations, rollout=Rollout(max_depth=max_depth), profiler=profiler)
+        start = time.perf_counter()
+        mcts.best_move()
+        return time.perf_counter() - start, mcts
+
+    baseline = min(search()[0] for _ in range(repeat))
+    phases_only = min(search(SearchProfiler(chess_primitives=False))[0] for _ in range(repeat))
+    seconds, mcts = search(SearchProfiler())
+    print(format_profile(mcts.stats["profile"]))
+
+    def null_phase():
+        with NULL_PHASE:
+            pass
+    # Quatre phases par itération (sélection, expansion, simulation, rétropropagation)
+    disabled = 4 * timeit.timeit(null_phase, number=100000) / 100000
+    results = {
+        "seconds": baseline,
+        "disabled_overhead": disabled / (baseline / iterations),
+        "phases_overhead": phases_only / baseline - 1,
+        "primitives_overhead": seconds / baseline - 1,
+        "profile": mcts.stats["profile"],
+    }
+    print(f"Surcoût : désactivé {results['disabled_overhead']:.3%}, phases {results['phases_overhead']:+.1%}, "
+          f"phases et primitives {results['primitives_overhead']:+.1%}")
+    return results
+
+
+def bench_playout(rollouts=200, seed=0):
+    """
+    Moteur de simulation sur bitboards (playout.py) : simulations/s de BitboardRollout et de
+    Rollout depuis la position initiale (perft et test différentiel : tests/test_playout.py).
+    """
+    results = {}
+    for name, rollout, count in (("python-chess", Rollout(), max(rollouts // 10, 1)),
+                                 ("bitboards", BitboardRollout(), rollouts)):
+        random.seed(seed)
+        for _ in range(count):
+            rollout.play(chess.Board())
+        results[name] = rollout.report()
+        print(f"{name:12s} : {format_rollout_report(results[name])}")
+    speedup = results["bitboards"]["rollouts_per_sec"] / results["python-chess"]["rollouts_per_sec"]
+    # Les deux échantillons de parties n'ont pas la même longueur moyenne : le coût par demi-coup
+    # compare les deux moteurs sans ce bruit
+    plies_per_sec = {name: report["rollouts_per_sec"] * report["avg_rollout_length"]
+                     for name, report in results.items()}
+    ply_speedup = plies_per_sec["bitboards"] / plies_per_sec["python-chess"]
+    print(f"Accélération : x{speedup:.1f} en simulations/s, x{ply_speedup:.1f} en demi-coups/s")
+    return {"speedup": speedup, "ply_speedup": ply_speedup, **results}
+
+
+def _uncached_terminal(node, board=None):
+    # Ancienne version de Node.is_terminal_node : une génération de coups à chaque appel
+    return (node.board if board is None else board).is_game_over()
+
+
+def bench_node_cache(iterations=3000, seed=0):
+    """
+    Cache du caractère terminal des nœuds (nodecache.py) : des recherches (simulations sans coût,
+    l'arbre domine) sont chronométrées avec et sans cache (issues comparées à board.outcome() :
+    tests/test_nodecache.py).
+    """
+    results = {}
+    cached_terminal = Node.is_terminal_node
+    for tree, board_mode in (("objects", "copy"), ("objects", "replay"), ("arena", "copy"), ("arena", "replay")):
+        timings = {}
+        for cached in (False, True):
+            random.seed(seed)
+            mcts = StatsOnlyMCTS(chess.Board(), iterations=iterations, tree=tree, board_mode=board_mode,
+                                 core=False)
+            if not cached:
+                Node.is_terminal_node = _uncached_terminal
+            try:
+                start = time.perf_counter()
+                mcts.best_move()
+                timings[cached] = time.perf_counter() - start
+            finally:
+                Node.is_terminal_node = cached_terminal
+        name = f"{tree}/{board_mode}"
+        results[name] = {"speedup": timings[False] / timings[True], **mcts.stats["node_cache"]}
+        print(f"{name:15s} : x{results[name]['speedup']:.2f} ({timings[False]:.2f} s -> {timings[True]:.2f} s), "
+              f"{format_cache_report(mcts.stats['node_cache'])}")
+    return results
+
+
+def _stockfish_module():
+    # Chess/stockfish/main.py s'importe comme module du paquet Chess (src/ dans le chemin)
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    return importlib.import_module("Chess.stockfish.main")
+
+
+def bench_capture_policy(samples=4000, rollouts=20, max_depth=40, seed=0):
+    """
+    Politique de simulation de Chess/stockfish/main.py : la version à tables (capture_biased_move)
+    contre la version de référence qui joue chaque coup (material_biased_move). Les lois des coups
+    tirés doivent être proches (distance en variation totale) ; puis simulations/s des deux versions
+    (gains matériels coup par coup : tests/test_capture_policy.py).
+    """
+    stockfish = _stockfish_module()
+    random.seed(seed)
+    mcts = stockfish.MCTS(stockfish.MaterialBoard())
+    fens = (chess.STARTING_FEN, "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+            "8/P1k5/8/3pP3/8/8/6p1/4K3 w - d6 0 1")
+    distances = []
+    for fen in fens:
+        board = chess.Board(fen)
+        counts = [{}, {}]
+        for policy, count in zip((mcts.material_biased_move, mcts.capture_biased_move), counts):
+            for _ in range(samples):
+                move = policy(board)
+                count[move] = count.get(move, 0) + 1
+        moves = set(counts[0]) | set(counts[1])
+        distances.append(sum(abs(counts[0].get(move, 0) - counts[1].get(move, 0)) for move in moves) / (2 * samples))
+    print("Distance en variation totale des lois des coups : " + ", ".join(f"{distance:.3f}" for distance in distances))
+
+    results = {"distances": distances}
+    for name, policy in (("référence", mcts.material_biased_move), ("tables", mcts.capture_biased_move)):
+        rollout = Rollout(max_depth=max_depth)
+        random.seed(seed)
+        mcts.rng = np.random.default_rng(seed)
+        for _ in range(rollouts):
+            rollout.play(stockfish.MaterialBoard(), policy)
+        results[name] = rollout.report()
+        print(f"{name:10s} : {format_rollout_report(results[name])}")
+    results["speedup"] = results["tables"]["rollouts_per_sec"] / results["référence"]["rollouts_per_sec"]
+    print(f"Accélération : x{results['speedup']:.1f}")
+    return results
+
+
+def bench_opponent(games=10, max_plies=200, seed=0):
+    """
+    Adversaire heuristique (opponent.py) : coups/s sur des parties complètes (l'adversaire joue
+    les deux camps), comparés au simple tirage au hasard (notes attendues : tests/test_opponent.py).
+    """
+    opponent = HeuristicOpponent(seed)
+    results = {}
+    rng = random.Random(seed)
+    for name, choose_move in (("hasard", lambda board: rng.choice(list(board.legal_moves))),
+                              ("heuristique", opponent.choose_move)):
+        moves = 0
+        start = time.perf_counter()
+        for _ in range(games):
+            board = chess.Board()
+            while not board.is_game_over() and board.ply() < max_plies:
+                board.push(choose_move(board))
+                moves += 1
+        seconds = time.perf_counter() - start
+        results[name] = moves / seconds
+        print(f"{name:12s} : {moves} coups, {results[name]:.0f} coups/s")
+    return results
+
+
+# Mats en quelques coups : (position, nombre de coups, seul coup qui mate dans ce délai)
+MATE_POSITIONS = (
+    ("6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1", 1, "d1d8"),
+    ("kbK5/pp6/1P6/8/8/8/8/R7 w - - 0 1", 2, "a1a6"),
+    ("r5rk/5p1p/5R2/4B3/8/8/7P/7K w - - 0 1", 3, "f6a6"),
+)
+
+
+def _iterations_to_find(mcts, move, max_iterations, step):
+    """
+    Itérations après lesquelles le coup le plus visité est move et le reste jusqu'à max_iterations
+    (vérifié toutes les step itérations), ou None s'il ne l'est pas à la fin.
+    """
+    found = None
+    done = 0
+    while done < max_iterations:
+        mcts.best_move(iterations=step)
+        done += step
+        if mcts.current_best_move() != move:
+            found = None
+        elif found is None:
+            found = done
+    return found
+
+
+def bench_solver(max_iterations=10000, step=100, seeds=3, max_depth=40):
+    """
+    MCTS-Solver (solver.py) sur des mats en 1, 2 et 3 coups : itérations jusqu'à la preuve de
+    la racine, contre les itérations dont le MCTS sans solver a besoin pour que le coup qui mate
+    devienne (et reste) le plus visité.
+    """
+    results = {}
+    for fen, mate_in, expected in MATE_POSITIONS:
+        expected = chess.Move.from_uci(expected)
+        rows = []
+        for seed in range(seeds):
+            random.seed(seed)
+            board = chess.Board(fen)
+            solver = MCTS(board, color_player=board.turn, solver=True, rollout=BitboardRollout(max_depth=max_depth))
+            start = time.perf_counter()
+            move = solver.best_move(iterations=max_iterations)
+            solver_seconds = time.perf_counter() - start
+            report = solver.stats["solver"]
+
+            random.seed(seed)
+            plain = MCTS(board, color_player=board.turn, rollout=BitboardRollout(max_depth=max_depth))
+            start = time.perf_counter()
+            found = _iterations_to_find(plain, expected, max_iterations, step)
+            rows.append({"solver_correct": move == expected, "proof_iteration": report["proof_iteration"],
+                         "proven": report["proven"], "solver_seconds": solver_seconds,
+                         "plain_iterations": found, "plain_seconds": time.perf_counter() - start})
+            print(f"mat en {mate_in}, graine {seed} : solver {format_solver_report(report)} en {solver_seconds:.2f} s ; "
+                  f"sans solver : {found if found is not None else f'> {max_iterations}'} itérations")
+        results[f"mate-in-{mate_in}"] = rows
+    return results
+
+
+def _material(board, color):
+    return sum(PIECE_VALUES[piece.piece_type] * (1 if piece.color == color else -1)
+               for piece in board.piece_map().values() if piece.piece_type != chess.KING)
+
+
+def _two_ply_values(board, mate=20):
+    """
+    Valeur de référence de chaque coup légal : bilan matériel (en pions, voir opponent.PIECE_VALUES)
+    pour le camp au trait après la meilleure réponse adverse ; un mat vaut +/- mate.
+    """
+    color = board.turn
+    values = {}
+    for move in list(board.legal_moves):
+        board.push(move)
+        if board.is_checkmate():
+            values[move] = mate
+        else:
+            replies = []
+            for reply in list(board.legal_moves):
+                board.push(reply)
+                replies.append(-mate if board.is_checkmate() else _material(board, color))
+                board.pop()
+            values[move] = min(replies) if replies else 0
+        board.pop()
+    return values
+
+
+def _tactical_positions(count, seed, margin=2):
+    """
+    Positions de parties de l'adversaire heuristique où un coup gagne au moins margin pions de plus
+    que le coup médian (pièce en prise, mat) : le bon coup y est connu sans moteur de référence.
+    """
+    rng = random.Random(seed)
+    opponent = HeuristicOpponent(seed=seed)
+    positions = []
+    while len(positions) < count:
+        board = chess.Board()
+        for _ in range(rng.randint(10, 60)):
+            move = opponent.choose_move(board)
+            if move is None:
+                break
+            board.push(move)
+        if board.is_game_over():
+            continue
+        values = _two_ply_values(board)
+        ordered = sorted(values.values())
+        if ordered[-1] - ordered[len(ordered) // 2] >= margin:
+            positions.append((board.fen(), values))
+    return positions
+
+
+def _wilson_interval(successes, count, z=1.96):
+    """
+    Intervalle de confiance (à 95 % par défaut) d'une proportion, successes sur count (score de Wilson).
+    """
+    if not count:
+        return 0.0, 1.0
+    rate = successes / count
+    center = (rate + z * z / (2 * count)) / (1 + z * z / count)
+    spread = z * math.sqrt(rate * (1 - rate) / count + z * z / (4 * count * count)) / (1 + z * z / count)
+    return center - spread, center + spread
+
+
+def _mean_interval(values, z=1.96):
+    """
+    Moyenne de values et son intervalle de confiance (approximation normale).
+    """
+    mean = sum(values) / len(values)
+    if len(values) < 2:
+        return mean, (mean, mean)
+    deviation = math.sqrt(sum((value - mean) ** 2 for value in values) / (len(values) - 1))
+    spread = z * deviation / math.sqrt(len(values))
+    return mean, (mean - spread, mean + spread)
+
+
+def bench_rave(positions=100, budgets=(125, 250, 500, 1000, 2000), reference_budget=1000, max_depth=20, seed=0):
+    """
+    RAVE (rave.py) contre UCB1 : sur des positions tactiques, part des coups choisis qui sont les
+    meilleurs selon _two_ply_values (avec son intervalle de confiance à 95 %), et perte moyenne
+    (en pions) par rapport au meilleur, après chaque nombre d'itérations de budgets (le même arbre
+    poursuit sa recherche). Chaque budget du RAVE est comparé, position par position, à UCB1 à
+    reference_budget itérations : écart de la part de meilleurs coups, avec son intervalle.
+
+    Une position pèse 1 / positions dans la part de meilleurs coups : à 40 positions, les écarts
+    de quelques points entre budgets ou entre variantes ne sont pas significatifs.
+    """
+    samples = _tactical_positions(positions, seed)
+    variants = (("ucb1", {}), ("rave/copy", {"rave": True}), ("rave/replay", {"rave": True, "board_mode": "replay"}))
+    results = {}
+    for name, options in variants:
+        found = {budget: [] for budget in budgets}
+        regret = dict.fromkeys(budgets, 0.0)
+        start = time.perf_counter()
+        for index, (fen, values) in enumerate(samples):
+            random.seed(seed + index)
+            board = chess.Board(fen)
+            mcts = MCTS(board, color_player=board.turn, rollout=BitboardRollout(max_depth=max_depth), **options)
+            best = max(values.values())
+            done = 0
+            for budget in budgets:
+                mcts.best_move(iterations=budget - done)
+                done = budget
+                value = values[mcts.current_best_move()]
+                found[budget].append(int(value == best))
+                regret[budget] += best - value
+        results[name] = {"found": found,
+                         "best_rate": {budget: sum(found[budget]) / len(samples) for budget in budgets},
+                         "best_rate_interval": {budget: _wilson_interval(sum(found[budget]), len(samples))
+                                                for budget in budgets},
+                         "regret": {budget: regret[budget] / len(samples) for budget in budgets},
+                         "seconds": time.perf_counter() - start}
+        print(f"{name:12s} : " + ", ".join(
+            f"{budget} it. {rate:.0%} [{low:.0%}, {high:.0%}] (-{results[name]['regret'][budget]:.2f})"
+            for (budget, rate), (low, high) in zip(results[name]["best_rate"].items(),
+                                                   results[name]["best_rate_interval"].values()))
+              + f" en {results[name]['seconds']:.1f} s")
+
+    reference = results["ucb1"]["found"][reference_budget]
+    for name, _ in variants[1:]:
+        differences = {}
+        for budget in budgets:
+            differences[budget] = _mean_interval([rave - ucb1 for rave, ucb1 in
+                                                  zip(results[name]["found"][budget], reference)])
+        results[name]["difference"] = differences
+        print(f"{name} contre UCB1 à {reference_budget} itérations : " + ", ".join(
+            f"{budget} it. {mean:+.0%} [{low:+.0%}, {high:+.0%}]" for budget, (mean, (low, high)) in differences.items()))
+    return results
+
+
+def bench_early_stop(games=4, iterations=1000, max_plies=60, stability_window=200, max_depth=40, seed=0):
+    """
+    Arrêt anticipé (budget.EarlyStop) sur des parties de l'IA (blancs, arbre gardé d'un coup à
+    l'autre) contre l'adversaire heuristique : itérations épargnées à chaque coup, avec le seul
+    critère exact ("decided") puis avec aussi le critère de stabilité. Après un arrêt "stable", la
+    recherche est poursuivie jusqu'au budget complet pour vérifier si le coup aurait changé.
+    """
+    results = {}
+    for name, window in (("decided", None), ("decided+stable", stability_window)):
+        early_stop = EarlyStop(stability_window=window)
+        saved_per_move, changed = [], 0
+        for game in range(games):
+            random.seed(seed + game)
+            np.random.seed(seed + game)
+            opponent = HeuristicOpponent(seed=seed + game)
+            board = chess.Board()
+            mcts = MCTS(board, color_player=chess.WHITE, rollout=BitboardRollout(max_depth=max_depth),
+                        early_stop=early_stop)
+            saved = []
+            while not board.is_game_over() and board.ply() < max_plies:
+                if board.turn == chess.WHITE:
+                    move = mcts.best_move(iterations=iterations)
+                    remaining = mcts.stats["remaining_iterations"]
+                    saved.append(remaining)
+                    if mcts.stats["stop_reason"] == "stable":
+                        mcts.early_stop = None
+                        mcts.best_move(iterations=remaining)
+                        changed += mcts.current_best_move() != move
+                        mcts.early_stop = early_stop
+                else:
+                    move = opponent.choose_move(board)
+                board.push(move)
+                mcts = update_mcts_root(mcts, move, board)
+            print(f"{name}, partie {game + 1} : itérations épargnées par coup {saved}")
+            saved_per_move.extend(saved)
+        report = early_stop.report()
+        results[name] = {**report, "saved_per_move": saved_per_move, "changed_moves": changed,
+                         "saved_fraction": sum(saved_per_move) / (iterations * len(saved_per_move))}
+        print(f"{name} : {format_early_stop_report(report)}, soit {results[name]['saved_fraction']:.0%} "
+              f"du budget ; coups qui auraient changé avec le budget complet : {changed}")
+    return results
+
+
+GAME_POSITIONS = (
+    ("start", chess.STARTING_FEN),
+    ("middlegame", "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10"),
+    ("endgame", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1"),
+)
+
+
+def _search_rate(search, iterations):
+    start = time.perf_counter()
+    search(iterations)
+    return iterations / (time.perf_counter() - start)
+
+
+def _gymnasium():
+    # Jeux Atari : gymnasium, avec les environnements de ale_py
+    try:
+        import gymnasium
+        import ale_py
+    except ImportError:
+        return None
+    gymnasium.register_envs(ale_py)
+    return gymnasium
+
+
+def bench_games(iterations=2000, ale_iterations=20, max_depth=20, seed=0):
+    """
+    MCTS commun (core.MCTSCore) face aux boucles propres à chaque jeu, en itérations/s :
+
+    - échecs (ChessGame) contre la boucle de mcts.MCTS (core=False) en modes "copy" et "replay",
+      avec des simulations sur bitboards, puis avec des simulations remplacées par un tirage au
+      hasard (seul le coût de l'arbre et des coups joués reste) ; arbres identiques à graine
+      égale : tests/test_core.py ;
+    - TicTacToe3D (ALEGame, la recherche de TicTacToe3D/main2.py), simulations jusqu'à la fin de
+      la partie, si gymnasium et ale_py sont installés.
+    """
+    results = {}
+    for name, fen in GAME_POSITIONS:
+        board = chess.Board(fen)
+        for simulations in ("bitboards", "random"):
+            rates = {}
+            for variant in ("final-copy", "final-replay", "core"):
+                random.seed(seed)
+                if variant == "core":
+                    game = (ChessGame(board, rollout=BitboardRollout(max_depth=max_depth)) if simulations == "bitboards"
+                            else StatsOnlyGame(board))
+                    rates[variant] = _search_rate(MCTSCore(game).best_action, iterations)
+                else:
+                    mcts_class = MCTS if simulations == "bitboards" else StatsOnlyMCTS
+                    mcts = mcts_class(board, color_player=board.turn, rollout=BitboardRollout(max_depth=max_depth),
+                                      board_mode=variant.split("-")[1], core=False)
+                    rates[variant] = _search_rate(mcts.best_move, iterations)
+            results[(name, simulations)] = rates
+            print(f"échecs {name:10s} simulations {simulations:9s} : "
+                  + ", ".join(f"{variant} {rate:7.0f} it/s" for variant, rate in rates.items())
+                  + f" (core / final-copy x{rates['core'] / rates['final-copy']:.2f})")
+
+    gymnasium = _gymnasium()
+    if gymnasium is None:
+        print("TicTacToe3D : gymnasium / ale_py non installés, mesure ALE non effectuée")
+        return results
+    env = gymnasium.make("ALE/TicTacToe3D-v5")
+    env.reset(seed=seed)
+    random.seed(seed)
+    core = MCTSCore(ALEGame(env, max_rollout_steps=None))
+    rate = _search_rate(core.best_action, ale_iterations)
+    env.close()
+    results[("tictactoe3d", "ale")] = {"core": rate}
+    print(f"TicTacToe3D : core {rate:.1f} it/s")
+    return results
+
+
+BENCHMARKS = {
+    "memory": bench_memory,
+    "transpositions": bench_transpositions,
+    "root-parallel": bench_root_parallel,
+    "leaf-parallel": bench_leaf_parallel,
+    "selection": bench_selection,
+    "evaluation": bench_evaluation,
+    "rollout-depth": bench_rollout_depth,
+    "tree-budget": bench_tree_budget,
+    "tree-store": bench_tree_store,
+    "profiling": bench_profiling,
+    "playout": bench_playout,
+    "node-cache": bench_node_cache,
+    "capture-policy": bench_capture_policy,
+    "opponent": bench_opponent,
+    "solver": bench_solver,
+    "rave": bench_rave,
+    "early-stop": bench_early_stop,
+    "games": bench_games,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks du MCTS d'échecs.")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark]()
+
+
+if __name__ == "__main__":
+    main()
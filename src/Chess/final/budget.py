@@ -0,0 +1,210 @@
+import time
+
+
+class SearchBudget:
+    """
+    Budget d'une recherche « anytime » : nombre d'itérations, temps (secondes), nombre de
+    nœuds créés, ou toute combinaison (la recherche s'arrête dès que l'une des limites est
+    atteinte). Un événement d'annulation (threading.Event) permet de l'interrompre depuis un
+    autre thread ; la limite n'est vérifiée qu'entre deux itérations.
+    """
+
+    def __init__(self, iterations=None, seconds=None, nodes=None, stop_event=None):
+        """
+        :param iterations: nombre maximal d'itérations (None : pas de limite)
+        :param seconds: temps de réflexion maximal en secondes (None : pas de limite)
+        :param nodes: nombre maximal de nœuds créés (None : pas de limite)
+        :param stop_event: objet avec is_set() (threading.Event) ; la recherche s'arrête quand il est levé
+        """
+        if iterations is None and seconds is None and nodes is None and stop_event is None:
+            raise ValueError("Le budget doit comporter au moins une limite.")
+        self.iterations = iterations
+        self.seconds = seconds
+        self.nodes = nodes
+        self.stop_event = stop_event
+        self.start_time = None
+        self.stop_reason = None
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        self.stop_reason = None
+        return self
+
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+    def exhausted(self, iterations, nodes):
+        """
+        :param iterations: itérations effectuées depuis start()
+        :param nodes: nœuds créés depuis start()
+        :return: True si la recherche doit s'arrêter (la raison est gardée dans stop_reason)
+        """
+        if self.stop_reason is not None:
+            # Déjà arrêtée (stop) : la première raison est gardée
+            return True
+        if self.iterations is not None and iterations >= self.iterations:
+            self.stop_reason = "iterations"
+        elif self.nodes is not None and nodes >= self.nodes:
+            self.stop_reason = "nodes"
+        elif self.seconds is not None and self.elapsed() >= self.seconds:
+            self.stop_reason = "time"
+        elif self.stop_event is not None and self.stop_event.is_set():
+            self.stop_reason = "stopped"
+        return self.stop_reason is not None
+
+    def stop(self, reason):
+        """
+        Arrête la recherche avant ses limites (par exemple une racine prouvée, voir solver.py).
+        """
+        self.stop_reason = reason
+
+    def remaining(self, iterations):
+        """
+        Nombre d'itérations encore permises par la limite d'itérations (None si pas de limite).
+        """
+        return None if self.iterations is None else max(self.iterations - iterations, 0)
+
+    def remaining_seconds(self):
+        """
+        Temps encore permis par la limite de temps (None si pas de limite).
+        """
+        return None if self.seconds is None else max(self.seconds - self.elapsed(), 0.0)
+
+    def remaining_estimate(self, iterations):
+        """
+        Itérations qui peuvent encore avoir lieu : limite d'itérations, et limite de temps convertie
+        au rythme observé depuis start() (None si aucune des deux n'est fixée ; la limite de nœuds
+        ne borne pas les itérations, une itération pouvant ne créer aucun nœud).
+        """
+        estimates = []
+        if self.iterations is not None:
+            estimates.append(self.remaining(iterations))
+        if self.seconds is not None:
+            elapsed = self.elapsed()
+            if iterations > 0 and elapsed > 0:
+                estimates.append(int(iterations / elapsed * self.remaining_seconds()) + 1)
+            elif self.iterations is None:
+                return None
+        return min(estimates) if estimates else None
+
+    def report(self, iterations, nodes):
+        """
+        Bilan de la recherche : itérations, nœuds créés, durée, itérations/s et nœuds/s, et budget
+        restant à l'arrêt (itérations et secondes, None sans limite correspondante), que l'appelant
+        peut reporter ailleurs (coup suivant, réflexion anticipée) après un arrêt anticipé.
+        """
+        seconds = self.elapsed()
+        return {
+            "iterations": iterations,
+            "nodes": nodes,
+            "seconds": seconds,
+            "iterations_per_sec": iterations / seconds if seconds > 0 else 0.0,
+            "nps": nodes / seconds if seconds > 0 else 0.0,
+            "stop_reason": self.stop_reason,
+            "remaining_iterations": self.remaining(iterations),
+            "remaining_seconds": self.remaining_seconds(),
+        }
+
+
+class EarlyStop:
+    """
+    Arrêt anticipé de la recherche à la racine (MCTS(early_stop=...)) :
+
+    - "decided" : l'enfant le plus visité a plus d'avance sur le deuxième que de visites encore
+      possibles dans le budget (SearchBudget.remaining_estimate) ; le coup joué ne peut plus changer ;
+    - "stable" (si stability_window) : d'une fenêtre de stability_window itérations à la suivante,
+      le coup le plus visité est le même et sa part des visites a varié de moins de stability_tolerance.
+      Ce critère-là est une heuristique : le coup pourrait encore changer.
+
+    Les compteurs (recherches, arrêts, itérations épargnées) s'accumulent d'une recherche à l'autre,
+    par exemple sur toute une partie.
+    """
+
+    def __init__(self, stability_window=None, stability_tolerance=0.01):
+        """
+        :param stability_window: itérations entre deux mesures de la part de visites (None : pas de critère de stabilité)
+        :param stability_tolerance: variation maximale de la part de visites du meilleur coup sur une fenêtre
+        """
+        self.stability_window = stability_window
+        self.stability_tolerance = stability_tolerance
+        self.searches = 0
+        self.stops = {"decided": 0, "stable": 0}
+        self.saved_iterations = 0
+        self._last_share = None
+        self._next_window = 0
+
+    def start(self, budget):
+        """
+        Début d'une recherche. Sans limite d'itérations ni de temps (réflexion anticipée, go infinite),
+        il n'y a rien à épargner : la recherche n'est pas comptée et ne sera pas arrêtée.
+        """
+        self._last_share = None
+        self._next_window = self.stability_window or 0
+        if budget.iterations is not None or budget.seconds is not None:
+            self.searches += 1
+
+    def check(self, root, budget, iterations, visits_per_iteration=1):
+        """
+        :param iterations: itérations effectuées depuis le début de la recherche
+        :param visits_per_iteration: visites ajoutées à la racine par itération (rollouts_per_leaf)
+        :return: "decided", "stable", ou None si la recherche doit continuer
+        """
+        remaining = budget.remaining_estimate(iterations)
+        if not remaining:
+            return None
+        best = None
+        first = second = 0
+        for child in root.children:
+            visits = child.visits
+            if visits > first:
+                best, first, second = child, visits, first
+            elif visits > second:
+                second = visits
+        if best is None:
+            return None
+        if first - second > remaining * visits_per_iteration:
+            return self._stopped("decided", remaining)
+        window = self.stability_window
+        if window and iterations >= self._next_window:
+            self._next_window = iterations + window
+            share = (best.move, first / max(root.visits, 1))
+            last, self._last_share = self._last_share, share
+            if last is not None and last[0] == share[0] and abs(last[1] - share[1]) < self.stability_tolerance:
+                return self._stopped("stable", remaining)
+        return None
+
+    def _stopped(self, reason, remaining):
+        self.stops[reason] += 1
+        self.saved_iterations += remaining
+        return reason
+
+    def report(self):
+        stopped = sum(self.stops.values())
+        return {
+            "searches": self.searches,
+            "decided": self.stops["decided"],
+            "stable": self.stops["stable"],
+            "stop_rate": stopped / self.searches if self.searches else 0.0,
+            "saved_iterations": self.saved_iterations,
+            "saved_per_search": self.saved_iterations / self.searches if self.searches else 0.0,
+        }
+
+
+def format_early_stop_report(report):
+    return (f"{report['decided'] + report['stable']} arrêts anticipés sur {report['searches']} recherches "
+            f"({report['decided']} joués d'avance, {report['stable']} stables), "
+            f"{report['saved_iterations']} itérations épargnées ({report['saved_per_search']:.0f} par recherche)")
+
+
+def format_report(report):
+    """
+    Bilan d'une recherche sur une ligne, pour l'affichage en cours de partie.
+    """
+    line = (f"{report['iterations']} itérations, {report['nodes']} nœuds en {report['seconds']:.2f} s "
+            f"({report['iterations_per_sec']:.0f} itérations/s, {report['nps']:.0f} nœuds/s, "
+            f"arrêt : {report['stop_reason']})")
+    if report.get("remaining_iterations"):
+        line += f", {report['remaining_iterations']} itérations non utilisées"
+    if report.get("remaining_seconds"):
+        line += f", {report['remaining_seconds']:.2f} s non utilisées"
+    return line
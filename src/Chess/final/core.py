@@ -0,0 +1,313 @@
+import math
+import time
+from abc import ABC, abstractmethod
+
+from budget import SearchBudget
+from nodecache import ChildIndexMixin
+from profiling import NULL_PHASE
+
+
+class GameAdapter(ABC):
+    """
+    Protocole entre MCTSCore et un jeu. L'adaptateur tient un état de travail, celui de la racine
+    entre deux itérations ; une itération y joue les actions du chemin puis une simulation, et
+    l'état est ramené à la racine par restore(checkpoint()) : des undo successifs (pop d'un
+    chess.Board) ou la restauration d'une copie (cloneState d'un émulateur ALE), au choix du jeu.
+
+    Les valeurs (récompenses et simulations) sont comptées du point de vue d'un seul joueur, celui
+    pour qui l'on cherche, à tous les niveaux de l'arbre, comme dans mcts.MCTS.
+    Voir games.py pour les adaptateurs python-chess et ALE.
+    """
+
+    @abstractmethod
+    def legal_actions(self):
+        """
+        :return: nouvelle liste des actions jouables dans l'état de travail (MCTSCore la consomme)
+        """
+
+    @abstractmethod
+    def apply(self, action):
+        """
+        Joue action sur l'état de travail.
+
+        :return: récompense immédiate (0 pour un jeu qui ne note que la fin de partie)
+        """
+
+    @abstractmethod
+    def checkpoint(self):
+        """
+        :return: jeton permettant de revenir à l'état de travail actuel avec restore
+        """
+
+    @abstractmethod
+    def restore(self, token):
+        """
+        Ramène l'état de travail à celui du jeton (voir checkpoint).
+        """
+
+    @abstractmethod
+    def is_terminal(self, actions):
+        """
+        :param actions: actions jouables de l'état de travail (legal_actions, déjà calculées)
+        :return: True si la partie est terminée dans l'état de travail
+        """
+
+    @abstractmethod
+    def rollout(self):
+        """
+        Simulation depuis l'état de travail (qui peut être modifié : MCTSCore le restaure ensuite).
+        Dans un état terminal, renvoie directement la valeur de la fin de partie.
+
+        :return: valeur de la simulation, hors récompenses déjà reçues sur le chemin
+        """
+
+    @abstractmethod
+    def key(self):
+        """
+        :return: clé hashable de l'état de travail, identique pour deux chemins qui y mènent
+        """
+
+    @abstractmethod
+    def load(self, state):
+        """
+        Remplace l'état de travail par state (position réelle de la partie, dans la forme propre
+        au jeu : chess.Board, état ALE, ...).
+        """
+
+
+class CoreNode(ChildIndexMixin):
+    """
+    Nœud de MCTSCore : aucune référence à l'état du jeu, seulement l'action qui y mène (move,
+    nom partagé avec les nœuds de mcts.MCTS pour budget.EarlyStop et uci.principal_variation),
+    les actions pas encore développées et les statistiques. Les enfants sont indexés par action
+    (nodecache.ChildIndexMixin) pour le re-enracinement.
+    """
+
+    __slots__ = ("move", "parent", "children", "untried_moves", "terminal", "visits", "value", "_children_by_move")
+
+    def __init__(self, move, parent, untried_moves, terminal):
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.untried_moves = untried_moves
+        self.terminal = terminal
+        self.visits = 0
+        self.value = 0.0
+        self._children_by_move = None
+
+    @property
+    def wins(self):
+        # Nom des gains cumulés dans les nœuds de mcts.MCTS
+        return self.value
+
+    def is_terminal_node(self):
+        return self.terminal
+
+
+class MCTSCore:
+    """
+    MCTS indépendant du jeu : UCB1 à la sélection, un enfant développé par itération, une
+    simulation de l'adaptateur (GameAdapter), rétropropagation de la somme des récompenses du
+    chemin et de la simulation. Mêmes budgets (SearchBudget), même arrêt anticipé
+    (budget.EarlyStop), mêmes statistiques (self.stats) et même re-enracinement pour tous les jeux.
+
+    La boucle est écrite d'un seul tenant (pas d'appel de méthode par nœud traversé) : c'est la
+    boucle à optimiser pour tous les jeux à la fois. mcts.MCTS s'en sert pour ses réglages par
+    défaut ; les options propres aux échecs (arène, transpositions, solveur, RAVE, rollouts
+    parallèles, ...) y gardent leur propre boucle.
+    """
+
+    def __init__(self, game, iterations=1000, exploration_constant=1.41, early_stop=None, profiler=None):
+        """
+        :param game: GameAdapter, dans l'état de la racine
+        :param iterations: itérations d'une recherche sans autre limite
+        :param exploration_constant: constante C d'UCB1
+        :param early_stop: budget.EarlyStop, ou None pour toujours épuiser le budget
+        :param profiler: profiling.SearchProfiler de chaque recherche (phases de mcts.MCTS, plus les
+                         méthodes de l'adaptateur déclarées par SearchProfiler.track, rapport dans
+                         self.stats["profile"]) ; None : pas de mesure
+        """
+        self.game = game
+        self.iterations = iterations
+        self.exploration_constant = exploration_constant
+        self.early_stop = early_stop
+        self.profiler = profiler
+        self.nodes_created = 0
+        self.stats = {}
+        self.new_root()
+
+    def new_root(self):
+        """
+        Nouvel arbre, dont la racine est l'état de travail de l'adaptateur.
+        """
+        game = self.game
+        actions = game.legal_actions()
+        self.root = CoreNode(None, None, actions, game.is_terminal(actions))
+        self._root_token = game.checkpoint()
+        self.nodes_created += 1
+        return self.root
+
+    def advance(self, *actions):
+        """
+        Joue actions depuis la racine (coups réels de la partie) et garde le sous-arbre atteint ;
+        un nouvel arbre est créé dès qu'une action n'a pas été développée.
+        """
+        game = self.game
+        for action in actions:
+            game.apply(action)
+            child = self.root.child_for(action)
+            if child is None:
+                self.new_root()
+            else:
+                child.parent = None
+                self.root = child
+                self._root_token = game.checkpoint()
+        return self.root
+
+    def sync(self, state, depth=2):
+        """
+        Place l'adaptateur dans state (position réelle de la partie) et garde le sous-arbre dont
+        l'état a la même clé (GameAdapter.key), cherché jusqu'à depth actions sous la racine :
+        l'appelant n'a pas besoin de connaître les actions jouées entre-temps (coup de l'adversaire).
+
+        :return: True si un sous-arbre a été gardé
+        """
+        game = self.game
+        # Clés des nœuds proches de la racine, calculées avant que l'état de la racine soit remplacé
+        keyed = [(game.key(), self.root)]
+        level = [self.root]
+        for _ in range(depth):
+            below = []
+            for node in level:
+                for child in node.children:
+                    path = self._path(child)
+                    for action in path:
+                        game.apply(action)
+                    keyed.append((game.key(), child))
+                    game.restore(self._root_token)
+                    below.append(child)
+            level = below
+        game.load(state)
+        target = game.key()
+        for key, node in keyed:
+            if key == target:
+                node.parent = None
+                self.root = node
+                self._root_token = game.checkpoint()
+                return True
+        self.new_root()
+        return False
+
+    def _path(self, node):
+        path = []
+        while node.parent is not None:
+            path.append(node.move)
+            node = node.parent
+        path.reverse()
+        return path
+
+    def best_action(self, iterations=None, seconds=None, nodes=None, stop_event=None):
+        """
+        Effectue des itérations dans la limite du budget (voir mcts.MCTS.best_move), puis retourne
+        l'action la plus visitée depuis la racine. Le bilan est rangé dans self.stats.
+        """
+        if iterations is None and seconds is None and nodes is None and stop_event is None:
+            iterations = self.iterations
+        budget = SearchBudget(iterations, seconds, nodes, stop_event).start()
+        first_node = self.nodes_created
+        if self.early_stop is not None:
+            self.early_stop.start(budget)
+        self.stats = {"iterations": 0, "rollouts": 0, "rollout_seconds": 0.0}
+        if self.profiler is not None:
+            self.profiler.start()
+        try:
+            self._search(budget)
+        finally:
+            if self.profiler is not None:
+                self.profiler.stop()
+        seconds = self.stats["rollout_seconds"]
+        self.stats["rollouts_per_sec"] = self.stats["rollouts"] / seconds if seconds > 0 else 0.0
+        self.stats.update(budget.report(self.stats["iterations"], self.nodes_created - first_node))
+        if self.profiler is not None:
+            self.stats["profile"] = self.profiler.report()
+        return self.current_best_action()
+
+    def current_best_action(self):
+        """
+        Action de l'enfant le plus visité de la racine, ou à défaut (aucune itération effectuée)
+        une action jouable.
+        """
+        if not self.root.children:
+            return self.root.untried_moves[-1] if self.root.untried_moves else None
+        return max(self.root.children, key=lambda child: child.visits).move
+
+    def _search(self, budget):
+        game = self.game
+        apply = game.apply
+        legal_actions = game.legal_actions
+        is_terminal = game.is_terminal
+        rollout = game.rollout
+        restore = game.restore
+        root_token = self._root_token
+        root = self.root
+        c = self.exploration_constant
+        log = math.log
+        sqrt = math.sqrt
+        clock = time.perf_counter
+        early_stop = self.early_stop
+        # Phases du profileur (mêmes noms que mcts.MCTS) ; sans profileur, un contexte sans effet
+        phase = self.profiler.phase if self.profiler is not None else _no_phase
+        rollout_seconds = 0.0
+        iteration = 0
+        first_node = self.nodes_created
+        nodes_created = first_node
+        while not budget.exhausted(iteration, nodes_created - first_node):
+            # 1. Sélection (UCB1) et expansion d'une action non explorée
+            node = root
+            reward = 0.0
+            with phase("selection"):
+                while not node.terminal:
+                    untried = node.untried_moves
+                    if untried:
+                        with phase("expansion"):
+                            action = untried.pop()
+                            reward += apply(action)
+                            actions = legal_actions()
+                            node = node.add_child(CoreNode(action, node, actions, is_terminal(actions)))
+                        nodes_created += 1
+                        break
+                    log_visits = log(node.visits)
+                    best, best_score = None, -math.inf
+                    for child in node.children:
+                        # Chaque enfant a été visité par l'itération qui l'a développé
+                        visits = child.visits
+                        score = child.value / visits + c * sqrt(log_visits / visits)
+                        if score > best_score:
+                            best, best_score = child, score
+                    node = best
+                    reward += apply(node.move)
+            # 2. Simulation, puis retour de l'état de travail à la racine
+            start = clock()
+            with phase("simulation"):
+                value = reward + rollout()
+            rollout_seconds += clock() - start
+            restore(root_token)
+            # 3. Rétropropagation
+            with phase("backpropagation"):
+                while node is not None:
+                    node.visits += 1
+                    node.value += value
+                    node = node.parent
+            iteration += 1
+            self.nodes_created = nodes_created
+            if early_stop is not None:
+                reason = early_stop.check(root, budget, iteration, 1)
+                if reason is not None:
+                    budget.stop(reason)
+        self.nodes_created = nodes_created
+        self.stats["iterations"] = self.stats["rollouts"] = iteration
+        self.stats["rollout_seconds"] = rollout_seconds
+
+
+def _no_phase(name):
+    return NULL_PHASE
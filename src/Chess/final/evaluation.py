@@ -0,0 +1,240 @@
+import chess
+
+from utils import PV, DRAW_VALUE
+
+# Valeurs de utils.PV indexées par type de pièce (chess.PAWN = 1, ..., chess.KING = 6)
+PIECE_VALUES = (0, PV['pawn'], PV['knight'], PV['bishop'], PV['rook'], PV['queen'], 0)
+
+# Tables pièce-case (« Simplified Evaluation Function »), en centipions, vues par les blancs :
+# la première ligne est la 8e rangée. Indexées par type de pièce.
+PIECE_SQUARE_TABLES = (
+    None,
+    (  # Pion
+         0,   0,   0,   0,   0,   0,   0,   0,
+        50,  50,  50,  50,  50,  50,  50,  50,
+        10,  10,  20,  30,  30,  20,  10,  10,
+         5,   5,  10,  25,  25,  10,   5,   5,
+         0,   0,   0,  20,  20,   0,   0,   0,
+         5,  -5, -10,   0,   0, -10,  -5,   5,
+         5,  10,  10, -20, -20,  10,  10,   5,
+         0,   0,   0,   0,   0,   0,   0,   0,
+    ),
+    (  # Cavalier
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20,   0,   0,   0,   0, -20, -40,
+        -30,   0,  10,  15,  15,  10,   0, -30,
+        -30,   5,  15,  20,  20,  15,   5, -30,
+        -30,   0,  15,  20,  20,  15,   0, -30,
+        -30,   5,  10,  15,  15,  10,   5, -30,
+        -40, -20,   0,   5,   5,   0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50,
+    ),
+    (  # Fou
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10,   0,   0,   0,   0,   0,   0, -10,
+        -10,   0,   5,  10,  10,   5,   0, -10,
+        -10,   5,   5,  10,  10,   5,   5, -10,
+        -10,   0,  10,  10,  10,  10,   0, -10,
+        -10,  10,  10,  10,  10,  10,  10, -10,
+        -10,   5,   0,   0,   0,   0,   5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20,
+    ),
+    (  # Tour
+         0,   0,   0,   0,   0,   0,   0,   0,
+         5,  10,  10,  10,  10,  10,  10,   5,
+        -5,   0,   0,   0,   0,   0,   0,  -5,
+        -5,   0,   0,   0,   0,   0,   0,  -5,
+        -5,   0,   0,   0,   0,   0,   0,  -5,
+        -5,   0,   0,   0,   0,   0,   0,  -5,
+        -5,   0,   0,   0,   0,   0,   0,  -5,
+         0,   0,   0,   5,   5,   0,   0,   0,
+    ),
+    (  # Dame
+        -20, -10, -10,  -5,  -5, -10, -10, -20,
+        -10,   0,   0,   0,   0,   0,   0, -10,
+        -10,   0,   5,   5,   5,   5,   0, -10,
+         -5,   0,   5,   5,   5,   5,   0,  -5,
+          0,   0,   5,   5,   5,   5,   0,  -5,
+        -10,   5,   5,   5,   5,   5,   0, -10,
+        -10,   0,   5,   0,   0,   0,   0, -10,
+        -20, -10, -10,  -5,  -5, -10, -10, -20,
+    ),
+    (  # Roi (milieu de partie)
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+         20,  20,   0,   0,   0,   0,  20,  20,
+         20,  30,  10,   0,   0,  10,  30,  20,
+    ),
+)
+
+
+def _table_value(tables, piece_type, square, color):
+    # Les tables commencent par la 8e rangée : square ^ 56 pour les blancs, la case miroir pour les noirs
+    return tables[piece_type][square ^ 56 if color == chess.WHITE else square]
+
+
+class MaterialBoard(chess.Board):
+    """
+    Plateau qui tient à jour, à chaque pose ou retrait de pièce, le bilan matériel
+    (nombre de pièces blanches moins noires, par type) et, en option, un terme de tables
+    pièce-case. push met à jour le bilan en O(1) et pop restaure celui de la position précédente,
+    sans jamais reparcourir l'échiquier. Les copies (copy) restent des MaterialBoard.
+
+    utils.material_score, Node.update (mode heuristique) et MCTS.material_diff (Chess/stockfish)
+    utilisent automatiquement ce bilan lorsqu'on leur passe un MaterialBoard, avec des scores identiques.
+    """
+
+    def __init__(self, fen=chess.STARTING_FEN, *, chess960=False, piece_square_tables=None):
+        """
+        :param fen: position de départ (comme chess.Board)
+        :param piece_square_tables: None (matériel seul) ou tables pièce-case indexées par type
+                                    de pièce (par exemple PIECE_SQUARE_TABLES)
+        """
+        self.piece_square_tables = piece_square_tables
+        self._eval_stack = []
+        super().__init__(fen, chess960=chess960)
+
+    @classmethod
+    def from_board(cls, board, piece_square_tables=None):
+        """
+        MaterialBoard dans la même position que `board`, historique des coups compris
+        (nécessaire à la détection des répétitions).
+        """
+        root = board.root()
+        result = cls(root.fen(), chess960=board.chess960, piece_square_tables=piece_square_tables)
+        for move in board.move_stack:
+            result.push(move)
+        return result
+
+    def _refresh(self):
+        """
+        Recalcule entièrement le bilan (après une modification en bloc des bitboards).
+        """
+        self.balance = [0] * 7
+        self.positional = 0
+        if not self.occupied:
+            return      # Plateau vide (cas de chaque copie, avant recopie des bitboards)
+        white = self.occupied_co[chess.WHITE]
+        black = self.occupied_co[chess.BLACK]
+        for piece_type in chess.PIECE_TYPES:
+            pieces = self.pieces_mask(piece_type, chess.WHITE) | self.pieces_mask(piece_type, chess.BLACK)
+            self.balance[piece_type] = chess.popcount(pieces & white) - chess.popcount(pieces & black)
+        tables = self.piece_square_tables
+        if tables is not None:
+            for square in chess.scan_forward(self.occupied):
+                color = bool(white & chess.BB_SQUARES[square])
+                value = _table_value(tables, self.piece_type_at(square), square, color)
+                self.positional += value if color == chess.WHITE else -value
+
+    # Pose et retrait d'une pièce : seuls points de passage de push pour modifier l'échiquier.
+    # Appels directs aux méthodes de python-chess plutôt que super() : on est sur le chemin de chaque coup.
+
+    def _remove_piece_at(self, square):
+        white = self.occupied_co[chess.WHITE] & chess.BB_SQUARES[square]
+        piece_type = chess.BaseBoard._remove_piece_at(self, square)
+        if piece_type:
+            sign = 1 if white else -1
+            self.balance[piece_type] -= sign
+            if self.piece_square_tables is not None:
+                color = chess.WHITE if white else chess.BLACK
+                self.positional -= sign * _table_value(self.piece_square_tables, piece_type, square, color)
+        return piece_type
+
+    def _set_piece_at(self, square, piece_type, color, promoted=False):
+        chess.BaseBoard._set_piece_at(self, square, piece_type, color, promoted)
+        sign = 1 if color == chess.WHITE else -1
+        self.balance[piece_type] += sign
+        if self.piece_square_tables is not None:
+            self.positional += sign * _table_value(self.piece_square_tables, piece_type, square, color)
+
+    # Modifications en bloc : recalcul complet
+
+    def _clear_board(self):
+        super()._clear_board()
+        self._refresh()
+
+    def _reset_board(self):
+        super()._reset_board()
+        self._refresh()
+
+    def _set_board_fen(self, fen):
+        super()._set_board_fen(fen)
+        self._refresh()
+
+    def _set_piece_map(self, pieces):
+        super()._set_piece_map(pieces)
+        self._refresh()
+
+    def _set_chess960_pos(self, scharnagl):
+        super()._set_chess960_pos(scharnagl)
+        self._refresh()
+
+    def apply_transform(self, f):
+        super().apply_transform(f)
+        self._refresh()
+
+    def apply_mirror(self):
+        super().apply_mirror()
+        self._refresh()
+
+    # Pile des bilans, parallèle à move_stack
+
+    def push(self, move):
+        self._eval_stack.append((self.balance[:], self.positional))
+        chess.Board.push(self, move)
+
+    def pop(self):
+        move = super().pop()
+        self.balance, self.positional = self._eval_stack.pop()
+        return move
+
+    def clear_stack(self):
+        super().clear_stack()
+        self._eval_stack.clear()
+
+    def copy(self, *, stack=True):
+        board = super().copy(stack=stack)
+        board.piece_square_tables = self.piece_square_tables
+        board.balance = self.balance[:]
+        board.positional = self.positional
+        if stack:
+            stack = len(self.move_stack) if stack is True else stack
+            board._eval_stack = self._eval_stack[-stack:]
+        return board
+
+    def root(self):
+        board = super().root()
+        board.piece_square_tables = self.piece_square_tables
+        board._refresh()
+        return board
+
+    # Évaluations
+
+    def material(self, piece_values=PIECE_VALUES):
+        """
+        Matériel des blancs moins celui des noirs, du point de vue des blancs.
+
+        :param piece_values: valeurs indexées par type de pièce
+        """
+        balance = self.balance
+        return (piece_values[chess.PAWN] * balance[chess.PAWN] +
+                piece_values[chess.KNIGHT] * balance[chess.KNIGHT] +
+                piece_values[chess.BISHOP] * balance[chess.BISHOP] +
+                piece_values[chess.ROOK] * balance[chess.ROOK] +
+                piece_values[chess.QUEEN] * balance[chess.QUEEN] +
+                piece_values[chess.KING] * balance[chess.KING])
+
+    def material_score(self, color_player):
+        """
+        Même score que utils.material_score (plus le terme pièce-case s'il est activé),
+        sans reparcourir l'échiquier.
+        """
+        # Sans pion, tour ni dame, il peut y avoir matériel insuffisant : on laisse python-chess trancher
+        if not (self.pawns | self.rooks | self.queens) and self.is_insufficient_material():
+            return DRAW_VALUE
+        value = self.material() + self.positional
+        return value if color_player == self.turn else -value
@@ -0,0 +1,143 @@
+import random
+
+from core import GameAdapter
+from mcts import random_rollout
+from nodecache import position_outcome
+from playout import BitboardRollout
+from transposition import position_key
+
+# Répétitions de chaque action par pas d'un AtariEnv créé sans frameskip
+DEFAULT_FRAMESKIP = 4
+
+
+class ChessGame(GameAdapter):
+    """
+    Adaptateur python-chess de core.MCTSCore : un seul plateau de travail, les coups du chemin y
+    sont joués (push) puis dépilés (pop) jusqu'à la racine, comme le mode "replay" de mcts.MCTS.
+    Les simulations sont celles de mcts.random_rollout (par défaut sur bitboards), du point de
+    vue de color_player.
+    """
+
+    def __init__(self, board, color_player=None, rollout=None):
+        """
+        :param board: position de la racine (copiée)
+        :param color_player: camp pour lequel on cherche (None : le camp au trait)
+        :param rollout: rollout.Rollout des simulations (None : playout.BitboardRollout())
+        """
+        self.board = board.copy()
+        self.color_player = board.turn if color_player is None else color_player
+        self.rollout_policy = rollout or BitboardRollout()
+        self.plies = 0      # Demi-coups joués par les simulations depuis la création
+
+    def legal_actions(self):
+        return list(self.board.legal_moves)
+
+    def apply(self, action):
+        self.board.push(action)
+        return 0.0
+
+    def checkpoint(self):
+        return len(self.board.move_stack)
+
+    def restore(self, token):
+        board = self.board
+        for _ in range(len(board.move_stack) - token):
+            board.pop()
+
+    def is_terminal(self, actions):
+        return position_outcome(self.board, bool(actions)) is not None
+
+    def rollout(self):
+        value, plies = random_rollout(self.board, self.color_player, self.rollout_policy)
+        self.plies += plies
+        return value
+
+    def key(self):
+        return position_key(self.board)
+
+    def load(self, state):
+        self.board = state.copy()
+
+
+class ALEGame(GameAdapter):
+    """
+    Adaptateur ALE (gymnasium + ale_py) de core.MCTSCore, pour les jeux Atari de TicTacToe3D et
+    Queen : l'émulateur d'un environnement de simulation est piloté directement (ale.act), sans
+    les wrappers gymnasium ni le calcul des observations ; l'état est ramené à la racine par
+    cloneState / restoreState. Les actions sont les indices de l'espace d'actions de
+    l'environnement (celles de env.step), lu par l'API publique (get_action_meanings, env.spec). Les valeurs sont les récompenses du jeu ; la simulation
+    joue des actions au hasard jusqu'à la fin de la partie ou max_rollout_steps pas.
+
+    Avec les actions « collantes » des environnements v5 (repeat_action_probability), un même
+    chemin ne mène pas toujours au même état : l'arbre est alors « en boucle ouverte ».
+    """
+
+    def __init__(self, env, max_rollout_steps=100, rng=None):
+        """
+        :param env: environnement gymnasium ALE (gym.make("ALE/...")) réservé à la recherche, déjà reset
+        :param max_rollout_steps: nombre maximal de pas (env.step) d'une simulation (None : jusqu'à la fin de la partie)
+        :param rng: générateur random.Random des simulations (None : le module random)
+        """
+        # Import local : ale_py n'est utile qu'aux jeux Atari
+        from ale_py import Action
+
+        unwrapped = env.unwrapped
+        self.ale = unwrapped.ale
+        # Actions de l'émulateur, dans l'ordre des indices de env.step
+        self.action_set = [getattr(Action, name) for name in unwrapped.get_action_meanings()]
+        # Répétitions de chaque action par pas, comme AtariEnv.step (entier, ou intervalle tiré à chaque
+        # pas) : réglage donné à gym.make, sinon la valeur par défaut d'AtariEnv
+        kwargs = env.spec.kwargs if env.spec is not None else {}
+        self.frameskip = kwargs.get("frameskip", DEFAULT_FRAMESKIP)
+        self.max_rollout_steps = max_rollout_steps
+        self.rng = rng or random
+
+    def _repeats(self):
+        frameskip = self.frameskip
+        if isinstance(frameskip, int):
+            return frameskip
+        return self.rng.randint(frameskip[0], frameskip[1] - 1)
+
+    def legal_actions(self):
+        return list(range(len(self.action_set)))
+
+    def apply(self, action):
+        ale = self.ale
+        ale_action = self.action_set[action]
+        reward = 0.0
+        for _ in range(self._repeats()):
+            reward += ale.act(ale_action)
+            if ale.game_over():
+                break
+        return reward
+
+    def checkpoint(self):
+        return self.ale.cloneState()
+
+    def restore(self, token):
+        self.ale.restoreState(token)
+
+    def is_terminal(self, actions):
+        return not actions or self.ale.game_over()
+
+    def rollout(self):
+        ale = self.ale
+        apply = self.apply
+        choice = self.rng.randrange
+        count = len(self.action_set)
+        limit = self.max_rollout_steps
+        total = 0.0
+        steps = 0
+        while not ale.game_over() and (limit is None or steps < limit):
+            total += apply(choice(count))
+            steps += 1
+        return total
+
+    def key(self):
+        return self.ale.getRAM().tobytes()
+
+    def load(self, state):
+        """
+        :param state: état ALE de l'environnement réel (env.unwrapped.clone_state())
+        """
+        self.ale.restoreState(state)
@@ -1,10 +1,23 @@
+import argparse
 import chess
 import random
 import math
+import os
 
 from mcts import MCTS
-from node import Node
 from utils import *
+from transposition import TranspositionTable
+from parallel import RootParallelMCTS
+from evaluation import MaterialBoard, PIECE_SQUARE_TABLES
+from budget import EarlyStop, format_report, format_early_stop_report
+from rollout import Rollout
+from playout import BitboardRollout
+from memory import TreeBudget, format_memory_report
+from ponder import Ponderer
+from treestore import TreeStore, format_store_report
+from profiling import SearchProfiler, format_profile
+from nodecache import format_cache_report
+from solver import format_solver_report
 
 def update_mcts_root(mcts_instance, move, board):
     """
@@ -12,19 +25,44 @@ def update_mcts_root(mcts_instance, move, board):
     correspondant au coup joué (pour la persistance entre les coups).
     Si le coup n'existe pas dans l'arbre, on recrée une nouvelle instance de MCTS.
     """
-    found = False
-    for child in mcts_instance.root.children:
-        if child.move == move:
-            child.parent = None  # détachement du sous-arbre
-            mcts_instance.root = child
-            found = True
-            break
-    if not found:
+    if mcts_instance.core is not None:
+        # Réglages par défaut (core.MCTSCore) : le coup est joué sur son plateau de travail, qui
+        # est dans la position de la racine, et le sous-arbre atteint est gardé
+        mcts_instance.core.advance(move)
+        return mcts_instance
+    # Index coup -> enfant de la racine : pas de parcours des enfants
+    child = mcts_instance.root.child_for(move)
+    if child is not None:
+        if mcts_instance.tree_budget is not None:
+            # Les sous-arbres abandonnés sortent du compte de nœuds
+            mcts_instance.tree_budget.rerooted(mcts_instance.root, child)
+        child.parent = None  # détachement du sous-arbre
+        mcts_instance.root = child
+    else:
         # Si le sous-arbre n'a pas été trouvé (cas improbable)
-        mcts_instance.root = Node(board)
+        mcts_instance.root = mcts_instance.new_root(board)
+        if mcts_instance.tree_budget is not None:
+            mcts_instance.tree_budget.reset(mcts_instance.root)
+    if mcts_instance.board_mode == "replay":
+        # Le plateau de travail doit suivre la nouvelle racine
+        mcts_instance.board = mcts_instance.search_board(board)
     return mcts_instance  # On retourne l'instance mise à jour.
 
-def main():
+def main(incremental_evaluation=False, max_tree_nodes=None, ponder=False, bitboard_rollouts=False,
+         use_solver=False, early_stop=False, tree_store_dir=None):
+    """
+    Partie entre un joueur humain et l'IA MCTS. Les modes optionnels sont désactivés par défaut
+    (comportement d'origine) et s'activent par paramètre ou par option de la ligne de commande.
+
+    :param incremental_evaluation: bilan matériel tenu à jour à chaque coup (voir evaluation.py)
+    :param max_tree_nodes: nombre maximal de nœuds gardés d'un coup à l'autre (None : illimité, voir memory.py)
+    :param ponder: l'IA continue de chercher pendant le tour de l'humain (voir ponder.py)
+    :param bitboard_rollouts: simulations jouées sur bitboards plutôt que sur le plateau python-chess (voir playout.py)
+    :param use_solver: mats prouvés et remontés dans l'arbre, nœuds prouvés écartés (voir solver.py)
+    :param early_stop: arrêt dès que le meilleur coup ne peut plus être rattrapé (voir budget.EarlyStop)
+    :param tree_store_dir: dossier des statistiques d'ouverture gardées d'une partie à l'autre
+                           (None : aucune, voir treestore.py)
+    """
     # Choix de la couleur pour le joueur humain
     human_color_input = ""
     while human_color_input.lower() not in ["w", "b"]:
@@ -32,25 +70,69 @@ def main():
     human_color = chess.WHITE if human_color_input.lower() == "w" else chess.BLACK
     ai_color = not human_color
 
-    # Création du plateau initial.
-    board = chess.Board()
-    
     # Paramètres de MCTS pour l'IA
     iterations = 1000          # Nombre d'itérations pour MCTS à chaque coup de l'IA
+    move_time = None           # Temps de réflexion maximal par coup, en secondes (remplace iterations)
+    max_nodes = None           # Nombre maximal de nœuds créés par coup (remplace iterations)
     use_heuristic = True
     heuristic_weight = 0.01
+    max_rollout_depth = None   # Profondeur maximale des simulations en demi-coups (None : jusqu'à la fin)
+    adjudication_margin = None # Écart matériel (centipions) au-delà duquel une simulation est adjugée
+    piece_square_tables = False     # Ajoute les tables pièce-case à l'évaluation (change les scores)
+    use_transpositions = False  # Partage des statistiques entre positions transposées (voir transposition.py)
+    root_parallel_workers = 0   # > 0 : recherche parallèle à la racine sur ce nombre de processus (voir parallel.py)
+    store_plies = 16            # Les arbres des store_plies premiers demi-coups sont enregistrés...
+    store_depth = 3             # ... sur store_depth niveaux
+    profile_search = False      # Temps de chaque phase et des primitives python-chess (voir profiling.py)
+    use_rave = False            # Statistiques « all moves as first » mélangées à la sélection (voir rave.py ;
+                                # demande use_heuristic = False et use_transpositions = False)
+    stability_window = None     # Itérations : arrêt aussi quand la part de visites du meilleur coup se stabilise
+
+    # Création du plateau initial.
+    if incremental_evaluation:
+        board = MaterialBoard(piece_square_tables=PIECE_SQUARE_TABLES if piece_square_tables else None)
+    else:
+        board = chess.Board()
 
     print("Début de la partie !")
     print(board)
 
     # Création persistante de l'instance MCTS à partir de la position initiale.
+    transposition_table = TranspositionTable() if use_transpositions else None
+    tree_store = None
+    if tree_store_dir is not None:
+        # Les gains sont comptés du point de vue de l'IA : un fichier par couleur et par mode d'évaluation
+        store_name = "opening_{}_{}.mcts".format("white" if ai_color == chess.WHITE else "black",
+                                                 "heuristic" if use_heuristic else "rollout")
+        tree_store = TreeStore(os.path.join(tree_store_dir, store_name))
+        print("Statistiques d'ouverture :", format_store_report(tree_store.report()))
     mcts = MCTS(board, color_player=ai_color, iterations=iterations, 
-                use_heuristic=use_heuristic, heuristic_weight=heuristic_weight)
+                use_heuristic=use_heuristic, heuristic_weight=heuristic_weight,
+                transposition_table=transposition_table, incremental_evaluation=incremental_evaluation,
+                rollout=(BitboardRollout if bitboard_rollouts else Rollout)(
+                    max_depth=max_rollout_depth, adjudication_margin=adjudication_margin),
+                tree_budget=TreeBudget(max_tree_nodes) if max_tree_nodes else None,
+                tree_store=tree_store, profiler=SearchProfiler() if profile_search else None,
+                solver=use_solver, rave=use_rave,
+                early_stop=EarlyStop(stability_window) if early_stop else None)
+    banked_iterations = 0       # Itérations épargnées par l'arrêt anticipé, reportées sur le coup suivant
+    # Pool de processus créé une seule fois pour toute la partie.
+    root_parallel = None
+    if root_parallel_workers > 0:
+        root_parallel = RootParallelMCTS(workers=root_parallel_workers, iterations=iterations,
+                                         use_heuristic=use_heuristic, heuristic_weight=heuristic_weight)
 
     while not board.is_game_over():
         if board.turn == human_color:
             print("\nVotre tour.")
+            # Réflexion anticipée pendant la saisie (l'arbre reste idle avec la recherche parallèle)
+            ponderer = Ponderer(mcts).start() if ponder and root_parallel is None else None
             move = user_move(board)
+            if ponderer is not None:
+                pondered = ponderer.stop()
+                reused = ponderer.pondered_visits(move)
+                print(f"Réflexion pendant votre tour : {pondered} itérations, "
+                      f"dont {reused} dans la position que vous avez jouée")
             board.push(move)
             # Mettre à jour l'arbre MCTS en fonction du coup joué par l'humain.
             mcts = update_mcts_root(mcts, move, board)
@@ -58,19 +140,53 @@ def main():
             print("Évaluation de la position après votre coup :", material_score(board, human_color))
         else:
             print("\nTour de l'IA (MCTS). Réflexion en cours ...")
-            # Ici, on délègue à l'arbre déjà existant afin de ne pas repartir de zéro.
-            best_move = mcts.best_move()
+            if root_parallel is not None:
+                best_move = root_parallel.best_move(board, color_player=ai_color, seconds=move_time, nodes=max_nodes)
+                stats = root_parallel.stats
+                print(f"Recherche parallèle : {stats['iterations']} itérations, {stats['nodes']} nœuds "
+                      f"sur {stats['workers']} processus en {stats['seconds']:.1f} s "
+                      f"({stats['iterations_per_sec']:.0f} itérations/s, {stats['nps']:.0f} nœuds/s)")
+            else:
+                # Ici, on délègue à l'arbre déjà existant afin de ne pas repartir de zéro.
+                warm_visits = mcts.root.visits
+                if move_time is None and max_nodes is None:
+                    best_move = mcts.best_move(iterations=iterations + banked_iterations)
+                    if mcts.early_stop is not None:
+                        # Seul l'arrêt anticipé épargne des itérations (pas l'arrêt du solveur)
+                        banked_iterations = min(mcts.stats["remaining_iterations"], iterations)
+                else:
+                    best_move = mcts.best_move(seconds=move_time, nodes=max_nodes)
+                print("Recherche :", format_report(mcts.stats))
+                if mcts.early_stop is not None:
+                    print("Arrêt anticipé :", format_early_stop_report(mcts.early_stop.report()))
+                if ponder and mcts.root.visits:
+                    print(f"Itérations héritées de l'arbre (coup précédent et réflexion anticipée) : {warm_visits} "
+                          f"sur {mcts.root.visits} ({warm_visits / mcts.root.visits:.0%})")
+                print(f"Simulations : longueur moyenne {mcts.stats['avg_rollout_length']:.1f} demi-coups, "
+                      f"{mcts.stats['rollouts_per_sec']:.1f} simulations/s")
+                print("Cache des nœuds :", format_cache_report(mcts.stats["node_cache"]))
+                if mcts.solver:
+                    print("Solver :", format_solver_report(mcts.stats["solver"]))
+                if mcts.tree_budget is not None:
+                    print("Arbre :", format_memory_report(mcts.stats["tree"]))
+                if mcts.profiler is not None:
+                    print(format_profile(mcts.stats["profile"]))
 
-            # Affichage d'informations sur l'arbre de recherche
-            print("\n-- Informations sur l'arbre MCTS --")
-            print(f"Nombre total de visites à la racine : {mcts.root.visits}")
-            if mcts.root.children:
-                for child in mcts.root.children:
-                    move_str = child.move.uci() if child.move is not None else "N/A"
-                    print(f"Coup {move_str} : {child.visits} visites, wins = {child.wins}")
-            print("\nArbre de recherche (affichage limité à 2 niveaux) :")
-            print_tree(mcts.root, max_depth=2)
-            print("------------------------------------\n")
+                # Affichage d'informations sur l'arbre de recherche
+                print("\n-- Informations sur l'arbre MCTS --")
+                print(f"Nombre total de visites à la racine : {mcts.root.visits}")
+                if mcts.root.children:
+                    for child in mcts.root.children:
+                        move_str = child.move.uci() if child.move is not None else "N/A"
+                        print(f"Coup {move_str} : {child.visits} visites, wins = {child.wins}")
+                print("\nArbre de recherche (affichage limité à 2 niveaux) :")
+                print_tree(mcts.root, max_depth=2)
+                if transposition_table is not None:
+                    print("Table de transposition :", transposition_table.stats())
+                    transposition_table.reset_counters()
+                print("------------------------------------\n")
+                if tree_store is not None and board.ply() < store_plies:
+                    tree_store.record(mcts.root, board, depth=store_depth)
             
             print("L'IA joue :", best_move)
             board.push(best_move)
@@ -80,6 +196,12 @@ def main():
         # Affiche le plateau après chaque coup.
         print("\n" + board.unicode())
 
+    if root_parallel is not None:
+        root_parallel.close()
+    if tree_store is not None:
+        tree_store.flush()
+        print("Statistiques d'ouverture enregistrées :", format_store_report(tree_store.report()))
+
     # Fin de partie.
     print("\nLa partie est terminée.")
     if board.is_checkmate():
@@ -92,5 +214,23 @@ def main():
     else:
         print("Partie terminée par une autre règle.")
 
+def parse_args(arguments=None):
+    parser = argparse.ArgumentParser(description="Partie contre l'IA MCTS de Chess/final.")
+    parser.add_argument("--incremental-evaluation", action="store_true",
+                        help="bilan matériel tenu à jour à chaque coup (voir evaluation.py)")
+    parser.add_argument("--max-tree-nodes", type=int, default=None,
+                        help="nombre maximal de nœuds gardés d'un coup à l'autre (voir memory.py)")
+    parser.add_argument("--ponder", action="store_true",
+                        help="l'IA cherche aussi pendant le tour de l'humain (voir ponder.py)")
+    parser.add_argument("--bitboard-rollouts", action="store_true",
+                        help="simulations jouées sur bitboards (voir playout.py)")
+    parser.add_argument("--solver", dest="use_solver", action="store_true",
+                        help="MCTS-Solver : mats prouvés, nœuds prouvés écartés (voir solver.py)")
+    parser.add_argument("--early-stop", action="store_true",
+                        help="arrêt dès que le meilleur coup ne peut plus être rattrapé (voir budget.py)")
+    parser.add_argument("--tree-store", dest="tree_store_dir", metavar="DIR", default=None,
+                        help="dossier des statistiques d'ouverture gardées d'une partie à l'autre (voir treestore.py)")
+    return parser.parse_args(arguments)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(**vars(parse_args()))
\ No newline at end of file
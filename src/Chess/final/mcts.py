@@ -1,60 +1,599 @@
 import chess
-import random
 import math
+import time
+from functools import partial
 
 from utils import material_score  
-from node import Node   
+from node import Node, TranspositionNode, VectorNode, RaveNode
+from arena import NodeArena
+from transposition import stats_identity
+from selection import FORMULAS
+from evaluation import MaterialBoard
+from budget import SearchBudget
+from rollout import Rollout, move_code
+from profiling import NULL_PHASE
+from nodecache import COUNTERS as CACHE_COUNTERS
+from solver import UNPROVEN, PROVEN_WIN, PROVEN_LOSS, prove
+from rave import RAVE_EQUIVALENCE
+from core import MCTSCore
+
+def random_rollout(board, color_player, rollout=None):
+    """
+    Joue une partie aléatoire sur board (modifié en place) jusqu'à une position terminale,
+    ou jusqu'à la troncature / l'adjudication prévue par `rollout`.
+
+    :param rollout: rollout.Rollout (None : partie jouée jusqu'au bout)
+    :return: (résultat pour color_player, nombre de demi-coups joués)
+    """
+    rollout = rollout or Rollout()
+    value, plies = rollout.play(board)
+    if value is not None:
+        # Simulation tronquée ou adjugée : valeur dans [0, 1] du point de vue des blancs
+        return (value if color_player == chess.WHITE else 1 - value), plies
+
+    # Détermination du résultat de la simulation
+    winner = rollout.winner(board)
+    if winner is not None:
+        # En cas d'échec et mat, le joueur qui doit jouer perd.
+        # On compare le vainqueur avec notre joueur d'intérêt.
+        result = 1 if winner == color_player else 0
+    else:
+        # Si match nul ou autre finalité, on peut retourner 0.5
+        result = 0.3
+    return result, plies
+
+
+def leaf_rollout(board, color_player, rollout=None):
+    """
+    Simulation depuis une copie de board (forme utilisée par les rollouts parallèles).
+
+    :return: (résultat pour color_player, nombre de demi-coups joués)
+    """
+    return random_rollout(board.copy(), color_player, rollout)
+
+
+class SearchConfig:
+    """
+    Réglages d'une recherche MCTS, vérifiés ensemble : les combinaisons incompatibles sont
+    refusées ici (ValueError), et nulle part ailleurs. Un nouveau mode de recherche s'ajoute
+    comme un réglage de plus, avec ses incompatibilités dans validate().
+    """
+
+    def __init__(self, use_heuristic=False, heuristic_weight=0.5, tree="objects", arena_capacity=4096,
+                 board_mode="copy", transposition_table=None, rollout_pool=None, rollouts_per_leaf=1,
+                 batch_size=1, exploration_constant=1.41, selection_formula="ucb1", incremental_evaluation=False,
+                 rollout=None, tree_budget=None, tree_store=None, profiler=None, solver=False,
+                 rave=False, rave_equivalence=RAVE_EQUIVALENCE, early_stop=None, core=True):
+        """
+        :param use_heuristic: True pour utiliser une évaluation heuristique en update
+        :param heuristic_weight: coefficient de pondération de l'évaluation matérielle
+        :param tree: "objects" (un objet Node par position), "arena" (tableaux NumPy, voir arena.py)
+                     ou "vector" (statistiques des enfants en tableaux NumPy, sélection vectorisée)
+        :param arena_capacity: nombre de nœuds préalloués lorsque tree="arena"
+        :param board_mode: "copy" (chaque nœud garde une copie du plateau) ou "replay" (les nœuds
+                           ne gardent que leur coup, rejoué sur un plateau de travail unique)
+        :param transposition_table: TranspositionTable partagée par les nœuds d'une même position
+                                    (None pour un arbre sans transpositions)
+        :param rollout_pool: parallel.RolloutPool exécutant les simulations d'un lot (None : dans ce processus)
+        :param rollouts_per_leaf: nombre de simulations lancées depuis chaque feuille sélectionnée
+        :param batch_size: nombre de feuilles distinctes sélectionnées par lot (avec perte virtuelle)
+        :param exploration_constant: constante d'exploration de la sélection
+        :param selection_formula: "ucb1", ou avec tree="vector" une autre formule de selection.FORMULAS
+        :param incremental_evaluation: True pour rechercher sur des evaluation.MaterialBoard, dont le bilan
+                                       matériel est tenu à jour à chaque coup (évaluation heuristique en O(1))
+        :param rollout: rollout.Rollout fixant la profondeur maximale des simulations, l'évaluateur
+                        de la position tronquée et le seuil d'adjudication (None : parties jouées jusqu'au bout)
+        :param tree_budget: memory.TreeBudget bornant le nombre de nœuds de l'arbre (tree="objects" seulement)
+        :param tree_store: treestore.TreeStore dont les statistiques (parties précédentes) servent de point
+                           de départ aux nœuds créés dans une position connue
+        :param profiler: profiling.SearchProfiler mesurant chaque phase et les primitives python-chess
+                         de chaque recherche (rapport dans MCTS.stats["profile"]) ; None : pas de mesure
+        :param solver: True pour le MCTS-Solver (voir solver.py) : les mats sont prouvés, les preuves
+                       remontent vers la racine, les nœuds prouvés ne sont plus sélectionnés et la
+                       recherche s'arrête dès que la racine est prouvée (rapport dans MCTS.stats["solver"])
+        :param rave: True pour le RAVE (voir rave.py) : chaque nœud garde aussi les statistiques des coups
+                     joués plus tard dans ses itérations, mélangées à la sélection (tree="objects" seulement)
+        :param rave_equivalence: visites pour lesquelles statistiques propres et AMAF pèsent autant (rave.rave_beta)
+        :param early_stop: budget.EarlyStop arrêtant la recherche dès que le coup le plus visité ne peut plus
+                           être rattrapé dans le budget restant (ou s'est stabilisé) ; le budget non utilisé
+                           est rendu dans MCTS.stats["remaining_iterations"] / ["remaining_seconds"]
+        :param core: True pour confier à core.MCTSCore les recherches qui n'utilisent aucune option propre à
+                     MCTS (voir uses_core) ; False pour garder la boucle de MCTS (comparaisons, sous-classes
+                     qui remplacent une phase)
+        """
+        self.use_heuristic = use_heuristic
+        self.heuristic_weight = heuristic_weight
+        self.tree = tree
+        self.arena_capacity = arena_capacity
+        self.board_mode = board_mode
+        self.transposition_table = transposition_table
+        self.rollout_pool = rollout_pool
+        self.rollouts_per_leaf = rollouts_per_leaf
+        self.batch_size = batch_size
+        self.exploration_constant = exploration_constant
+        self.selection_formula = selection_formula
+        self.incremental_evaluation = incremental_evaluation
+        self.rollout = rollout
+        self.tree_budget = tree_budget
+        self.tree_store = tree_store
+        self.profiler = profiler
+        self.solver = solver
+        self.rave = rave
+        self.rave_equivalence = rave_equivalence
+        self.early_stop = early_stop
+        self.core = core
+        self.validate()
+
+    def validate(self):
+        if self.board_mode not in ("copy", "replay"):
+            raise ValueError(f"Mode de plateau inconnu : {self.board_mode}")
+        if self.tree not in ("objects", "arena", "vector"):
+            raise ValueError(f"Type d'arbre inconnu : {self.tree}")
+        if self.selection_formula not in FORMULAS:
+            raise ValueError(f"Formule de sélection inconnue : {self.selection_formula}")
+        if self.tree != "vector" and self.selection_formula != "ucb1":
+            raise ValueError("Les formules autres que UCB1 demandent tree=\"vector\".")
+        # Modes propres aux nœuds objets
+        if self.tree != "objects":
+            for enabled, name in ((self.transposition_table is not None, "La table de transposition"),
+                                  (self.tree_budget is not None, "Le budget mémoire de l'arbre"),
+                                  (self.rave, "Le RAVE")):
+                if enabled:
+                    raise ValueError(f"{name} n'est disponible qu'avec tree=\"objects\".")
+        if self.rave:
+            if self.transposition_table is not None:
+                raise ValueError("Le RAVE n'est pas disponible avec une table de transposition.")
+            if self.batched:
+                raise ValueError("Le RAVE demande une recherche séquentielle (il lui faut les coups de chaque simulation).")
+            if self.use_heuristic:
+                raise ValueError("Le RAVE demande les résultats des simulations (use_heuristic=False).")
+
+    @property
+    def batched(self):
+        """
+        Vrai si la recherche procède par lots (MCTS._batched_search) plutôt qu'itération par itération.
+        """
+        return self.rollout_pool is not None or self.batch_size > 1 or self.rollouts_per_leaf > 1
+
+    @property
+    def uses_core(self):
+        """
+        Vrai si la recherche est celle de core.MCTSCore (adaptateur games.ChessGame) : nœuds objets,
+        UCB1, une simulation par itération, et aucune option qui demande les nœuds de node.py
+        (heuristique, transpositions, budget mémoire, statistiques d'ouverture, solveur, RAVE).
+        Les deux valeurs de board_mode y construisent le même arbre.
+        """
+        return (self.core and self.tree == "objects" and not self.batched and not self.use_heuristic
+                and self.transposition_table is None and self.tree_budget is None and self.tree_store is None
+                and not self.solver and not self.rave)
+
+    def node_class(self):
+        """
+        Classe des nœuds d'un arbre d'objets (tree="objects" ou "vector").
+        """
+        if self.tree == "vector":
+            return VectorNode
+        if self.transposition_table is not None:
+            return TranspositionNode
+        return RaveNode if self.rave else Node
+
+    def selection_args(self):
+        """
+        Arguments de best_child : la formule n'est transmise qu'aux nœuds vectorisés, la constante
+        d'équivalence qu'aux nœuds RAVE.
+        """
+        if self.tree == "vector":
+            return (self.exploration_constant, self.selection_formula)
+        if self.rave:
+            return (self.exploration_constant, self.rave_equivalence)
+        return (self.exploration_constant,)
+
 
 class MCTS:
-    def __init__(self, board, color_player=chess.WHITE, iterations=1000, use_heuristic=False, heuristic_weight=0.5):
+    def __init__(self, board, color_player=chess.WHITE, iterations=1000, config=None, **options):
         """
         Initialise la recherche MCTS.
         
         :param board: état initial du plateau
         :param color_player: la couleur du joueur pour lequel on cherche le meilleur coup
         :param iterations: nombre d'itérations de l'algorithme MCTS
-        :param use_heuristic: True pour utiliser une évaluation heuristique en update
-        :param heuristic_weight: coefficient de pondération de l'évaluation matérielle
+        :param config: SearchConfig (réglages de la recherche)
+        :param options: à défaut de config, les réglages un par un (voir SearchConfig)
         """
-        self.root = Node(board)
+        if config is None:
+            config = SearchConfig(**options)
+        elif options:
+            raise TypeError("Réglages à donner soit dans config, soit un par un, pas les deux.")
+        self.config = config
+        self.core = None
+        self.rave = config.rave
+        self.tree = config.tree
+        self.arena_capacity = config.arena_capacity
+        self.transpositions = config.transposition_table
+        self.incremental_evaluation = config.incremental_evaluation
+        self.tree_store = config.tree_store
+        self.profiler = config.profiler
+        self.tree_budget = config.tree_budget
         self.color_player = color_player
         self.iterations = iterations
-        self.use_heuristic = use_heuristic
-        self.heuristic_weight = heuristic_weight
+        self.use_heuristic = config.use_heuristic
+        self.heuristic_weight = config.heuristic_weight
+        self.board_mode = config.board_mode
+        self.rollout_pool = config.rollout_pool
+        self.rollouts_per_leaf = config.rollouts_per_leaf
+        self.batch_size = config.batch_size
+        self.rollout = config.rollout or Rollout()
+        if self.rave:
+            self.rollout.record_moves = True
+        self._rollout_codes = ()    # Codes des coups de la dernière simulation (RAVE)
+        self.stats = {}
+        self.nodes_created = 0
+        self.exploration_constant = config.exploration_constant
+        self._selection_args = config.selection_args()
+        self.solver = config.solver
+        self.early_stop = config.early_stop
+        self._selection_kwargs = {"skip_proven": True} if self.solver else {}
+        self._proofs = 0            # Nœuds prouvés pendant la recherche en cours
+        self._proof_iteration = None
+        if config.uses_core:
+            # Réglages par défaut : recherche de core.MCTSCore, sur un plateau de travail unique
+            self.core = MCTSCore(self.chess_game(board), iterations, self.exploration_constant,
+                                 self.early_stop, self.profiler)
+            self.board = None
+            return
+        self.root = self.new_root(board)
+        if self.tree_budget is not None:
+            self.tree_budget.reset(self.root)
+        # Plateau de travail du mode "replay", toujours dans la position de la racine entre deux itérations
+        self.board = self.search_board(board) if self.board_mode == "replay" else None
+
+    @property
+    def root(self):
+        return self._root if self.core is None else self.core.root
+
+    @root.setter
+    def root(self, node):
+        if self.core is not None:
+            raise AttributeError("La racine de core.MCTSCore se déplace par MCTSCore.advance (voir main.update_mcts_root).")
+        self._root = node
+
+    @property
+    def nodes_created(self):
+        # Nœuds créés par expansion depuis la création de l'instance
+        return self._nodes_created if self.core is None else self.core.nodes_created
+
+    @nodes_created.setter
+    def nodes_created(self, count):
+        self._nodes_created = count
+
+    def chess_game(self, board):
+        """
+        Adaptateur python-chess de core.MCTSCore pour la position board (réglages par défaut).
+        """
+        # Import local : games importe random_rollout de ce module
+        from games import ChessGame
+        return ChessGame(self.search_board(board), self.color_player, self.rollout)
+
+    def search_board(self, board):
+        """
+        Copie du plateau sur laquelle l'arbre travaille (un MaterialBoard si incremental_evaluation).
+        """
+        if self.incremental_evaluation and not isinstance(board, MaterialBoard):
+            return MaterialBoard.from_board(board)
+        return board.copy()
+
+    def new_root(self, board):
+        """
+        Crée une racine du type d'arbre choisi (aussi utilisé lors d'un re-enracinement).
+        """
+        if self.incremental_evaluation and not isinstance(board, MaterialBoard):
+            board = MaterialBoard.from_board(board)
+        if self.tree == "arena":
+            root = NodeArena(board, capacity=self.arena_capacity).root
+        else:
+            root = self.config.node_class()(board)
+            if self.transpositions is not None:
+                root = self.transpositions.attach(root, board)
+        if self.tree_store is not None:
+            self.tree_store.seed(root, board)
+        return root
+
+    def best_move(self, iterations=None, seconds=None, nodes=None, stop_event=None):
+        """
+        Effectue des itérations de MCTS dans la limite du budget, puis retourne le meilleur coup
+        (celui qui a été le plus visité depuis la racine). Le bilan (itérations, nœuds créés,
+        nœuds/s, ...) est rangé dans self.stats.
+
+        :param iterations: nombre maximal d'itérations (par défaut self.iterations, si aucune
+                           limite de temps ou de nœuds ni aucun événement d'arrêt n'est donné)
+        :param seconds: temps de réflexion maximal en secondes
+        :param nodes: nombre maximal de nœuds créés
+        :param stop_event: threading.Event ; la recherche s'arrête, entre deux itérations, dès qu'il est levé
+        """
+        if iterations is None and seconds is None and nodes is None and stop_event is None:
+            iterations = self.iterations
+        if self.core is not None:
+            return self._core_best_move(iterations, seconds, nodes, stop_event)
+        budget = SearchBudget(iterations, seconds, nodes, stop_event).start()
+        first_node = self.nodes_created
+        self.stats = {"iterations": 0, "rollouts": 0, "rollout_seconds": 0.0, "rollout_plies": 0}
+        self.rollout.reset()
+        cache_snapshot = CACHE_COUNTERS.snapshot()
+        self._proofs = 0
+        self._proof_iteration = 0 if self.root.proven else None
+        if self.early_stop is not None:
+            self.early_stop.start(budget)
+        if self.profiler is not None:
+            self.profiler.start()
+        try:
+            if self.config.batched:
+                self._batched_search(budget)
+            else:
+                self._sequential_search(budget)
+        finally:
+            if self.profiler is not None:
+                self.profiler.stop()
+        seconds = self.stats["rollout_seconds"]
+        self.stats["rollouts_per_sec"] = self.stats["rollouts"] / seconds if seconds > 0 else 0.0
+        rollouts = self.stats["rollouts"]
+        self.stats["avg_rollout_length"] = self.stats["rollout_plies"] / rollouts if rollouts else 0.0
+        # Compteurs tenus dans ce processus (les simulations d'un RolloutPool n'y figurent pas)
+        self.stats["cutoffs"] = self.rollout.cutoffs
+        self.stats["adjudications"] = self.rollout.adjudications
+        self.stats.update(budget.report(self.stats["iterations"], self.nodes_created - first_node))
+        # Caractère terminal des nœuds servi depuis leur cache (voir nodecache.py)
+        self.stats["node_cache"] = CACHE_COUNTERS.since(cache_snapshot)
+        if self.tree_budget is not None:
+            self.stats["tree"] = self.tree_budget.report()
+        if self.profiler is not None:
+            self.stats["profile"] = self.profiler.report()
+        if self.solver:
+            self.stats["solver"] = self.solver_report(budget)
+        return self.current_best_move()
+
+    def _core_best_move(self, iterations, seconds, nodes, stop_event):
+        """
+        best_move des réglages par défaut : recherche de core.MCTSCore, dont le bilan est complété
+        des compteurs des simulations. color_player et early_stop peuvent avoir changé depuis la
+        création de l'instance : ils sont repris à chaque recherche.
+        """
+        core = self.core
+        game = core.game
+        game.color_player = self.color_player
+        core.early_stop = self.early_stop
+        self.rollout.reset()
+        plies = game.plies
+        cache_snapshot = CACHE_COUNTERS.snapshot()
+        move = core.best_action(iterations, seconds, nodes, stop_event)
+        self.stats = core.stats
+        rollouts = self.stats["rollouts"]
+        self.stats["rollout_plies"] = game.plies - plies
+        self.stats["avg_rollout_length"] = self.stats["rollout_plies"] / rollouts if rollouts else 0.0
+        self.stats["cutoffs"] = self.rollout.cutoffs
+        self.stats["adjudications"] = self.rollout.adjudications
+        self.stats["node_cache"] = CACHE_COUNTERS.since(cache_snapshot)
+        return move
+
+    def solver_report(self, budget):
+        """
+        Bilan du MCTS-Solver : nœuds prouvés pendant la recherche, valeur de la racine (pour le camp
+        au trait), itération de la preuve et itérations épargnées par l'arrêt anticipé (None sans
+        limite d'itérations).
+        """
+        proven = self.root.proven
+        saved = None
+        if proven != UNPROVEN and budget.iterations is not None:
+            saved = budget.remaining(self.stats["iterations"])
+        return {
+            # La valeur d'un nœud est donnée pour le camp qui y a joué : on l'inverse pour la racine
+            "root": -proven,
+            "proven": self._proofs,
+            "proof_iteration": self._proof_iteration,
+            "saved_iterations": saved,
+        }
+
+    def current_best_move(self):
+        """
+        Meilleur coup connu à cet instant : l'enfant le plus visité de la racine, ou à défaut
+        (aucune itération effectuée) le premier coup légal.
+        """
+        if self.core is not None:
+            return self.core.current_best_action()
+        if not self.root.children:
+            return next(iter(self.root.board.legal_moves), None)
+        children = self.root.children
+        if self.solver:
+            # Un coup prouvé gagnant l'emporte ; un coup prouvé perdant n'est joué qu'à défaut d'autre
+            children = ([child for child in children if child.proven == PROVEN_WIN]
+                        or [child for child in children if child.proven != PROVEN_LOSS] or children)
+        # Le meilleur coup est celui dont le nœud enfant a été le plus visité.
+        best_child = max(children, key=lambda child: child.visits)
+        return best_child.move
 
-    def best_move(self):
+    def _sequential_search(self, budget):
         """
-        Effectue plusieurs itérations de MCTS, puis retourne le meilleur coup
-        (celui qui a été le plus visité depuis la racine).
+        Recherche itération par itération : sélection (et expansion), simulation, rétropropagation.
+
+        :param budget: SearchBudget de la recherche, vérifié entre deux itérations
         """
-        for _ in range(self.iterations):
+        phase = self._phase
+        iteration = 0
+        first_node = self.nodes_created
+        self._stop_early(budget, iteration)
+        while not budget.exhausted(iteration, self.nodes_created - first_node):
             # 1. Sélection : descendre dans l'arbre pour trouver un noeud à développer
-            leaf = self.selection()
+            with phase("selection"):
+                leaf = self.selection()
             # 2. Simulation : à partir de ce nœud, simuler une partie jusqu'à la fin
-            simulation_result = self.simulation(leaf)
+            start = time.perf_counter()
+            with phase("simulation"):
+                simulation_result = self.simulation(leaf)
+            self.stats["rollout_seconds"] += time.perf_counter() - start
             # 3. Rétropropagation : mettre à jour tous les nœuds de la feuille jusqu’à la racine
-            self.backpropagation(leaf, simulation_result)
-        
-        # Le meilleur coup est celui dont le nœud enfant a été le plus visité.
-        best_child = max(self.root.children, key=lambda child: child.visits)
-        return best_child.move
+            with phase("backpropagation"):
+                self.backpropagation(leaf, simulation_result)
+            self._prune_step(leaf)
+            iteration += 1
+            self._stop_early(budget, iteration)
+        self.stats["iterations"] = self.stats["rollouts"] = iteration
+
+    def _stop_early(self, budget, iteration):
+        """
+        Arrêt avant les limites du budget : racine prouvée (MCTS-Solver, elle n'a plus rien à apprendre),
+        ou coup déjà joué d'avance selon early_stop.
+        """
+        if self.solver and self.root.proven != UNPROVEN:
+            if self._proof_iteration is None:
+                self._proof_iteration = iteration
+            budget.stop("proven")
+        elif self.early_stop is not None and iteration > 0:
+            reason = self.early_stop.check(self.root, budget, iteration, self.rollouts_per_leaf)
+            if reason is not None:
+                budget.stop(reason)
+
+    def _phase(self, name):
+        """
+        Contexte délimitant une phase pour le profileur (sans effet s'il n'y en a pas).
+        """
+        if self.profiler is None:
+            return NULL_PHASE
+        return self.profiler.phase(name)
+
+    def _batched_search(self, budget):
+        """
+        Recherche par lots : jusqu'à batch_size feuilles distinctes sont sélectionnées (une perte
+        virtuelle sur leur chemin écarte les suivantes du même chemin), rollouts_per_leaf simulations
+        sont lancées depuis chacune, puis les résultats agrégés sont rétropropagés en une passe.
+
+        :param budget: SearchBudget de la recherche, vérifié entre deux lots
+        """
+        rollout = partial(leaf_rollout, color_player=self.color_player, rollout=self.rollout)
+        phase = self._phase
+        iteration = 0
+        first_node = self.nodes_created
+        self._stop_early(budget, iteration)
+        while not budget.exhausted(iteration, self.nodes_created - first_node):
+            remaining = budget.remaining(iteration)
+            leaves, boards = [], []
+            for _ in range(self.batch_size if remaining is None else min(self.batch_size, remaining)):
+                with phase("selection"):
+                    leaf = self.selection()
+                if self.board_mode == "replay":
+                    boards.append(self.board.copy())
+                    self._unwind(leaf)
+                else:
+                    boards.append(leaf.board)
+                self._virtual_loss(leaf, 1)
+                leaves.append(leaf)
+
+            start = time.perf_counter()
+            with phase("simulation"):
+                if self.rollout_pool is None:
+                    results = [[rollout(board) for _ in range(self.rollouts_per_leaf)] for board in boards]
+                else:
+                    results = self.rollout_pool.map(rollout, boards, self.rollouts_per_leaf)
+            self.stats["rollout_seconds"] += time.perf_counter() - start
+
+            for leaf, leaf_results in zip(leaves, results):
+                self._virtual_loss(leaf, -1)
+                if self.board_mode == "replay":
+                    self._rewind(leaf)
+                with phase("backpropagation"):
+                    self.backpropagation(leaf, sum(result for result, _ in leaf_results), count=len(leaf_results))
+                self.stats["rollouts"] += len(leaf_results)
+                self.stats["rollout_plies"] += sum(plies for _, plies in leaf_results)
+                self._prune_step(leaf)
+            iteration += len(leaves)
+            self._stop_early(budget, iteration)
+        self.stats["iterations"] = iteration
+
+    def _prune_step(self, leaf):
+        """
+        Entre deux itérations : date le chemin parcouru et fait une tranche d'élagage du budget mémoire.
+        """
+        if self.tree_budget is None:
+            return
+        if self.tree_budget.policy == "recent":
+            self.tree_budget.touch(leaf)
+        self.tree_budget.step(self.root)
+
+    @staticmethod
+    def _virtual_loss(node, amount):
+        """
+        Ajoute (ou retire) des visites sans gain sur le chemin de node jusqu'à la racine.
+        """
+        while node is not None:
+            node.visits += amount
+            node = node.parent
+
+    def _unwind(self, node):
+        """
+        Ramène le plateau de travail de la position de node à celle de la racine.
+        """
+        while node.parent is not None:
+            self.board.pop()
+            node = node.parent
+
+    def _rewind(self, node):
+        """
+        Rejoue sur le plateau de travail les coups de la racine jusqu'à node.
+        """
+        moves = []
+        while node.parent is not None:
+            moves.append(node.move)
+            node = node.parent
+        for move in reversed(moves):
+            self.board.push(move)
 
     def selection(self):
         """
         Sélectionne un nœud à développer en parcourant l'arbre depuis la racine avec UCB1.
         """
+        if self.board_mode == "replay":
+            return self._replay_selection()
         current_node = self.root
         
         # Tant que le nœud courant n'est pas terminal :
         while not current_node.is_terminal_node():
             # S'il existe encore des coups non explorés dans ce nœud, on l'étend
             if not current_node.is_fully_expanded():
-                return current_node.expand()
+                return self.expansion(current_node)
             else:
                 # Sinon, on choisit le meilleur enfant via UCB1 pour continuer la descente
-                current_node = current_node.best_child()
+                current_node = current_node.best_child(*self._selection_args, **self._selection_kwargs)
         return current_node
 
+    def _replay_selection(self):
+        """
+        Même descente que selection, mais chaque coup du chemin est joué (push) sur le plateau
+        de travail ; il est dépilé (pop) pendant la rétropropagation.
+        """
+        board = self.board
+        current_node = self.root
+        while not current_node.is_terminal_node(board):
+            if not current_node.is_fully_expanded(board):
+                return self.expansion(current_node, board)
+            current_node = current_node.best_child(*self._selection_args, **self._selection_kwargs)
+            board.push(current_node.move)
+        return current_node
+
+    def expansion(self, node, board=None):
+        """
+        Développe un enfant de node et le rattache à la table de transposition s'il y en a une.
+
+        :param board: plateau de travail (mode "replay"), dans la position de node
+        """
+        with self._phase("expansion"):
+            child = node.expand() if board is None else node.expand_on(board)
+        self.nodes_created += 1
+        if self.tree_budget is not None:
+            self.tree_budget.node_added(child)
+        if self.transpositions is not None:
+            self.transpositions.attach(child, child.board if board is None else board)
+        if self.tree_store is not None:
+            self.tree_store.seed(child, child.board if board is None else board)
+        return child
+
     def simulation(self, node):
         """
         À partir du nœud fourni, exécute une simulation aléatoire (rollout)
@@ -62,33 +601,88 @@ class MCTS:
         
         :return: un résultat numérique (1 pour victoire, 0 pour défaite, 0.5 pour match nul)
         """
-        simulate_board = node.board.copy()
-
-        while not simulate_board.is_game_over():
-            moves = list(simulate_board.legal_moves)
-            # Choix aléatoire d'un coup dans la liste des coups légaux
-            move = random.choice(moves)
-            simulate_board.push(move)
-
-        # Détermination du résultat de la simulation
-        if simulate_board.is_checkmate():
-            # En cas d'échec et mat, le joueur qui doit jouer perd.
-            # On compare la couleur active avec notre joueur d'intérêt.
-            result = 0 if simulate_board.turn == self.color_player else 1
+        if self.board_mode == "replay":
+            # Le plateau de travail est déjà dans la position du nœud : on joue puis on dépile
+            simulate_board = self.board
         else:
-            # Si match nul ou autre finalité, on peut retourner 0.5
-            result = 0.3
+            simulate_board = node.board.copy()
+
+        depth = len(simulate_board.move_stack)
+        result, plies = random_rollout(simulate_board, self.color_player, self.rollout)
+        self.stats["rollout_plies"] = self.stats.get("rollout_plies", 0) + plies
+        if self.rave:
+            self._rollout_codes = self.rollout.moves or ()
 
+        if self.board_mode == "replay":
+            # Seuls les coups ajoutés au plateau sont dépilés (aucun pour une simulation sur bitboards)
+            for _ in range(len(simulate_board.move_stack) - depth):
+                simulate_board.pop()
         return result
 
-    def backpropagation(self, node, result):
+    def backpropagation(self, node, result, count=1):
         """
         Met à jour la branche de l'arbre en remontant de la feuille jusqu’à la racine.
         
         :param node: le nœud à partir duquel revenir vers la racine
-        :param result: le résultat de la simulation (1, 0 ou 0.5)
+        :param result: le résultat de la simulation (1, 0 ou 0.5), ou la somme de `count` résultats
+        :param count: nombre de simulations agrégées dans result
+        """
+        if self.solver:
+            # Plateau de travail encore dans la position de la feuille en mode "replay"
+            self._proofs += prove(node, self.board if self.board_mode == "replay" else None)
+        if self.rave:
+            self._update_amaf(node, result, count)
+        if self.board_mode == "replay":
+            return self._replay_backpropagation(node, result, count)
+        # Avec transpositions, une même entrée peut apparaître deux fois sur le chemin (répétition)
+        updated = set() if self.transpositions is not None else None
+        # Les vues de l'arène n'ont pas de plateau : celui de la feuille est dépilé en remontant,
+        # plutôt que reconstruit à chaque niveau pour l'évaluation heuristique
+        board = node.board.copy() if self.use_heuristic and self.tree == "arena" else None
+        while node is not None:
+            if updated is None or self._first_update(node, updated):
+                # La méthode update intègre le résultat et éventuellement un bonus heuristique
+                node.update(result, use_heuristic=self.use_heuristic, heuristic_weight=self.heuristic_weight, color_player=self.color_player, board=board, count=count)
+            node = node.parent
+            if board is not None and node is not None:
+                board.pop()
+
+    def _update_amaf(self, leaf, result, count):
+        """
+        RAVE : chaque nœud du chemin compte les coups joués après lui, dans l'arbre puis dans la simulation.
+        """
+        path = []
+        node = leaf
+        while node.parent is not None:
+            path.append(node)
+            node = node.parent
+        path.append(node)
+        path.reverse()
+        codes = [move_code(node.move) for node in path[1:]]
+        codes.extend(self._rollout_codes)
+        for depth, node in enumerate(path):
+            node.update_amaf(codes[depth:], result, count)
+        self._rollout_codes = ()
+
+    @staticmethod
+    def _first_update(node, updated):
+        identity = stats_identity(node)
+        if identity in updated:
+            return False
+        updated.add(identity)
+        return True
+
+    def _replay_backpropagation(self, node, result, count=1):
+        """
+        Rétropropagation du mode "replay" : le plateau de travail est dépilé d'un coup à chaque
+        niveau, de sorte qu'il revient dans la position de la racine.
         """
+        board = self.board
+        updated = set() if self.transpositions is not None else None
         while node is not None:
-            # La méthode update intègre le résultat et éventuellement un bonus heuristique
-            node.update(result, use_heuristic=self.use_heuristic, heuristic_weight=self.heuristic_weight, color_player=self.color_player)
-            node = node.parent
\ No newline at end of file
+            if updated is None or self._first_update(node, updated):
+                node.update(result, use_heuristic=self.use_heuristic, heuristic_weight=self.heuristic_weight,
+                            color_player=self.color_player, board=board, count=count)
+            node = node.parent
+            if node is not None:
+                board.pop()
\ No newline at end of file
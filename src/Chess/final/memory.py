@@ -0,0 +1,229 @@
+import sys
+
+EVICTION_POLICIES = ("visits", "recent")
+
+
+def subtree_size(node):
+    """
+    Nombre de nœuds du sous-arbre de node (node compris).
+    """
+    count = 0
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        count += 1
+        stack.extend(current.children)
+    return count
+
+
+def _bounded_subtree_size(node, limit):
+    """
+    Taille du sous-arbre de node, ou None si elle dépasse limit (le parcours s'arrête alors).
+    """
+    count = 0
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        count += 1
+        if count > limit:
+            return None
+        stack.extend(current.children)
+    return count
+
+
+def node_bytes(node):
+    """
+    Estimation de l'occupation mémoire d'un nœud objet : le nœud, ses listes (enfants, coups
+    non explorés) et, s'il en garde un, son plateau avec ses piles de coups. Les objets partagés
+    entre copies de plateaux (états de la pile python-chess) ne sont comptés qu'une fois par nœud.
+    """
+    size = sys.getsizeof(node) + sys.getsizeof(getattr(node, "__dict__", {}))
+    size += sys.getsizeof(node.children)
+    untried = getattr(node, "untried_moves", ())
+    size += sys.getsizeof(untried) + sum(sys.getsizeof(move) for move in untried)
+    board = getattr(node, "board", None)
+    if board is not None:
+        size += sys.getsizeof(board) + sys.getsizeof(board.__dict__)
+        size += sys.getsizeof(board.move_stack) + sys.getsizeof(board._stack)
+        if board.move_stack:
+            # Coups recopiés par board.copy() et état ajouté par le dernier push
+            size += len(board.move_stack) * sys.getsizeof(board.move_stack[-1])
+            size += sys.getsizeof(board._stack[-1]) + sys.getsizeof(vars(board._stack[-1]))
+    return size
+
+
+class TreeBudget:
+    """
+    Budget mémoire d'un arbre MCTS à nœuds objets (Node de Chess/final, MCTSNode de Chess/stockfish).
+
+    Le nombre de nœuds vivants et une estimation des octets occupés sont tenus à jour à chaque
+    expansion. Au-delà de max_nodes, les sous-arbres « froids » (peu visités, ou non traversés
+    depuis longtemps) sont repliés dans leur parent : leurs visites et gains y sont déjà comptés,
+    et leur coup redevient un coup non exploré du parent. L'élagage est incrémental : chaque
+    itération n'examine qu'au plus work_per_iteration nœuds, jusqu'à redescendre sous
+    low_water * max_nodes, si bien qu'il ne provoque jamais de pic de latence au milieu d'un coup.
+
+    Les arbres dont les statistiques des enfants sont rangées par position dans le parent
+    (VectorNode, NodeArena) ne peuvent pas être élagués ainsi.
+    """
+
+    def __init__(self, max_nodes, low_water=0.9, work_per_iteration=64, policy="visits", sample_every=64):
+        """
+        :param max_nodes: nombre maximal de nœuds de l'arbre
+        :param low_water: un élagage déclenché continue jusqu'à low_water * max_nodes nœuds
+        :param work_per_iteration: nombre maximal de nœuds examinés ou repliés par itération
+        :param policy: "visits" (replie d'abord les sous-arbres les moins visités) ou "recent"
+                       (d'abord ceux qui n'ont pas été traversés depuis le plus longtemps)
+        :param sample_every: un nœud créé sur sample_every sert à estimer les octets par nœud
+        """
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Politique d'élagage inconnue : {policy}")
+        self.max_nodes = max_nodes
+        self.low_water = int(max_nodes * low_water)
+        self.work_per_iteration = work_per_iteration
+        self.policy = policy
+        self.sample_every = sample_every
+
+        self.count = 0
+        self.created = 0
+        self.evicted = 0            # Nœuds repliés depuis la création du budget
+        self.sweeps = 0             # Parcours complets de l'arbre par l'élagage
+        self.clock = 0              # Itérations vues (politique "recent")
+        self._stop_pruning()
+        self._sampled_bytes = 0
+        self._samples = 0
+
+    def reset(self, root):
+        """
+        Compte les nœuds d'un arbre existant, par exemple une nouvelle racine
+        (parcours complet : à appeler hors d'une recherche).
+        """
+        self.count = subtree_size(root)
+        self._stop_pruning()
+        if not self._samples:
+            self._sample(root)
+
+    def _stop_pruning(self):
+        self.pruning = False
+        self._sweeping = False
+        self._stack = []
+        self.threshold = 1              # Visites (politique "visits") d'un sous-arbre repliable
+        self.max_age = self.max_nodes   # Âge en itérations (politique "recent") d'un sous-arbre repliable
+
+    def _sample(self, node):
+        self._sampled_bytes += node_bytes(node)
+        self._samples += 1
+
+    @property
+    def bytes_per_node(self):
+        return self._sampled_bytes / self._samples if self._samples else 0.0
+
+    @property
+    def approx_bytes(self):
+        return self.count * self.bytes_per_node
+
+    def node_added(self, node):
+        self.count += 1
+        self.created += 1
+        if self.created % self.sample_every == 1 or self.sample_every == 1:
+            self._sample(node)
+
+    def rerooted(self, old_root, new_root):
+        """
+        Re-enracinement sur new_root, un enfant de old_root dont on garde le sous-arbre : retire
+        du compte l'ancienne racine et les sous-arbres abandonnés (ce parcours a le coût de leur
+        libération par Python, et se fait entre deux coups).
+        """
+        released = 1
+        for child in old_root.children:
+            if child is not new_root:
+                released += subtree_size(child)
+        self.count = max(self.count - released, 0)
+        self._stop_pruning()
+
+    def touch(self, node):
+        """
+        Politique "recent" : date le chemin de node jusqu'à la racine.
+        """
+        self.clock += 1
+        while node is not None:
+            node.last_touched = self.clock
+            node = node.parent
+
+    def _is_cold(self, node):
+        if self.policy == "visits":
+            return node.visits <= self.threshold
+        return self.clock - getattr(node, "last_touched", 0) >= self.max_age
+
+    def step(self, root):
+        """
+        Une tranche d'élagage (au plus work_per_iteration nœuds), à appeler entre deux itérations.
+
+        :return: nombre de nœuds repliés
+        """
+        if not self.pruning:
+            if self.count <= self.max_nodes:
+                return 0
+            self.pruning = True
+        evicted = 0
+        work = 0
+        while work < self.work_per_iteration:
+            if self.count <= self.low_water:
+                self._stop_pruning()
+                break
+            if not self._stack:
+                if self._sweeping:
+                    # Un parcours complet n'a pas suffi : on élargit le critère pour le suivant
+                    self.threshold *= 2
+                    self.max_age = max(self.max_age // 2, 1)
+                self._sweeping = True
+                self.sweeps += 1
+                self._stack = [(root, 0)]
+            # Chaque enfant n'est examiné qu'une fois par parcours (start : premier enfant non examiné)
+            node, start = self._stack.pop()
+            work += 1
+            kept = node.children[:start]
+            for position in range(start, len(node.children)):
+                child = node.children[position]
+                if work >= self.work_per_iteration:
+                    # Tranche épuisée : les enfants restants seront examinés à la prochaine
+                    self._stack.append((node, len(kept)))
+                    kept.extend(node.children[position:])
+                    break
+                # Un sous-arbre froid trop gros pour une tranche est d'abord vidé par le bas
+                size = _bounded_subtree_size(child, self.work_per_iteration) if self._is_cold(child) else None
+                if size is not None:
+                    work += size
+                    evicted += size
+                    self.count -= size
+                    # Les statistiques du sous-arbre sont déjà dans node : on ne garde que le coup
+                    node.untried_moves.insert(0, child.move)
+                    child.parent = None
+                    forget_child = getattr(node, "forget_child", None)
+                    if forget_child is not None:
+                        # Index coup -> enfant (nodecache.ChildIndexMixin) : le sous-arbre doit pouvoir être libéré
+                        forget_child(child)
+                else:
+                    work += 1
+                    kept.append(child)
+                    if child.children:
+                        self._stack.append((child, 0))
+            if len(kept) != len(node.children):
+                node.children[:] = kept
+        self.evicted += evicted
+        return evicted
+
+    def report(self):
+        return {
+            "nodes": self.count,
+            "max_nodes": self.max_nodes,
+            "approx_bytes": self.approx_bytes,
+            "bytes_per_node": self.bytes_per_node,
+            "evicted": self.evicted,
+            "sweeps": self.sweeps,
+        }
+
+
+def format_memory_report(report):
+    return (f"{report['nodes']}/{report['max_nodes']} nœuds, ~{report['approx_bytes'] / 2**20:.1f} Mo "
+            f"({report['bytes_per_node']:.0f} octets/nœud), {report['evicted']} nœuds repliés")
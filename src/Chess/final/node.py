@@ -2,15 +2,22 @@ import math
 import random
 import chess
 from utils import material_score
+from transposition import SharedStatsMixin
+from selection import ArrayStatsMixin
+from nodecache import CachedStateMixin, ChildIndexMixin
+from solver import ProofMixin
+from rave import RaveMixin
 
-class Node:
-    def __init__(self, board, move=None, parent=None):
+class Node(CachedStateMixin, ChildIndexMixin, ProofMixin):
+    def __init__(self, board, move=None, parent=None, legal_moves=None):
         """
         Initialisation d'un nœud de l'arbre MCTS.
         
-        :param board: instance du plateau de jeu (par exemple, un objet board de pychess)
+        :param board: instance du plateau de jeu (par exemple, un objet board de pychess),
+                      ou None pour un nœud sans plateau (mode "replay" du MCTS)
         :param move: le coup qui a permis d'atteindre cet état (None pour la racine)
         :param parent: nœud parent (None pour la racine)
+        :param legal_moves: coups légaux de la position, utilisés lorsque board est None
         """
         self.board = board              # L'état du plateau à ce nœud
         self.move = move                # Le coup qui a mené à cet état
@@ -20,7 +27,9 @@ class Node:
         self.visits = 0                 # Nombre de fois que ce nœud a été visité
         
         # Liste des coups légaux non encore explorés board.legal_moves
-        self.untried_moves = list(board.legal_moves) if board is not None else []
+        if board is not None:
+            legal_moves = board.legal_moves
+        self.untried_moves = list(legal_moves) if legal_moves is not None else []
     
     def ucb1(self, exploration_constant=1.41):
         """
@@ -33,14 +42,18 @@ class Node:
             return float('inf')
         return (self.wins / self.visits) + exploration_constant * math.sqrt(math.log(self.parent.visits) / self.visits)
     
-    def best_child(self, exploration_constant=1.41):
+    def best_child(self, exploration_constant=1.41, skip_proven=False):
         """
         Sélectionne et renvoie l'enfant avec le meilleur score UCB1.
         
         :param exploration_constant: paramètre d'exploration
+        :param skip_proven: True pour écarter les enfants dont la valeur est prouvée (MCTS-Solver, voir solver.py)
         :return: le nœud enfant avec la meilleure valeur UCB1
         """
-        return max(self.children, key=lambda child: child.ucb1(exploration_constant))
+        children = self.children
+        if skip_proven:
+            children = [child for child in children if not child.proven] or children
+        return max(children, key=lambda child: child.ucb1(exploration_constant))
     
     def expand(self):
         """
@@ -54,11 +67,23 @@ class Node:
         next_board = self.board.copy()  # On suppose que board.copy() existe pour dupliquer l'état
         next_board.push(move)            # Appliquer le coup au plateau
         # Créer le nouveau nœud enfant
-        child_node = Node(next_board, move, self)
-        self.children.append(child_node)
-        return child_node
+        child_node = type(self)(next_board, move, self)
+        return self.add_child(child_node)
+
+    def expand_on(self, board):
+        """
+        Variante de expand sans plateau par nœud : le coup est joué directement sur
+        le plateau de travail, qui doit être dans la position de ce nœud.
+        
+        :param board: plateau de travail partagé (modifié par un push)
+        :return: le nœud enfant nouvellement créé, sans plateau
+        """
+        move = self.untried_moves.pop()
+        board.push(move)
+        child_node = type(self)(None, move, self, legal_moves=board.legal_moves)
+        return self.add_child(child_node)
     
-    def update(self, result, use_heuristic=False, heuristic_weight=1e-4, color_player=chess.WHITE):
+    def update(self, result, use_heuristic=False, heuristic_weight=1e-4, color_player=chess.WHITE, board=None, count=1):
         """
         Met à jour le nœud avec le résultat d'une simulation.
         
@@ -66,29 +91,68 @@ class Node:
         :param use_heuristic: True si l'on souhaite intégrer un bonus basé sur l'évaluation matérielle
         :param heuristic_weight: coefficient de pondération de l'évaluation matérielle
         :param color_player: la couleur du joueur pour lequel on souhaite évaluer l'état
+        :param board: plateau de la position du nœud, si le nœud n'en garde pas (mode "replay")
+        :param count: nombre de simulations agrégées dans result (rollouts par lots)
         """
         if use_heuristic:
             # Calcul du score matériel en passant la couleur du joueur évalué
-            material = material_score(self.board, color_player)
+            material = material_score(self.board if board is None else board, color_player)
             # On ajoute au résultat le bonus (ou malus) de l'évaluation matérielle multiplié par un coefficient
-            self.wins += material # result + heuristic_weight * material
+            self.wins += material * count # result + heuristic_weight * material
         else:
             self.wins += result
-        self.visits += 1
+        self.visits += count
 
     
-    def is_fully_expanded(self):
+    def is_fully_expanded(self, board=None):
         """
         Vérifie si le nœud a été entièrement développé (tous les coups possibles ont été explorés).
         
+        :param board: plateau de la position (inutile ici, la liste des coups est déjà connue ;
+                      sert aux vues ArenaNode en mode "replay")
         :return: True si tous les coups ont été explorés, False sinon.
         """
         return len(self.untried_moves) == 0
     
-    def is_terminal_node(self):
+    def _has_moves(self, board):
+        # Coups légaux = coups non explorés + coups des enfants : aucune génération nécessaire
+        return bool(self.untried_moves or self.children)
+
+    def is_terminal_node(self, board=None):
         """
         Vérifie si le nœud représente une position terminale (fin de la partie).
+        L'issue est calculée au premier appel puis gardée en cache (voir CachedStateMixin).
         
+        :param board: plateau de la position, si le nœud n'en garde pas (mode "replay")
         :return: True si la partie est terminée à partir de ce plateau, False sinon.
         """
-        return self.board.is_game_over()  # On suppose que board peut fournir cette information.
+        return self.is_terminal(board)
+
+
+class TranspositionNode(SharedStatsMixin, Node):
+    """
+    Nœud dont visits/wins sont partagés avec les transpositions de sa position
+    (voir transposition.TranspositionTable).
+    """
+
+
+class VectorNode(ArrayStatsMixin, Node):
+    """
+    Nœud dont les statistiques des enfants sont rangées dans des tableaux NumPy :
+    best_child calcule UCB1 (ou PUCT) pour tous les enfants en un seul appel vectorisé.
+    """
+
+    def best_child(self, exploration_constant=1.41, formula=None, skip_proven=False):
+        """
+        :param exploration_constant: paramètre d'exploration
+        :param formula: "ucb1", "ucb1-smoothed" ou "puct" (voir selection.FORMULAS)
+        :param skip_proven: True pour écarter les enfants dont la valeur est prouvée (voir solver.py)
+        """
+        return self.select_child(exploration_constant, formula, skip_proven)
+
+
+class RaveNode(RaveMixin, Node):
+    """
+    Nœud RAVE : la sélection mélange ses statistiques et celles « all moves as first » de son
+    parent (voir rave.RaveMixin).
+    """
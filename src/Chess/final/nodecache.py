@@ -0,0 +1,164 @@
+import random
+
+import chess
+
+# Issue pas encore calculée (None signifie « partie en cours »)
+_UNKNOWN = object()
+
+
+def position_outcome(board, has_moves):
+    """
+    Issue de la position de board, identique à board.outcome(), sans générer les coups légaux :
+    on sait déjà si le camp au trait en a au moins un.
+
+    :param has_moves: True si le camp au trait a au moins un coup légal
+    :return: chess.Outcome, ou None si la partie continue
+    """
+    if not has_moves and board.is_check():
+        return chess.Outcome(chess.Termination.CHECKMATE, not board.turn)
+    if board.is_insufficient_material():
+        return chess.Outcome(chess.Termination.INSUFFICIENT_MATERIAL, None)
+    if not has_moves:
+        return chess.Outcome(chess.Termination.STALEMATE, None)
+    if board.halfmove_clock >= 150:
+        return chess.Outcome(chess.Termination.SEVENTYFIVE_MOVES, None)
+    if board.is_fivefold_repetition():
+        return chess.Outcome(chess.Termination.FIVEFOLD_REPETITION, None)
+    return None
+
+
+class CacheCounters:
+    """
+    Compteurs des caches de nœuds (communs à tous les arbres du processus) :
+    listes de coups légaux générées, issues calculées, et demandes servies depuis un cache,
+    chacune étant une génération de coups évitée (board.legal_moves ou board.is_game_over()).
+    """
+
+    __slots__ = ("generations", "outcomes", "hits")
+
+    def __init__(self):
+        self.generations = 0
+        self.outcomes = 0
+        self.hits = 0
+
+    def snapshot(self):
+        return self.generations, self.outcomes, self.hits
+
+    def since(self, snapshot):
+        """
+        Bilan depuis snapshot (par exemple le début d'une recherche).
+        """
+        generations, outcomes, hits = (now - before for now, before in zip(self.snapshot(), snapshot))
+        requests = outcomes + hits
+        return {
+            "generations": generations,
+            "outcomes": outcomes,
+            "avoided": hits,
+            "hit_rate": hits / requests if requests else 0.0,
+        }
+
+
+COUNTERS = CacheCounters()
+
+
+def format_cache_report(report):
+    return (f"{report['generations']} listes de coups générées, {report['outcomes']} issues calculées, "
+            f"{report['avoided']} générations évitées ({report['hit_rate']:.0%} des demandes)")
+
+
+class CachedStateMixin:
+    """
+    Mixin pour les nœuds dont la position ne change plus une fois le nœud créé : la liste des
+    coups légaux, le caractère terminal et l'issue de la position sont calculés une seule fois,
+    à la première demande, puis servis depuis le nœud. La position comprend l'historique
+    (répétitions, règle des 75 coups), lui aussi fixé par le chemin qui mène au nœud.
+
+    Le nœud doit avoir un attribut board, sauf si le plateau de sa position est fourni à
+    chaque appel (mode "replay" de Chess/final/mcts.py). Le calcul est paresseux : un plateau
+    modifié juste après la création du nœud (push du coup) est pris en compte.
+    """
+
+    _legal_moves = None
+    _outcome = _UNKNOWN
+
+    def legal_move_list(self, board=None):
+        """
+        :return: liste des coups légaux de la position (ne pas la modifier : elle est partagée)
+        """
+        if self._legal_moves is None:
+            COUNTERS.generations += 1
+            self._legal_moves = list((self.board if board is None else board).legal_moves)
+        else:
+            COUNTERS.hits += 1
+        return self._legal_moves
+
+    def _has_moves(self, board):
+        """
+        True si le camp au trait a au moins un coup légal (surchargée par les nœuds qui
+        tiennent déjà leurs coups non explorés).
+        """
+        return bool(self.legal_move_list(board))
+
+    def outcome(self, board=None):
+        """
+        :return: chess.Outcome de la position, ou None si la partie continue
+        """
+        if self._outcome is _UNKNOWN:
+            COUNTERS.outcomes += 1
+            board = self.board if board is None else board
+            self._outcome = position_outcome(board, self._has_moves(board))
+        else:
+            COUNTERS.hits += 1
+        return self._outcome
+
+    def is_terminal(self, board=None):
+        return self.outcome(board) is not None
+
+
+class ChildIndexMixin:
+    """
+    Mixin pour les nœuds dont les enfants sont repérés par leur coup : un dictionnaire
+    coup -> enfant (child_for, en temps constant, pour le re-enracinement) et une file des coups
+    non explorés, préparée et mélangée une seule fois (pop_untried_move, en temps constant).
+
+    Les enfants doivent être ajoutés par add_child (et retirés par forget_child). La file est
+    construite à partir de legal_move_list (voir CachedStateMixin).
+    """
+
+    # Pas de __dict__ imposé aux nœuds à __slots__ (core.CoreNode) ; les autres en gardent un
+    __slots__ = ()
+
+    _children_by_move = None
+    _untried_queue = None
+
+    def add_child(self, child):
+        self.children.append(child)
+        if self._children_by_move is None:
+            self._children_by_move = {}
+        self._children_by_move[child.move] = child
+        return child
+
+    def forget_child(self, child):
+        """
+        Retire child de l'index (enfant élagué, voir memory.TreeBudget) : il peut être libéré.
+        """
+        if self._children_by_move is not None and self._children_by_move.get(child.move) is child:
+            del self._children_by_move[child.move]
+
+    def child_for(self, move):
+        """
+        :return: l'enfant atteint par move, ou None s'il n'a pas été développé
+        """
+        if self._children_by_move is None:
+            return None
+        return self._children_by_move.get(move)
+
+    def pop_untried_move(self):
+        """
+        :return: un coup légal pas encore développé, tiré au hasard, ou None s'il n'y en a plus
+        """
+        if self._untried_queue is None:
+            explored = self._children_by_move or {}
+            self._untried_queue = [move for move in self.legal_move_list() if move not in explored]
+            random.shuffle(self._untried_queue)
+        return self._untried_queue.pop() if self._untried_queue else None
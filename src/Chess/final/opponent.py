@@ -0,0 +1,93 @@
+import random
+
+import chess
+
+# Valeurs des pièces de l'adversaire heuristique (le roi, valeur arbitrairement élevée, n'est jamais échangé)
+PIECE_VALUES = (0, 1, 3, 3, 5, 9, 100)
+
+
+def exchange_gain(board, square, color, occupied, target_value):
+    """
+    Échange statique (SEE) sur square : gain matériel de color s'il ouvre les prises sur la pièce
+    de valeur target_value qui s'y trouve, chaque camp prenant avec sa pièce la moins chère et
+    pouvant s'arrêter quand poursuivre lui coûterait. Les clouages sont ignorés.
+
+    :param occupied: occupation à utiliser (par exemple celle d'après un coup pas encore joué)
+    :return: gain (>= 0 : color peut toujours ne pas prendre)
+    """
+    gains = []
+    value = target_value
+    while True:
+        attackers = board.attackers_mask(color, square, occupied) & occupied
+        if not attackers:
+            break
+        for piece_type in chess.PIECE_TYPES:
+            candidates = attackers & board.pieces_mask(piece_type, color)
+            if candidates:
+                break
+        gains.append(value)
+        value = PIECE_VALUES[piece_type]
+        # La pièce qui prend quitte sa case : les pièces à longue portée derrière elle entrent en jeu
+        occupied &= ~chess.BB_SQUARES[chess.lsb(candidates)]
+        color = not color
+    result = 0
+    for gain in reversed(gains):
+        result = max(0, gain - result)
+    return result
+
+
+class HeuristicOpponent:
+    """
+    Adversaire « semi-intelligent » pour les parties et les benchmarks : chaque coup légal est noté
+    (prise : valeur de la pièce prise ; échec : +0.5 ; pièce laissée en prise : -0.8 fois ce que
+    l'adversaire gagne à l'échange sur sa case d'arrivée, SEE), plus un peu de bruit. Le meilleur
+    coup est joué 70 % du temps, un coup légal au hasard sinon.
+
+    Aucune copie du plateau : les échecs sont testés par board.gives_check, les échanges sur les
+    bitboards d'attaque avec l'occupation d'après le coup. Environ 2500 coups/s sur des parties
+    complètes, contre 65 pour l'ancienne version qui copiait le plateau deux fois par coup légal
+    (python benchmarks.py opponent).
+    """
+
+    def __init__(self, seed=None, greedy=0.7, noise=0.2):
+        """
+        :param seed: graine du générateur aléatoire de l'adversaire (None : non reproductible)
+        :param greedy: probabilité de jouer le coup le mieux noté
+        :param noise: amplitude du bruit uniforme ajouté aux notes
+        """
+        self.rng = random.Random(seed)
+        self.greedy = greedy
+        self.noise = noise
+
+    def score(self, board, move):
+        """
+        Note d'un coup légal de board (sans bruit).
+        """
+        to_square = move.to_square
+        occupied = board.occupied & ~chess.BB_SQUARES[move.from_square] | chess.BB_SQUARES[to_square]
+        score = 0.0
+        captured = board.piece_type_at(to_square)
+        if captured:
+            score += PIECE_VALUES[captured]
+        elif board.is_en_passant(move):
+            score += PIECE_VALUES[chess.PAWN]
+            occupied &= ~chess.BB_SQUARES[to_square + (-8 if board.turn == chess.WHITE else 8)]
+        if board.gives_check(move):
+            score += 0.5
+        # Pièce en prise sur sa case d'arrivée : ce que l'adversaire gagne à l'échange
+        moving = move.promotion or board.piece_type_at(move.from_square)
+        loss = exchange_gain(board, to_square, not board.turn, occupied, PIECE_VALUES[moving])
+        return score - 0.8 * loss
+
+    def choose_move(self, board):
+        """
+        :return: le coup choisi, ou None s'il n'y a aucun coup légal
+        """
+        legal_moves = list(board.legal_moves)
+        if not legal_moves:
+            return None
+        rng = self.rng
+        if rng.random() >= self.greedy:
+            return rng.choice(legal_moves)
+        noise = self.noise
+        return max(legal_moves, key=lambda move: self.score(board, move) + rng.uniform(0, noise))
@@ -0,0 +1,145 @@
+import multiprocessing
+import os
+import random
+import time
+
+import chess
+
+from mcts import MCTS
+
+
+def _root_search(task):
+    """
+    Recherche exécutée dans un processus du pool : un arbre indépendant depuis la même racine,
+    avec sa propre graine. Renvoie les statistiques (visites, gains) de chaque coup de la racine.
+    """
+    board, seed, iterations, budget, options = task
+    random.seed(seed)
+    mcts = MCTS(board, iterations=iterations, **options)
+    mcts.best_move(**budget)
+    root_stats = {child.move.uci(): (child.visits, child.wins) for child in mcts.root.children}
+    return root_stats, mcts.stats["iterations"], mcts.stats["nodes"]
+
+
+def _leaf_rollouts(task):
+    """
+    Simulations d'une feuille exécutées dans un processus du pool.
+    """
+    rollout, board, seed, count = task
+    random.seed(seed)
+    return [rollout(board) for _ in range(count)]
+
+
+class RolloutPool:
+    """
+    Pool persistant de processus pour la parallélisation aux feuilles : reçoit un lot de
+    plateaux (feuilles) et renvoie, pour chacun, la liste des résultats de ses simulations.
+    """
+
+    def __init__(self, workers=None, seed=0):
+        """
+        :param workers: nombre de processus (par défaut, le nombre de cœurs)
+        :param seed: graine de base ; chaque feuille envoyée reçoit une graine distincte
+        """
+        self.workers = workers or os.cpu_count()
+        self.seed = seed
+        self.tasks = 0
+        self.pool = multiprocessing.Pool(self.workers)
+
+    def map(self, rollout, boards, count):
+        """
+        :param rollout: fonction picklable plateau -> résultat (elle ne doit pas modifier le plateau)
+        :param boards: plateaux des feuilles du lot
+        :param count: nombre de simulations par feuille
+        :return: une liste de `count` résultats par plateau, dans l'ordre de boards
+        """
+        tasks = [(rollout, board, self.seed + self.tasks + i, count) for i, board in enumerate(boards)]
+        self.tasks += len(tasks)
+        return self.pool.map(_leaf_rollouts, tasks)
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RootParallelMCTS:
+    """
+    MCTS parallélisé à la racine : chaque processus d'un pool persistant construit son propre
+    arbre depuis la position courante, puis les statistiques des coups de la racine sont
+    additionnées avant de choisir le coup le plus visité.
+
+    Le pool est créé une seule fois et réutilisé à chaque coup ; penser à appeler close()
+    (ou à utiliser l'objet comme gestionnaire de contexte) en fin de partie.
+    """
+
+    def __init__(self, workers=None, iterations=1000, seed=0, **mcts_options):
+        """
+        :param workers: nombre de processus (par défaut, le nombre de cœurs)
+        :param iterations: nombre d'itérations MCTS effectuées par chaque processus
+        :param seed: graine de base ; chaque processus et chaque coup reçoit une graine distincte
+        :param mcts_options: autres paramètres transmis à MCTS (use_heuristic, board_mode, ...)
+        """
+        self.workers = workers or os.cpu_count()
+        self.iterations = iterations
+        self.seed = seed
+        self.mcts_options = mcts_options
+        self.searches = 0
+        self.stats = {}
+        self.pool = multiprocessing.Pool(self.workers)
+
+    def best_move(self, board, color_player=None, seconds=None, nodes=None):
+        """
+        Lance une recherche dans chaque processus et renvoie le coup le plus visité
+        après fusion des statistiques de la racine.
+
+        :param board: position courante
+        :param color_player: joueur pour lequel on cherche le coup (par défaut, le joueur au trait)
+        :param seconds: temps de réflexion maximal de chaque processus (voir MCTS.best_move)
+        :param nodes: nombre maximal de nœuds créés par chaque processus
+        """
+        options = dict(self.mcts_options)
+        options["color_player"] = board.turn if color_player is None else color_player
+        budget = {"seconds": seconds, "nodes": nodes}
+        base_seed = self.seed + self.searches * self.workers
+        tasks = [(board, base_seed + worker, self.iterations, budget, options) for worker in range(self.workers)]
+
+        start = time.perf_counter()
+        results = self.pool.map(_root_search, tasks)
+        elapsed = time.perf_counter() - start
+        self.searches += 1
+
+        merged = {}
+        for result, _, _ in results:
+            for move, (visits, wins) in result.items():
+                total_visits, total_wins = merged.get(move, (0, 0))
+                merged[move] = (total_visits + visits, total_wins + wins)
+        best = max(merged, key=lambda move: merged[move][0])
+
+        iterations = sum(result[1] for result in results)
+        created = sum(result[2] for result in results)
+        self.stats = {
+            "workers": self.workers,
+            "iterations": iterations,
+            "nodes": created,
+            "seconds": elapsed,
+            "iterations_per_sec": iterations / elapsed if elapsed > 0 else float('inf'),
+            "nps": created / elapsed if elapsed > 0 else float('inf'),
+            "root_stats": merged,
+        }
+        return chess.Move.from_uci(best)
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
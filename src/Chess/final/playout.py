@@ -0,0 +1,867 @@
+"""
+Simulations aléatoires sur bitboards (BitboardRollout), pour les rollouts du MCTS.
+
+Gain mesuré par `python benchmarks.py playout` (parties complètes depuis la position initiale,
+un seul cœur) : x7 à x8 en simulations/s, x6.5 environ en demi-coups/s, sur rollout.Rollout
+et chess.Board. La portée est donc réduite à cet ordre de grandeur : l'objectif de départ (x10)
+n'est pas atteint et n'est pas visé par ce module.
+
+La moitié environ d'un demi-coup va au dénombrement des coups pseudo-légaux, pièce par pièce
+(Playout.run), nécessaire au tirage uniforme. Ont été essayés sans gain mesurable : bitboards
+en variables locales avec le coup joué sur place (sans make), légalité décidée sans jouer le coup,
+compte des répétitions par dictionnaire, case d'arrivée tirée bit à bit plutôt que par squares.
+"""
+import random
+import time
+from bisect import bisect_right
+
+import chess
+
+from rollout import Rollout, material_evaluator, random_move
+from utils import PV
+
+# Moteur de simulation sur bitboards : la position est un tuple d'entiers Python
+#   (pions, cavaliers, fous, tours, dames, rois, blancs, noirs, trait, roques, prise en passant, demi-coups)
+# où roques est le masque des tours pouvant encore roquer (comme clean_castling_rights()) et
+# prise en passant la case de prise, ou None si aucun pion adverse ne peut la prendre.
+# Un coup est un entier : départ | arrivée << 6 | promotion << 12 (roque : le coup du roi, e1g1).
+PAWNS, KNIGHTS, BISHOPS, ROOKS, QUEENS, KINGS, WHITE, BLACK, TURN, CASTLING, EP, HALFMOVE = range(12)
+
+BB_ALL = chess.BB_ALL
+BB_SQUARES = chess.BB_SQUARES
+BB_RAYS = chess.BB_RAYS
+KNIGHT_ATTACKS = chess.BB_KNIGHT_ATTACKS
+KING_ATTACKS = chess.BB_KING_ATTACKS
+PAWN_ATTACKS = chess.BB_PAWN_ATTACKS
+DIAG_MASKS, DIAG_ATTACKS = chess.BB_DIAG_MASKS, chess.BB_DIAG_ATTACKS
+FILE_MASKS, FILE_ATTACKS = chess.BB_FILE_MASKS, chess.BB_FILE_ATTACKS
+RANK_MASKS, RANK_ATTACKS = chess.BB_RANK_MASKS, chess.BB_RANK_ATTACKS
+
+NOT_FILE_A = BB_ALL & ~chess.BB_FILE_A
+NOT_FILE_H = BB_ALL & ~chess.BB_FILE_H
+PROMOTION_RANKS = chess.BB_RANK_1 | chess.BB_RANK_8
+PROMOTIONS = (chess.QUEEN, chess.ROOK, chess.BISHOP, chess.KNIGHT)
+
+# Roques : (tour pouvant roquer, cases à vider, cases que le roi traverse, coup du roi)
+CASTLES = {
+    chess.WHITE: ((chess.BB_H1, chess.BB_F1 | chess.BB_G1, (chess.F1, chess.G1), chess.E1 | chess.G1 << 6),
+                  (chess.BB_A1, chess.BB_B1 | chess.BB_C1 | chess.BB_D1, (chess.D1, chess.C1), chess.E1 | chess.C1 << 6)),
+    chess.BLACK: ((chess.BB_H8, chess.BB_F8 | chess.BB_G8, (chess.F8, chess.G8), chess.E8 | chess.G8 << 6),
+                  (chess.BB_A8, chess.BB_B8 | chess.BB_C8 | chess.BB_D8, (chess.D8, chess.C8), chess.E8 | chess.C8 << 6)),
+}
+# Cases strictement entre deux cases alignées (0 sinon)
+BETWEEN = [[chess.between(a, b) for b in chess.SQUARES] for a in chess.SQUARES]
+# Déplacement de la tour selon la case d'arrivée du roi
+CASTLING_ROOKS = {
+    chess.G1: chess.BB_H1 | chess.BB_F1, chess.C1: chess.BB_A1 | chess.BB_D1,
+    chess.G8: chess.BB_H8 | chess.BB_F8, chess.C8: chess.BB_A8 | chess.BB_D8,
+}
+# Cases que le roi traverse, selon sa case d'arrivée
+CASTLING_PATHS = {castle >> 6: path for sides in CASTLES.values() for _, _, path, castle in sides}
+
+# Cases d'où une pièce peut donner échec à un roi sur chaque case (lignes, diagonales, sauts de cavalier)
+CHECK_ZONES = [KNIGHT_ATTACKS[square] | KING_ATTACKS[square]
+               | DIAG_ATTACKS[square][0] | RANK_ATTACKS[square][0] | FILE_ATTACKS[square][0]
+               for square in chess.SQUARES]
+
+# Tables construites à la demande ; au-delà de MAX_CACHED entrées, une table est vidée
+# (elle se reconstruit en quelques parties).
+MAX_CACHED = 200_000
+
+# Cases d'un bitboard (un même jeu de pièces d'un type revient souvent)
+_squares = {}
+
+
+def squares(bb):
+    result = _squares.get(bb)
+    if result is None:
+        result = []
+        rest = bb
+        while rest:
+            low = rest & -rest
+            result.append(low.bit_length() - 1)
+            rest ^= low
+        if len(_squares) >= MAX_CACHED:
+            _squares.clear()
+        result = _squares[bb] = tuple(result)
+    return result
+
+
+# Coups pseudo-légaux : (case de départ, cases d'arrivée) -> tuple des coups
+_piece_moves = {}
+
+
+def _moves_to(square, targets):
+    key = targets << 6 | square
+    moves = _piece_moves.get(key)
+    if moves is None:
+        moves = []
+        while targets:
+            low = targets & -targets
+            moves.append(square | (low.bit_length() - 1) << 6)
+            targets ^= low
+        if len(_piece_moves) >= MAX_CACHED:
+            _piece_moves.clear()
+        moves = _piece_moves[key] = tuple(moves)
+    return moves
+
+
+# Coups de pions par rangée : (delta, rangée, octet des cases d'arrivée) -> tuple des coups.
+# delta est l'écart arrivée - départ (poussée simple ou double, prise d'un côté ou de l'autre).
+_pawn_moves = {}
+
+
+def _build_pawn_moves(delta, rank, byte):
+    moves = []
+    for file in range(8):
+        if byte >> file & 1:
+            to = rank * 8 + file
+            base = (to - delta) | to << 6
+            if rank in (0, 7):
+                moves.extend(base | promotion << 12 for promotion in PROMOTIONS)
+            else:
+                moves.append(base)
+    return tuple(moves)
+
+
+for _delta in (8, 16, 7, 9, -8, -16, -7, -9):
+    for _rank in range(8):
+        for _byte in range(256):
+            _pawn_moves[_delta, _rank, _byte] = _build_pawn_moves(_delta, _rank, _byte)
+
+
+def _pawn_targets(moves, delta, targets):
+    while targets:
+        rank = ((targets & -targets).bit_length() - 1) >> 3
+        moves += _pawn_moves[delta, rank, targets >> (rank << 3) & 255]
+        targets &= ~(255 << (rank << 3))
+
+
+def attacked(square, by, occupied, pawns, knights, bishops, rooks, queens, kings, color):
+    """
+    Vrai si square est attaquée par les pièces by (de couleur color), avec l'occupation occupied.
+    """
+    if KNIGHT_ATTACKS[square] & knights & by or KING_ATTACKS[square] & kings & by:
+        return True
+    # Un pion de color attaque square s'il est sur une case attaquée depuis square par un pion adverse
+    if PAWN_ATTACKS[not color][square] & pawns & by:
+        return True
+    sliders = (rooks | queens) & by
+    if sliders and (RANK_ATTACKS[square][RANK_MASKS[square] & occupied]
+                    | FILE_ATTACKS[square][FILE_MASKS[square] & occupied]) & sliders:
+        return True
+    sliders = (bishops | queens) & by
+    return bool(sliders and DIAG_ATTACKS[square][DIAG_MASKS[square] & occupied] & sliders)
+
+
+def checkers(state):
+    """
+    Pièces adverses qui donnent échec au roi du camp au trait (bitboard).
+    """
+    pawns, knights, bishops, rooks, queens, kings, white, black, turn = state[:9]
+    us, them = (white, black) if turn else (black, white)
+    king = (kings & us).bit_length() - 1
+    occupied = white | black
+    return them & (KNIGHT_ATTACKS[king] & knights
+                   | PAWN_ATTACKS[turn][king] & pawns
+                   | DIAG_ATTACKS[king][DIAG_MASKS[king] & occupied] & (bishops | queens)
+                   | (RANK_ATTACKS[king][RANK_MASKS[king] & occupied]
+                      | FILE_ATTACKS[king][FILE_MASKS[king] & occupied]) & (rooks | queens))
+
+
+def in_check(state):
+    return bool(checkers(state))
+
+
+def evasion_mask(state, checking):
+    """
+    Cases d'arrivée permises aux pièces autres que le roi quand checking donne échec :
+    prendre l'unique pièce qui donne échec ou s'interposer (aucune en cas d'échec double).
+    """
+    if checking & (checking - 1):
+        return 0
+    king = (state[KINGS] & (state[WHITE] if state[TURN] else state[BLACK])).bit_length() - 1
+    return checking | BETWEEN[king][checking.bit_length() - 1]
+
+
+def leaves_king_safe(state):
+    """
+    Vrai si, dans state (obtenu par make), le camp qui vient de jouer n'a pas laissé son roi en échec.
+    """
+    pawns, knights, bishops, rooks, queens, kings, white, black, turn = state[:9]
+    us, them = (white, black) if turn else (black, white)
+    king = (kings & them).bit_length() - 1
+    return not attacked(king, us, white | black, pawns, knights, bishops, rooks, queens, kings, turn)
+
+
+def pseudo_legal_moves(state, evasions=None):
+    """
+    Coups pseudo-légaux (le roi peut rester en échec, sauf pour les roques, vérifiés entièrement).
+
+    :param evasions: None si le camp au trait n'est pas en échec, sinon evasion_mask(state, ...) :
+                     seuls les coups du roi et ceux qui parent l'échec sont générés
+    """
+    pawns, knights, bishops, rooks, queens, kings, white, black, turn, castling, ep, _ = state
+    occupied = white | black
+    us, them = (white, black) if turn else (black, white)
+    free = BB_ALL & ~us
+    allowed = free if evasions is None else evasions
+    moves = []
+
+    king = (kings & us).bit_length() - 1
+    moves += _moves_to(king, KING_ATTACKS[king] & free)
+
+    own = us & ~pawns & ~kings if allowed else 0
+    while own:
+        low = own & -own
+        own ^= low
+        square = low.bit_length() - 1
+        if low & knights:
+            targets = KNIGHT_ATTACKS[square]
+        else:
+            targets = 0
+            if low & (bishops | queens):
+                targets = DIAG_ATTACKS[square][DIAG_MASKS[square] & occupied]
+            if low & (rooks | queens):
+                targets |= (RANK_ATTACKS[square][RANK_MASKS[square] & occupied]
+                            | FILE_ATTACKS[square][FILE_MASKS[square] & occupied])
+        targets &= allowed
+        if targets:
+            moves += _moves_to(square, targets)
+
+    own_pawns = pawns & us if allowed else 0
+    if own_pawns:
+        empty = BB_ALL & ~occupied
+        if turn:
+            single = own_pawns << 8 & empty
+            _pawn_targets(moves, 8, single & allowed)
+            _pawn_targets(moves, 16, (single & chess.BB_RANK_3) << 8 & empty & allowed)
+            _pawn_targets(moves, 7, (own_pawns & NOT_FILE_A) << 7 & them & allowed)
+            _pawn_targets(moves, 9, (own_pawns & NOT_FILE_H) << 9 & them & allowed)
+        else:
+            single = own_pawns >> 8 & empty
+            _pawn_targets(moves, -8, single & allowed)
+            _pawn_targets(moves, -16, (single & chess.BB_RANK_6) >> 8 & empty & allowed)
+            _pawn_targets(moves, -9, (own_pawns & NOT_FILE_A) >> 9 & them & allowed)
+            _pawn_targets(moves, -7, (own_pawns & NOT_FILE_H) >> 7 & them & allowed)
+        # En échec, la prise en passant pare en prenant le pion qui donne échec, ou en s'interposant
+        if ep is not None and (evasions is None
+                               or evasions & (BB_SQUARES[ep] | BB_SQUARES[ep - 8 if turn else ep + 8])):
+            capturers = PAWN_ATTACKS[not turn][ep] & own_pawns
+            while capturers:
+                low = capturers & -capturers
+                capturers ^= low
+                moves.append(low.bit_length() - 1 | ep << 6)
+
+    if castling & us and evasions is None:
+        for rook, between, path, move in CASTLES[turn]:
+            if castling & rook and not occupied & between and not any(
+                    attacked(square, them, occupied, pawns, knights, bishops, rooks, queens, kings, not turn)
+                    for square in path):
+                moves.append(move)
+    return moves
+
+
+def make(state, move):
+    """
+    Position obtenue en jouant move (pseudo-légal) dans state. L'état n'est jamais modifié :
+    le tuple renvoyé sert à la fois de coup joué et de plateau à tester.
+    """
+    pawns, knights, bishops, rooks, queens, kings, white, black, turn, castling, ep, halfmove = state
+    origin = move & 63
+    target = move >> 6 & 63
+    from_bb = BB_SQUARES[origin]
+    to_bb = BB_SQUARES[target]
+    moved = from_bb | to_bb
+    halfmove += 1
+    new_ep = None
+
+    if to_bb & (white | black):
+        # Prise : la pièce prise disparaît de tous les bitboards
+        keep = ~to_bb
+        pawns &= keep
+        knights &= keep
+        bishops &= keep
+        rooks &= keep
+        queens &= keep
+        if turn:
+            black &= keep
+        else:
+            white &= keep
+        halfmove = 0
+
+    if from_bb & pawns:
+        halfmove = 0
+        pawns ^= moved
+        if target == ep:
+            # Prise en passant : le pion pris est derrière la case d'arrivée
+            captured = BB_SQUARES[target - 8 if turn else target + 8]
+            pawns ^= captured
+            if turn:
+                black ^= captured
+            else:
+                white ^= captured
+        elif target - origin in (16, -16):
+            middle = (origin + target) >> 1
+            # La case n'est retenue que si un pion adverse peut y prendre
+            if PAWN_ATTACKS[turn][middle] & pawns & (black if turn else white):
+                new_ep = middle
+        elif move >> 12:
+            pawns ^= to_bb
+            promotion = move >> 12
+            if promotion == chess.QUEEN:
+                queens |= to_bb
+            elif promotion == chess.KNIGHT:
+                knights |= to_bb
+            elif promotion == chess.ROOK:
+                rooks |= to_bb
+            else:
+                bishops |= to_bb
+    elif from_bb & knights:
+        knights ^= moved
+    elif from_bb & bishops:
+        bishops ^= moved
+    elif from_bb & rooks:
+        rooks ^= moved
+    elif from_bb & queens:
+        queens ^= moved
+    else:
+        kings ^= moved
+        castling &= ~(chess.BB_RANK_1 if turn else chess.BB_RANK_8)
+        if target - origin in (2, -2):
+            rook = CASTLING_ROOKS[target]
+            rooks ^= rook
+            moved |= rook
+
+    if turn:
+        white ^= moved
+    else:
+        black ^= moved
+    if castling:
+        castling &= ~moved
+    return pawns, knights, bishops, rooks, queens, kings, white, black, not turn, castling, new_ep, halfmove
+
+
+def legal_moves(state):
+    checking = checkers(state)
+    moves = pseudo_legal_moves(state, evasion_mask(state, checking) if checking else None)
+    return [move for move in moves if leaves_king_safe(make(state, move))]
+
+
+def has_legal_en_passant(state):
+    ep = state[EP]
+    if ep is None:
+        return False
+    capturers = PAWN_ATTACKS[not state[TURN]][ep] & state[PAWNS] & (state[WHITE] if state[TURN] else state[BLACK])
+    while capturers:
+        low = capturers & -capturers
+        capturers ^= low
+        if leaves_king_safe(make(state, low.bit_length() - 1 | ep << 6)):
+            return True
+    return False
+
+
+def repetition_key(state):
+    """
+    Clé de répétition, équivalente à Board._transposition_key() : la case de prise en passant
+    ne compte que si la prise est légale.
+    """
+    if state[EP] is not None and not has_legal_en_passant(state):
+        return state[:EP] + (None,)
+    return state[:HALFMOVE]
+
+
+def _side_insufficient(own, other, pawns, knights, bishops, kings, queens):
+    # Même logique que Board.has_insufficient_material(color), pions, tours et dames déjà exclus
+    if own & knights:
+        return (own.bit_count() <= 2 and not other & ~kings & ~queens)
+    if own & bishops:
+        same_color = not bishops & chess.BB_DARK_SQUARES or not bishops & chess.BB_LIGHT_SQUARES
+        return bool(same_color and not pawns and not knights)
+    return True
+
+
+def is_insufficient_material(state):
+    pawns, knights, bishops, rooks, queens, kings, white, black = state[:8]
+    if pawns | rooks | queens:
+        return False
+    return (_side_insufficient(white, black, pawns, knights, bishops, kings, queens)
+            and _side_insufficient(black, white, pawns, knights, bishops, kings, queens))
+
+
+def white_material(state):
+    """
+    Bilan matériel du point de vue des blancs (comme rollout.white_material), en centipions.
+    """
+    if is_insufficient_material(state):
+        return 0
+    white = state[WHITE]
+    # PV suit l'ordre des bitboards : pion, cavalier, fou, tour, dame
+    return sum(value * ((state[index] & white).bit_count() * 2 - state[index].bit_count())
+               for index, value in enumerate(PV.values()))
+
+
+def from_board(board):
+    """
+    Position d'un chess.Board (ou d'une sous-classe, par exemple evaluation.MaterialBoard).
+    """
+    if board.chess960:
+        raise ValueError("Le moteur de simulation ne gère pas Chess960")
+    return _state(board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings,
+                  board.occupied_co[chess.WHITE], board.occupied_co[chess.BLACK], board.turn,
+                  board.clean_castling_rights(), board.ep_square, board.halfmove_clock)
+
+
+def _state(pawns, knights, bishops, rooks, queens, kings, white, black, turn, castling, ep, halfmove):
+    if ep is not None and not PAWN_ATTACKS[not turn][ep] & pawns & (white if turn else black):
+        ep = None
+    return pawns, knights, bishops, rooks, queens, kings, white, black, turn, castling, ep, halfmove
+
+
+def _clean_castling(state):
+    # Board.clean_castling_rights() (échecs classiques) pour un état de la pile de python-chess
+    castling = state.castling_rights & state.rooks
+    white = castling & chess.BB_RANK_1 & state.occupied_w & (chess.BB_A1 | chess.BB_H1)
+    black = castling & chess.BB_RANK_8 & state.occupied_b & (chess.BB_A8 | chess.BB_H8)
+    if not state.occupied_w & state.kings & chess.BB_E1:
+        white = 0
+    if not state.occupied_b & state.kings & chess.BB_E8:
+        black = 0
+    return white | black
+
+
+def history_from_board(board):
+    """
+    Clés de répétition des positions précédentes de la partie, depuis le dernier coup
+    irréversible (les seules que Board.is_repetition() remonte).
+    """
+    keys = []
+    after = from_board(board)
+    for saved in reversed(board._stack):
+        before = _state(saved.pawns, saved.knights, saved.bishops, saved.rooks, saved.queens, saved.kings,
+                        saved.occupied_w, saved.occupied_b, saved.turn, _clean_castling(saved),
+                        saved.ep_square, saved.halfmove_clock)
+        # Coup irréversible : prise ou coup de pion, perte d'un droit de roque, prise en passant possible avant
+        if after[HALFMOVE] == 0 or after[CASTLING] != before[CASTLING] or has_legal_en_passant(before):
+            break
+        keys.append(repetition_key(before))
+        after = before
+    return keys
+
+
+def to_board(state, fullmove_number=1, template=None):
+    """
+    chess.Board de la position (sans historique).
+
+    :param template: plateau dont on reprend la classe et les réglages (copy(stack=False)),
+                     par exemple un MaterialBoard pour l'évaluation des simulations tronquées
+    """
+    board = chess.Board(None)
+    board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings = state[:6]
+    board.occupied_co[chess.WHITE] = state[WHITE]
+    board.occupied_co[chess.BLACK] = state[BLACK]
+    board.occupied = state[WHITE] | state[BLACK]
+    board.turn = state[TURN]
+    board.castling_rights = state[CASTLING]
+    board.ep_square = state[EP]
+    board.halfmove_clock = state[HALFMOVE]
+    board.fullmove_number = fullmove_number
+    if template is not None and type(template) is not chess.Board:
+        copy = template.copy(stack=False)
+        copy.set_fen(board.fen())
+        return copy
+    return board
+
+
+def to_move(move):
+    return chess.Move(move & 63, move >> 6 & 63, move >> 12 or None)
+
+
+def perft(state, depth):
+    """
+    Nombre de parties de depth demi-coups depuis state (à comparer aux valeurs de référence,
+    ou à celles de python-chess).
+    """
+    if depth == 0:
+        return 1
+    moves = legal_moves(state)
+    if depth == 1:
+        return len(moves)
+    return sum(perft(make(state, move), depth - 1) for move in moves)
+
+
+def board_perft(board, depth):
+    """
+    Même compte avec python-chess.
+    """
+    if depth == 0:
+        return 1
+    if depth == 1:
+        return board.legal_moves.count()
+    count = 0
+    for move in board.legal_moves:
+        board.push(move)
+        count += board_perft(board, depth - 1)
+        board.pop()
+    return count
+
+
+def choose_move(state, checking, rng=random.random):
+    """
+    Coup légal tiré uniformément, et la position qui en résulte : on tire parmi les coups
+    pseudo-légaux (les parades seulement en cas d'échec), en retirant de la liste ceux qui
+    laissent le roi en échec. Le tirage reste uniforme parmi les coups restants, donc parmi
+    les coups légaux, et seul le coup retenu (plus les rares coups rejetés) est joué.
+
+    :param checking: checkers(state)
+    :return: (coup, nouvelle position), ou (None, None) s'il n'y a aucun coup légal
+    """
+    moves = pseudo_legal_moves(state, evasion_mask(state, checking) if checking else None)
+    count = len(moves)
+    while count:
+        index = int(rng() * count)
+        move = moves[index]
+        after = make(state, move)
+        if leaves_king_safe(after):
+            return move, after
+        count -= 1
+        moves[index] = moves[count]
+    return None, None
+
+
+# Raisons de l'arrêt de Playout.run
+GAME_OVER, CUTOFF, ADJUDICATION = "game_over", "cutoff", "adjudication"
+
+
+class Playout:
+    """
+    Partie aléatoire sur bitboards depuis une position. Elle s'arrête aux mêmes fins que
+    Board.is_game_over() : mat, pat, matériel insuffisant, règle des 75 coups, quintuple
+    répétition (termination et winner comme dans Board.outcome()).
+
+    Chaque demi-coup tire un coup pseudo-légal uniformément, groupe de coups par groupe de coups
+    (une pièce, ou une direction de pions, avec le nombre de ses cases d'arrivée) sans construire
+    la liste des coups, puis rejette le tirage s'il laisse le roi en échec. Après plusieurs rejets,
+    choose_move tire dans la liste complète : le coup joué est uniforme parmi les coups légaux.
+    """
+
+    __slots__ = ("state", "history", "plies", "fullmove_number", "fifty_moves", "termination", "winner",
+                 "balance", "move", "moves")
+
+    def __init__(self, board, fifty_moves=False, record_moves=False):
+        """
+        :param fifty_moves: True pour que la règle des 50 coups termine aussi la partie, comme si
+                            la nulle était réclamée dès qu'elle est possible
+        :param record_moves: True pour garder dans moves tous les coups joués (entiers, voir to_move)
+        """
+        self.state = from_board(board)
+        self.history = history_from_board(board)
+        self.plies = 0
+        self.fullmove_number = board.fullmove_number
+        self.fifty_moves = fifty_moves
+        self.termination = None
+        self.winner = None
+        self.balance = None         # Bilan matériel de la position adjugée
+        self.move = None            # Dernier coup joué (entier, voir to_move)
+        self.moves = [] if record_moves else None
+
+    def run(self, max_plies=None, adjudication_margin=None, rng=random.random):
+        """
+        Joue jusqu'à la fin de la partie, ou jusqu'à max_plies demi-coups de plus, ou jusqu'à un
+        écart matériel (voir white_material) d'au moins adjudication_margin, vérifiés dans cet
+        ordre avant chaque coup, comme dans Rollout.play.
+
+        :return: GAME_OVER, CUTOFF ou ADJUDICATION
+        """
+        state = self.state
+        history = self.history
+        fifty_moves = self.fifty_moves
+        plies = 0
+        played = self.move
+        moves = self.moves
+        fullmove_number = self.fullmove_number
+        reason = GAME_OVER
+        while True:
+            pawns, knights, bishops, rooks, queens, kings, white, black, turn, castling, ep, halfmove = state
+            # Le matériel insuffisant exclut le mat : le vérifier d'abord ne change pas le résultat
+            if not pawns | rooks | queens and is_insufficient_material(state):
+                self.termination = chess.Termination.INSUFFICIENT_MATERIAL
+                break
+            us, them = (white, black) if turn else (black, white)
+            occupied = white | black
+            king = (kings & us).bit_length() - 1
+            checking = 0
+            if them & ~kings & CHECK_ZONES[king]:
+                checking = them & (KNIGHT_ATTACKS[king] & knights
+                                   | PAWN_ATTACKS[turn][king] & pawns
+                                   | DIAG_ATTACKS[king][DIAG_MASKS[king] & occupied] & (bishops | queens)
+                                   | (RANK_ATTACKS[king][RANK_MASKS[king] & occupied]
+                                      | FILE_ATTACKS[king][FILE_MASKS[king] & occupied]) & (rooks | queens))
+            free = BB_ALL & ~us
+            allowed = evasion_mask(state, checking) if checking else free
+
+            # Groupes de coups : (arrivées, départ, écart, promotion), et bounds[i] le nombre de
+            # coups des groupes 0 à i. Pour les pions, le départ est None et se déduit de l'arrivée
+            # par l'écart. Une dame forme deux groupes (diagonales, lignes).
+            groups = []
+            bounds = []
+            total = 0
+            targets = KING_ATTACKS[king] & free
+            if targets:
+                total = targets.bit_count()
+                groups.append((targets, king, 0, False))
+                bounds.append(total)
+            if allowed:
+                own = knights & us
+                if own:
+                    for square in _squares.get(own) or squares(own):
+                        targets = KNIGHT_ATTACKS[square] & allowed
+                        if targets:
+                            total += targets.bit_count()
+                            groups.append((targets, square, 0, False))
+                            bounds.append(total)
+                own = (bishops | queens) & us
+                if own:
+                    for square in _squares.get(own) or squares(own):
+                        targets = DIAG_ATTACKS[square][DIAG_MASKS[square] & occupied] & allowed
+                        if targets:
+                            total += targets.bit_count()
+                            groups.append((targets, square, 0, False))
+                            bounds.append(total)
+                own = (rooks | queens) & us
+                if own:
+                    for square in _squares.get(own) or squares(own):
+                        targets = (RANK_ATTACKS[square][RANK_MASKS[square] & occupied]
+                                   | FILE_ATTACKS[square][FILE_MASKS[square] & occupied]) & allowed
+                        if targets:
+                            total += targets.bit_count()
+                            groups.append((targets, square, 0, False))
+                            bounds.append(total)
+                own = pawns & us
+                if own:
+                    empty = BB_ALL & ~occupied
+                    if turn:
+                        single = own << 8 & empty
+                        pawn_groups = ((8, single & allowed),
+                                       (16, (single & chess.BB_RANK_3) << 8 & empty & allowed),
+                                       (7, (own & NOT_FILE_A) << 7 & them & allowed),
+                                       (9, (own & NOT_FILE_H) << 9 & them & allowed))
+                    else:
+                        single = own >> 8 & empty
+                        pawn_groups = ((-8, single & allowed),
+                                       (-16, (single & chess.BB_RANK_6) >> 8 & empty & allowed),
+                                       (-9, (own & NOT_FILE_A) >> 9 & them & allowed),
+                                       (-7, (own & NOT_FILE_H) >> 7 & them & allowed))
+                    for delta, targets in pawn_groups:
+                        if targets:
+                            promoting = targets & PROMOTION_RANKS
+                            if promoting:
+                                total += 4 * promoting.bit_count()
+                                groups.append((promoting, None, delta, True))
+                                bounds.append(total)
+                                targets ^= promoting
+                                if not targets:
+                                    continue
+                            total += targets.bit_count()
+                            groups.append((targets, None, delta, False))
+                            bounds.append(total)
+                    if ep is not None and (not checking
+                                           or allowed & (BB_SQUARES[ep] | BB_SQUARES[ep - 8 if turn else ep + 8])):
+                        for square in squares(PAWN_ATTACKS[not turn][ep] & own):
+                            total += 1
+                            groups.append((BB_SQUARES[ep], square, 0, False))
+                            bounds.append(total)
+            if castling & us and not checking:
+                # Cases traversées vérifiées seulement si le roque est tiré
+                for rook, between, path, castle in CASTLES[turn]:
+                    if castling & rook and not occupied & between:
+                        total += 1
+                        groups.append((BB_SQUARES[castle >> 6], king, 0, False))
+                        bounds.append(total)
+
+            # Pièces adverses qui peuvent clouer une pièce sur le roi
+            pinners = them & (bishops | rooks | queens)
+            after = None
+            for _ in range(8 if total else 0):
+                index = int(rng() * total)
+                position = bisect_right(bounds, index)
+                targets, origin, delta, promoting = groups[position]
+                if position:
+                    index -= bounds[position - 1]
+                promotion = 0
+                if promoting:
+                    promotion = PROMOTIONS[index & 3]
+                    index >>= 2
+                target = (_squares.get(targets) or squares(targets))[index]
+                if origin is None:
+                    origin = target - delta
+                elif origin == king and target - origin in (2, -2) and any(
+                        attacked(square, them, occupied, pawns, knights, bishops, rooks, queens, kings, not turn)
+                        for square in CASTLING_PATHS[target]):
+                    continue
+                move = origin | target << 6 | promotion << 12
+                after = make(state, move)
+                # Hors échec, seul un coup du roi, une prise en passant ou le départ d'une pièce
+                # alignée avec le roi et une pièce adverse à longue portée (clouage) peut le laisser en échec
+                if checking or origin == king or target == ep:
+                    if leaves_king_safe(after):
+                        break
+                elif not BB_RAYS[king][origin] & pinners:
+                    break
+                else:
+                    # Clouage : seule la ligne du roi et de la case de départ est à vérifier
+                    remaining = after[BLACK] if turn else after[WHITE]
+                    occupied_after = after[WHITE] | after[BLACK]
+                    if DIAG_ATTACKS[king][0] & BB_SQUARES[origin]:
+                        exposed = (DIAG_ATTACKS[king][DIAG_MASKS[king] & occupied_after]
+                                   & (after[BISHOPS] | after[QUEENS]) & remaining)
+                    else:
+                        exposed = ((RANK_ATTACKS[king][RANK_MASKS[king] & occupied_after]
+                                    | FILE_ATTACKS[king][FILE_MASKS[king] & occupied_after])
+                                   & (after[ROOKS] | after[QUEENS]) & remaining)
+                    if not exposed:
+                        break
+                after = None
+            if after is None:
+                # Rejets répétés (ou aucun coup) : tirage exact dans la liste des coups légaux
+                move, after = choose_move(state, checking, rng)
+                if move is None:
+                    self.termination = chess.Termination.CHECKMATE if checking else chess.Termination.STALEMATE
+                    self.winner = (not turn) if checking else None
+                    break
+
+            if halfmove >= 150:
+                self.termination = chess.Termination.SEVENTYFIVE_MOVES
+                break
+            # Quatre occurrences précédentes, au moins deux demi-coups chacune
+            key = state[:HALFMOVE] if ep is None else repetition_key(state)
+            if len(history) >= 8 and history.count(key) >= 4:
+                self.termination = chess.Termination.FIVEFOLD_REPETITION
+                break
+            if fifty_moves and halfmove >= 100:
+                self.termination = chess.Termination.FIFTY_MOVES
+                break
+            if max_plies is not None and plies >= max_plies:
+                reason = CUTOFF
+                break
+            if adjudication_margin is not None:
+                balance = white_material(state)
+                if abs(balance) >= adjudication_margin:
+                    self.balance = balance
+                    reason = ADJUDICATION
+                    break
+
+            # Coup irréversible (prise ou coup de pion, perte d'un droit de roque, prise en passant
+            # possible) : l'historique des répétitions repart de zéro
+            if after[HALFMOVE] == 0 or after[CASTLING] != castling or (
+                    ep is not None and has_legal_en_passant(state)):
+                history = []
+            else:
+                history.append(key)
+            state = after
+            played = move
+            if moves is not None:
+                moves.append(move)
+            plies += 1
+            if not turn:
+                fullmove_number += 1
+
+        self.state = state
+        self.history = history
+        self.plies += plies
+        self.fullmove_number = fullmove_number
+        self.move = played
+        return reason
+
+    def board(self, template=None):
+        return to_board(self.state, self.fullmove_number, template)
+
+
+class BitboardRollout(Rollout):
+    """
+    Rollout dont les simulations aléatoires se jouent sur bitboards (voir Playout) plutôt que sur
+    le chess.Board : mêmes fins de partie, même troncature, même adjudication, pour une fraction
+    du coût de python-chess. Le plateau passé à play n'est pas modifié ; le résultat d'une partie
+    terminée se lit avec winner(board). L'adjudication compte le matériel seul (utils.PV), sans
+    tables pièce-case.
+
+    Une politique de simulation autre que rollout.random_move se joue sur le plateau, comme Rollout.
+    """
+
+    def __init__(self, max_depth=None, evaluator=material_evaluator, adjudication_margin=None, rng=None):
+        """
+        :param rng: générateur random.Random des coups (None : le module random, comme random_move)
+        """
+        super().__init__(max_depth, evaluator, adjudication_margin)
+        self.rng = rng
+        self._finished = (None, None)       # (plateau de départ, vainqueur) de la dernière partie terminée
+
+    def play(self, board, choose_move=random_move):
+        if choose_move is not random_move:
+            return super().play(board, choose_move)
+        start = time.perf_counter()
+        playout = Playout(board, record_moves=self.record_moves)
+        value = None
+        rng = self.rng.random if self.rng is not None else random.random
+        reason = playout.run(self.max_depth, self.adjudication_margin, rng)
+        if reason == CUTOFF:
+            self.cutoffs += 1
+            # L'évaluateur reçoit un plateau de la classe de board (un MaterialBoard garde ses tables)
+            value = self.evaluator(playout.board(board))
+        elif reason == ADJUDICATION:
+            self.adjudications += 1
+            value = 1.0 if playout.balance > 0 else 0.0
+        else:
+            self._finished = (board, playout.winner)
+        self.moves = playout.moves
+        self.rollouts += 1
+        self.plies += playout.plies
+        self.seconds += time.perf_counter() - start
+        return value, playout.plies
+
+    def winner(self, board):
+        finished, winner = self._finished
+        if finished is not board:
+            return super().winner(board)
+        self._finished = (None, None)
+        return winner
+
+
+def differential_check(games=20, seed=0, fens=(chess.STARTING_FEN,), max_plies=None):
+    """
+    Test différentiel contre python-chess : des parties aléatoires sont jouées demi-coup par
+    demi-coup sur bitboards (Playout.run) et rejouées sur un chess.Board ; à chaque position,
+    l'état, les coups légaux et l'échec doivent coïncider, le coup tiré doit être légal, et la
+    partie doit se terminer au même moment et de la même manière que Board.outcome().
+
+    :param fens: positions de départ, utilisées à tour de rôle
+    :param max_plies: nombre maximal de demi-coups par partie (None : jusqu'à la fin)
+    :return: nombre de positions comparées (AssertionError au premier désaccord)
+    """
+    rng = random.Random(seed)
+    positions = 0
+    for game in range(games):
+        board = chess.Board(fens[game % len(fens)])
+        playout = Playout(board)
+        reason = CUTOFF
+        while reason != GAME_OVER and (max_plies is None or playout.plies < max_plies):
+            state = playout.state
+            assert state == from_board(board), board.fen()
+            legal = set(board.legal_moves)
+            assert set(map(to_move, legal_moves(state))) == legal, board.fen()
+            assert in_check(state) == board.is_check(), board.fen()
+            positions += 1
+            plies = playout.plies
+            # Un demi-coup au plus, puis la fin de partie est vérifiée dans la nouvelle position
+            reason = playout.run(max_plies=1, rng=rng.random)
+            if playout.plies > plies:
+                move = to_move(playout.move)
+                assert move in legal, board.fen()
+                board.push(move)
+            outcome = board.outcome()
+            if reason == GAME_OVER:
+                assert outcome is not None, board.fen()
+                assert (playout.termination, playout.winner) == (outcome.termination, outcome.winner), board.fen()
+            else:
+                assert outcome is None, board.fen()
+    return positions
@@ -0,0 +1,54 @@
+import threading
+
+
+class Ponderer:
+    """
+    Réflexion anticipée (« ponder ») : pendant que l'humain réfléchit, un thread poursuit la
+    recherche MCTS depuis la racine courante, ce qui répartit l'effort sur ses réponses probables.
+    Quand le coup arrive, on arrête le thread (entre deux itérations) avant de re-enraciner l'arbre :
+    le sous-arbre du coup joué a déjà été réchauffé.
+
+    Un thread suffit : le thread principal attend dans input(), qui libère le GIL.
+    """
+
+    def __init__(self, mcts):
+        """
+        :param mcts: instance MCTS dont l'arbre est partagé (elle ne doit pas être utilisée ailleurs pendant la réflexion)
+        """
+        self.mcts = mcts
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.iterations = 0
+        self._visits_before = {}
+
+    def start(self):
+        # Visites de chaque réponse avant la réflexion, pour mesurer ce qu'elle leur a apporté
+        self._visits_before = {child.move: child.visits for child in self.mcts.root.children}
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self):
+        self.mcts.best_move(stop_event=self.stop_event)
+        self.iterations = self.mcts.stats["iterations"]
+
+    def stop(self):
+        """
+        Arrête la réflexion à la fin de l'itération en cours.
+
+        :return: nombre d'itérations effectuées pendant la réflexion
+        """
+        self.stop_event.set()
+        self.thread.join()
+        return self.iterations
+
+    def pondered_visits(self, move):
+        """
+        Itérations de la réflexion passées dans le sous-arbre de move (à appeler après stop(),
+        avant le re-enracinement) : elles sont autant d'itérations gagnées pour le coup suivant de l'IA.
+        """
+        child = self.mcts.root.child_for(move)
+        if child is None:
+            return 0
+        return child.visits - self._visits_before.get(move, 0)
@@ -0,0 +1,239 @@
+import json
+import time
+from contextlib import nullcontext
+
+import chess
+
+# Contexte sans effet, partagé : coût d'une phase quand le profilage est désactivé
+NULL_PHASE = nullcontext()
+
+# Primitives python-chess chronométrées : nom affiché -> attribut de chess.Board.
+# legal_moves mesure la génération des coups (generate_legal_moves), itération comprise.
+CHESS_PRIMITIVES = {
+    "legal_moves": "generate_legal_moves",
+    "copy": "copy",
+    "push": "push",
+    "is_game_over": "is_game_over",
+}
+
+
+class _PhaseTimer:
+    """
+    Contexte chronométrant une phase ; le temps est exclusif (les phases imbriquées,
+    par exemple l'expansion appelée depuis la sélection, sont retirées de la phase englobante).
+    """
+
+    __slots__ = ("profiler", "name")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._stack.append([time.perf_counter(), 0.0])
+        return self
+
+    def __exit__(self, *exc_info):
+        stack = self.profiler._stack
+        start, nested = stack.pop()
+        elapsed = time.perf_counter() - start
+        totals = self.profiler.phases.setdefault(self.name, [0.0, 0])
+        totals[0] += elapsed - nested
+        totals[1] += 1
+        if stack:
+            stack[-1][1] += elapsed
+        return False
+
+
+class SearchProfiler:
+    """
+    Profilage d'une recherche MCTS : temps (exclusif) et nombre d'appels de chaque phase
+    (sélection, expansion, simulation, rétropropagation), et temps (inclusif) et nombre
+    d'appels des primitives de python-chess (génération des coups légaux, copy, push, is_game_over).
+
+    La recherche délimite ses phases par `with profiler.phase(nom):`. Les primitives sont
+    chronométrées en remplaçant, entre start() et stop() seulement, les méthodes de chess.Board :
+    cela vaut pour tous les plateaux, MaterialBoard compris.
+    Sans profileur, une recherche n'utilise que NULL_PHASE : le surcoût est négligeable.
+    """
+
+    def __init__(self, chess_primitives=True):
+        """
+        :param chess_primitives: False pour ne pas chronométrer les primitives de python-chess
+                                 (recherches sur d'autres jeux, voir patch)
+        """
+        self.chess_primitives = chess_primitives
+        self._timers = {}
+        self._patches = []
+        self._tracked = []
+        self._instrumented = []
+        self.reset()
+
+    def reset(self):
+        self.phases = {}        # nom -> [secondes, appels]
+        self.primitives = {}    # nom -> [secondes, appels]
+        self._stack = []
+        self.seconds = 0.0
+        self._start = None
+
+    def phase(self, name):
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = _PhaseTimer(self, name)
+        return timer
+
+    # Recherche profilée
+
+    def start(self):
+        self.reset()
+        if self.chess_primitives:
+            for name, attribute in CHESS_PRIMITIVES.items():
+                self.patch(chess.Board, attribute, name, generator=attribute == "generate_legal_moves")
+        for target, attribute in self._tracked:
+            self.patch(target, attribute)
+        for target, phase, attribute in self._instrumented:
+            self._patch_phase(target, phase, attribute)
+        self._start = time.perf_counter()
+        return self
+
+    def stop(self):
+        """
+        Fin de la recherche : les méthodes chronométrées retrouvent leur version d'origine.
+        """
+        self.seconds = time.perf_counter() - self._start
+        for target, attribute, original in reversed(self._patches):
+            if original is None:
+                delattr(target, attribute)
+            else:
+                setattr(target, attribute, original)
+        self._patches = []
+        return self
+
+    def track(self, target, *attributes):
+        """
+        Chronomètre les méthodes attributes de target pendant chaque recherche (de start() à
+        stop()), par exemple celles d'un adaptateur games.ALEGame pour core.MCTSCore.
+        """
+        self._tracked.extend((target, attribute) for attribute in attributes)
+        return self
+
+    def instrument(self, target, phases):
+        """
+        Chronomètre comme des phases des méthodes de target pendant chaque recherche, pour les
+        recherches qui ne délimitent pas elles-mêmes leurs phases (voir Chess/benchmark_suite.py).
+
+        :param phases: nom de la phase -> nom de la méthode (ou fonction d'un module) de target
+        """
+        self._instrumented.extend((target, phase, attribute) for phase, attribute in phases.items())
+        return self
+
+    def _patch_phase(self, target, phase, attribute):
+        original = vars(target).get(attribute)
+        function = getattr(target, attribute)
+        timer = self.phase(phase)
+
+        def timed(*args, **kwargs):
+            with timer:
+                return function(*args, **kwargs)
+        setattr(target, attribute, timed)
+        self._patches.append((target, attribute, original))
+
+    def patch(self, target, attribute, name=None, generator=False):
+        """
+        Chronomètre target.attribute (méthode d'une classe ou d'un objet) jusqu'à stop(),
+        par exemple env.step pour une recherche sur un environnement Gymnasium.
+
+        :param name: nom de la primitive dans le rapport (par défaut, attribute)
+        :param generator: True si la méthode est un générateur (le temps de chaque next() est compté)
+        """
+        # Attribut propre à target (None s'il est hérité : il suffira alors de supprimer la surcharge)
+        original = vars(target).get(attribute)
+        function = getattr(target, attribute)
+        wrap = self._timed_generator if generator else self._timed
+        setattr(target, attribute, wrap(name or attribute, function))
+        self._patches.append((target, attribute, original))
+
+    def _timed(self, name, function):
+        totals = self.primitives.setdefault(name, [0.0, 0])
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                totals[0] += time.perf_counter() - start
+                totals[1] += 1
+        return timed
+
+    def _timed_generator(self, name, function):
+        totals = self.primitives.setdefault(name, [0.0, 0])
+
+        def timed(*args, **kwargs):
+            # Le temps de génération est réparti sur les next() : on ne compte pas celui de l'appelant
+            totals[1] += 1
+            generator = function(*args, **kwargs)
+            while True:
+                start = time.perf_counter()
+                try:
+                    move = next(generator)
+                except StopIteration:
+                    totals[0] += time.perf_counter() - start
+                    return
+                totals[0] += time.perf_counter() - start
+                yield move
+        return timed
+
+    # Export
+
+    def report(self):
+        """
+        :return: {"seconds": durée de la recherche, "phases": {...}, "primitives": {...}}, chaque
+                 entrée donnant secondes, appels, µs par appel et part de la durée de la recherche
+        """
+        def entries(totals):
+            return {name: {"seconds": seconds,
+                           "calls": calls,
+                           "us_per_call": seconds / calls * 1e6 if calls else 0.0,
+                           "share": seconds / self.seconds if self.seconds > 0 else 0.0}
+                    for name, (seconds, calls) in totals.items()}
+        return {"seconds": self.seconds, "phases": entries(self.phases), "primitives": entries(self.primitives)}
+
+    def to_json(self, path=None):
+        """
+        Rapport au format JSON, écrit dans path s'il est donné.
+        """
+        text = json.dumps(self.report(), indent=2)
+        if path is not None:
+            with open(path, "w") as stream:
+                stream.write(text)
+        return text
+
+    def to_tensorboard(self, writer, step, prefix="mcts"):
+        """
+        Ajoute le rapport à un journal TensorBoard (une valeur par phase et par primitive).
+
+        :param writer: torch.utils.tensorboard.SummaryWriter, ou chemin du dossier de journaux
+        :param step: abscisse des valeurs (par exemple le numéro du coup)
+        """
+        if isinstance(writer, str):
+            from torch.utils.tensorboard import SummaryWriter
+            writer = SummaryWriter(writer)
+        report = self.report()
+        writer.add_scalar(f"{prefix}/seconds", report["seconds"], step)
+        for group in ("phases", "primitives"):
+            for name, values in report[group].items():
+                writer.add_scalar(f"{prefix}/{group}/{name}/seconds", values["seconds"], step)
+                writer.add_scalar(f"{prefix}/{group}/{name}/calls", values["calls"], step)
+                writer.add_scalar(f"{prefix}/{group}/{name}/share", values["share"], step)
+        writer.flush()
+        return writer
+
+
+def format_profile(report):
+    lines = [f"Recherche de {report['seconds']:.3f} s"]
+    for group, title in (("phases", "Phases"), ("primitives", "Primitives")):
+        lines.append(f"{title} :")
+        for name, values in sorted(report[group].items(), key=lambda item: -item[1]["seconds"]):
+            lines.append(f"  {name:16s} {values['seconds']:8.3f} s {values['share']:6.1%} "
+                         f"{values['calls']:9d} appels {values['us_per_call']:9.1f} µs/appel")
+    return "\n".join(lines)
@@ -0,0 +1,139 @@
+import random
+import time
+
+from utils import material_score
+
+
+def squash(score, scale=400):
+    """
+    Ramène un score en centipions dans [0, 1] (courbe logistique : 0 -> 0.5, +scale -> ~0.91).
+    """
+    return 1 / (1 + 10 ** (-score / scale))
+
+
+def white_material(board):
+    """
+    Bilan matériel du point de vue des blancs, en centipions (0 si matériel insuffisant).
+    """
+    # material_score renvoie le bilan blancs - noirs lorsqu'on l'évalue pour le joueur au trait
+    return material_score(board, board.turn)
+
+
+def material_evaluator(board):
+    """
+    Évaluateur par défaut des simulations tronquées : utils.material_score ramené dans [0, 1],
+    du point de vue des blancs.
+    """
+    return squash(white_material(board))
+
+
+def random_move(board):
+    return random.choice(list(board.legal_moves))
+
+
+def move_code(move):
+    """
+    Code entier d'un coup : case de départ, case d'arrivée << 6, promotion << 12 (le codage des
+    coups joués par playout.Playout, voir playout.to_move).
+    """
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+
+class Rollout:
+    """
+    Simulation (rollout) éventuellement tronquée : on joue jusqu'à la fin de la partie, sauf si
+    l'on atteint max_depth demi-coups (la position est alors notée par `evaluator`) ou si l'écart
+    matériel atteint adjudication_margin (la partie est alors adjugée au camp en avance).
+
+    Sans max_depth ni adjudication_margin, la simulation est identique à une partie aléatoire
+    jouée jusqu'à is_game_over(). Les compteurs servent à choisir le compromis vitesse/qualité
+    (longueur moyenne, simulations/s, part des simulations tronquées ou adjugées).
+
+    Avec record_moves (attribut), les coups de la dernière simulation sont gardés dans moves,
+    sous forme de codes (voir move_code) : c'est ce dont le RAVE a besoin (voir rave.py).
+    """
+
+    record_moves = False
+
+    def __init__(self, max_depth=None, evaluator=material_evaluator, adjudication_margin=None):
+        """
+        :param max_depth: nombre maximal de demi-coups joués (None : jusqu'à la fin de la partie)
+        :param evaluator: fonction plateau -> valeur dans [0, 1] du point de vue des blancs,
+                          appelée sur la position atteinte à max_depth
+        :param adjudication_margin: écart matériel (centipions, comme utils.material_score) à partir
+                                    duquel la partie est adjugée ; vérifié à chaque demi-coup, ce qui
+                                    ne coûte presque rien sur un evaluation.MaterialBoard
+        """
+        self.max_depth = max_depth
+        self.evaluator = evaluator
+        self.adjudication_margin = adjudication_margin
+        self.moves = None
+        self.reset()
+
+    def reset(self):
+        self.rollouts = 0
+        self.plies = 0
+        self.cutoffs = 0
+        self.adjudications = 0
+        self.seconds = 0.0
+
+    def play(self, board, choose_move=random_move):
+        """
+        Joue la simulation sur board (modifié en place ; une sous-classe peut jouer ailleurs, voir
+        playout.BitboardRollout : les coups joués sont alors ceux ajoutés à board.move_stack).
+
+        :param choose_move: politique de simulation, plateau -> coup (par défaut, un coup légal au hasard)
+        :return: (valeur, demi-coups joués) ; la valeur est None si la partie est allée à son terme
+                 (le résultat se lit alors avec winner(board)), sinon une valeur dans [0, 1] du point de vue des blancs
+        """
+        start = time.perf_counter()
+        value = None
+        plies = 0
+        moves = [] if self.record_moves else None
+        while not board.is_game_over():
+            if self.max_depth is not None and plies >= self.max_depth:
+                self.cutoffs += 1
+                value = self.evaluator(board)
+                break
+            if self.adjudication_margin is not None:
+                balance = white_material(board)
+                if abs(balance) >= self.adjudication_margin:
+                    self.adjudications += 1
+                    value = 1.0 if balance > 0 else 0.0
+                    break
+            move = choose_move(board)
+            board.push(move)
+            if moves is not None:
+                moves.append(move_code(move))
+            plies += 1
+        self.moves = moves
+        self.rollouts += 1
+        self.plies += plies
+        self.seconds += time.perf_counter() - start
+        return value, plies
+
+    def winner(self, board):
+        """
+        Vainqueur de la partie que play vient de terminer sur board (valeur None) :
+        chess.WHITE, chess.BLACK, ou None pour une nulle.
+        """
+        return (not board.turn) if board.is_checkmate() else None
+
+    def report(self):
+        """
+        Longueur moyenne des simulations, simulations/s et part des simulations tronquées ou adjugées.
+        """
+        rollouts = self.rollouts
+        return {
+            "rollouts": rollouts,
+            "avg_rollout_length": self.plies / rollouts if rollouts else 0.0,
+            "rollouts_per_sec": rollouts / self.seconds if self.seconds > 0 else 0.0,
+            "cutoff_rate": self.cutoffs / rollouts if rollouts else 0.0,
+            "adjudication_rate": self.adjudications / rollouts if rollouts else 0.0,
+        }
+
+
+def format_rollout_report(report):
+    return (f"{report['rollouts']} simulations, longueur moyenne {report['avg_rollout_length']:.1f} demi-coups, "
+            f"{report['rollouts_per_sec']:.1f} simulations/s, tronquées {report['cutoff_rate']:.0%}, "
+            f"adjugées {report['adjudication_rate']:.0%}")
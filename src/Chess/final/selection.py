@@ -0,0 +1,154 @@
+import math
+
+import numpy as np
+
+
+def ucb1_scores(visits, wins, parent_visits, c):
+    """
+    UCB1 « classique » : +inf pour un enfant jamais visité, sinon
+    wins / visits + c * sqrt(ln(parent_visits) / visits).
+    """
+    if not visits.all():
+        # Seuls les enfants jamais visités comptent (score infini) : argmax renverra le premier
+        return np.where(visits == 0, np.inf, 0.0)
+    return wins / visits + c * np.sqrt(math.log(parent_visits) / visits)
+
+
+def ucb1_smoothed_scores(visits, wins, parent_visits, c):
+    """
+    UCB1 lissé (Chess/_Node.py) : wins / (visits + 1e-6) + c * sqrt(ln(parent_visits + 1) / (visits + 1e-6)).
+    """
+    smoothed = visits + 1e-6
+    return wins / smoothed + c * np.sqrt(math.log(parent_visits + 1) / smoothed)
+
+
+def ucb1_all_scores(visits, wins, parent_visits, c):
+    """
+    UCB1 de Chess/all.py (Node.best_child) : wins / visits (0 si jamais visité)
+    + c * sqrt(ln(parent_visits) / (visits + 1e-6)).
+    """
+    q = wins / np.maximum(visits, 1)    # wins vaut 0 pour un enfant jamais visité
+    return q + c * np.sqrt(math.log(parent_visits) / (visits + 1e-6))
+
+
+def puct_scores(visits, wins, parent_visits, c):
+    """
+    PUCT avec a priori uniforme : Q + c * P * sqrt(parent_visits) / (1 + visits), Q = 0 si jamais visité.
+    """
+    q = wins / np.maximum(visits, 1)    # wins vaut 0 pour un enfant jamais visité
+    return q + (c * math.sqrt(parent_visits) / len(visits)) / (1 + visits)
+
+
+FORMULAS = {
+    "ucb1": ucb1_scores,
+    "ucb1-smoothed": ucb1_smoothed_scores,
+    "ucb1-all": ucb1_all_scores,
+    "puct": puct_scores,
+}
+
+
+class ChildStats:
+    """
+    Statistiques (visites, gains, valeur prouvée) des enfants d'un nœud, rangées dans des
+    tableaux NumPy dans l'ordre de création des enfants (celui de la liste `children`).
+
+    Le calcul vectorisé a un coût fixe (appel NumPy) d'une dizaine de µs : il ne devient
+    rentable qu'au-delà d'une trentaine d'enfants. Mesuré par benchmarks.py selection :
+    x1.0 à 20 enfants (ouverture), x1.5 à x2.0 à 33, x1.7 à x2.6 à 48. Aux facteurs de
+    branchement habituels des échecs, le gain est donc nul ou faible.
+    """
+
+    __slots__ = ("visits", "wins", "proven", "size")
+
+    def __init__(self, capacity=1):
+        capacity = max(capacity, 1)
+        self.visits = np.zeros(capacity, dtype=np.int64)
+        self.wins = np.zeros(capacity, dtype=np.float64)
+        self.proven = np.zeros(capacity, dtype=np.int8)
+        self.size = 0
+
+    def add(self):
+        """
+        Réserve la case du prochain enfant (la capacité double si besoin) et renvoie son indice.
+        """
+        if self.size == len(self.visits):
+            self.visits = np.concatenate((self.visits, np.zeros_like(self.visits)))
+            self.wins = np.concatenate((self.wins, np.zeros_like(self.wins)))
+            self.proven = np.concatenate((self.proven, np.zeros_like(self.proven)))
+        slot = self.size
+        self.size += 1
+        return slot
+
+    def select(self, parent_visits, c, formula="ucb1", skip_proven=False):
+        """
+        Score de tous les enfants en un seul appel vectorisé, puis argmax.
+
+        :param skip_proven: True pour écarter les enfants prouvés (sauf s'ils le sont tous)
+        :return: l'indice (dans l'ordre de création) de l'enfant choisi
+        """
+        n = self.size
+        if n == len(self.visits):
+            visits, wins = self.visits, self.wins
+        else:
+            visits, wins = self.visits[:n], self.wins[:n]
+        scores = FORMULAS[formula](visits, wins, parent_visits, c)
+        if skip_proven:
+            proven = self.proven[:n] != 0
+            if proven.any() and not proven.all():
+                scores = np.where(proven, -np.inf, scores)
+        return int(scores.argmax())
+
+
+class ArrayStatsMixin:
+    """
+    Mixin pour les nœuds dont visits/wins sont rangés dans le ChildStats de leur parent :
+    la sélection d'un enfant devient un seul calcul vectorisé (select_child). Une racine,
+    ou un nœud dont le parent n'a pas de ChildStats, garde ses statistiques dans un ChildStats
+    d'une seule case. Les enfants doivent être ajoutés à `children` dans leur ordre de création.
+
+    `formula` (classe) : formule utilisée par défaut, voir FORMULAS.
+    """
+
+    formula = "ucb1"
+
+    def __init__(self, *args, **kwargs):
+        self._stats = ChildStats(1)
+        self._slot = self._stats.add()
+        super().__init__(*args, **kwargs)
+        parent_stats = getattr(self.parent, "child_stats", None)
+        if parent_stats is not None:
+            self._stats = parent_stats
+            self._slot = parent_stats.add()
+        untried = getattr(self, "untried_moves", None)
+        self.child_stats = ChildStats(len(untried) if untried else 4)
+
+    @property
+    def visits(self):
+        return int(self._stats.visits[self._slot])
+
+    @visits.setter
+    def visits(self, value):
+        self._stats.visits[self._slot] = value
+
+    @property
+    def wins(self):
+        return float(self._stats.wins[self._slot])
+
+    @wins.setter
+    def wins(self, value):
+        self._stats.wins[self._slot] = value
+
+    @property
+    def proven(self):
+        return int(self._stats.proven[self._slot])
+
+    @proven.setter
+    def proven(self, value):
+        self._stats.proven[self._slot] = value
+
+    def select_child(self, c, formula=None, skip_proven=False):
+        """
+        Enfant de meilleur score selon `formula` (par défaut celle de la classe).
+        """
+        index = self.child_stats.select(self.visits, c, formula or self.formula, skip_proven)
+        return self.children[index]
@@ -0,0 +1,83 @@
+import chess
+
+# Valeur prouvée d'un nœud, du point de vue du camp qui a joué le coup menant au nœud
+# (le camp au trait dans le parent) : c'est ce camp qui choisit parmi les enfants.
+UNPROVEN = 0
+PROVEN_WIN = 1
+PROVEN_LOSS = -1
+
+
+def terminal_proof(outcome):
+    """
+    Valeur prouvée d'une position terminale : un mat est gagné pour le camp qui vient de jouer.
+    Les nulles ne sont pas prouvées (elles restent des feuilles évaluées comme avant).
+
+    :param outcome: chess.Outcome de la position, ou None si la partie continue
+    """
+    if outcome is not None and outcome.termination == chess.Termination.CHECKMATE:
+        return PROVEN_WIN
+    return UNPROVEN
+
+
+def children_proof(node):
+    """
+    Valeur prouvée de node d'après ses enfants (MCTS-Solver) : perdu pour le camp qui y a mené
+    si l'adversaire, au trait, a un coup gagnant prouvé ; gagné si tous ses coups sont développés
+    et prouvés perdants.
+    """
+    all_lost = True
+    for child in node.children:
+        proven = child.proven
+        if proven == PROVEN_WIN:
+            return PROVEN_LOSS
+        if proven != PROVEN_LOSS:
+            all_lost = False
+    if all_lost and node.children and node.is_fully_expanded():
+        return PROVEN_WIN
+    return UNPROVEN
+
+
+class ProofMixin:
+    """
+    Mixin des nœuds du MCTS-Solver : `proven` vaut UNPROVEN, PROVEN_WIN ou PROVEN_LOSS, du point
+    de vue du camp qui a joué le coup du nœud. Un nœud prouvé ne change plus : la sélection
+    l'écarte (best_child(..., skip_proven=True)) et la recherche s'arrête quand la racine l'est.
+    """
+
+    proven = UNPROVEN
+
+
+def prove(leaf, board=None):
+    """
+    Marque leaf s'il s'agit d'un mat, puis remonte la preuve vers la racine tant que chaque
+    parent devient lui aussi prouvé.
+
+    :param board: plateau de la position de leaf, si le nœud n'en garde pas (mode "replay")
+    :return: nombre de nœuds nouvellement prouvés
+    """
+    if leaf.proven != UNPROVEN:
+        return 0
+    proven = terminal_proof(leaf.outcome(board))
+    if proven == UNPROVEN:
+        return 0
+    leaf.proven = proven
+    count = 1
+    node = leaf.parent
+    while node is not None and node.proven == UNPROVEN:
+        proven = children_proof(node)
+        if proven == UNPROVEN:
+            break
+        node.proven = proven
+        count += 1
+        node = node.parent
+    return count
+
+
+def format_solver_report(report):
+    root = {PROVEN_WIN: "gagnée", PROVEN_LOSS: "perdue"}.get(report["root"], "non prouvée")
+    line = f"{report['proven']} nœuds prouvés, racine {root}"
+    if report["root"] != UNPROVEN:
+        line += f" à l'itération {report['proof_iteration']}"
+        if report["saved_iterations"] is not None:
+            line += f" ({report['saved_iterations']} itérations épargnées)"
+    return line
@@ -0,0 +1,28 @@
+import random
+
+from games import ChessGame
+from mcts import MCTS
+
+
+class StatsOnlyMCTS(MCTS):
+    """
+    MCTS dont la simulation renvoie un résultat aléatoire : la forme de l'arbre reste
+    celle d'une vraie recherche, sans le coût des parties simulées. Sert aux mesures de
+    benchmarks.py et aux tests de l'arbre (tests/).
+    """
+
+    def simulation(self, node):
+        return random.random()
+
+    def chess_game(self, board):
+        # Réglages par défaut : la simulation est celle de l'adaptateur de core.MCTSCore
+        return StatsOnlyGame(self.search_board(board), self.color_player, self.rollout)
+
+
+class StatsOnlyGame(ChessGame):
+    """
+    Adaptateur python-chess dont la simulation renvoie un résultat aléatoire (voir StatsOnlyMCTS).
+    """
+
+    def rollout(self):
+        return random.random()
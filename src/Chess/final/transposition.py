@@ -0,0 +1,157 @@
+from collections import OrderedDict
+
+import chess.polyglot
+
+REPLACEMENT_POLICIES = ("lru", "visits", "keep")
+
+
+def position_key(board):
+    """
+    Clé Zobrist (polyglot) de la position : identique pour toutes les suites de coups
+    qui mènent à la même position.
+    """
+    return chess.polyglot.zobrist_hash(board)
+
+
+class SharedStatsMixin:
+    """
+    Mixin pour les nœuds dont les statistiques vivent dans une entrée [visits, wins]
+    partagée par toutes les transpositions de la même position. Le nœud crée d'abord
+    sa propre entrée, que TranspositionTable.attach remplace éventuellement par
+    l'entrée déjà connue de la table.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.entry = [0, 0]
+        super().__init__(*args, **kwargs)
+
+    @property
+    def visits(self):
+        return self.entry[0]
+
+    @visits.setter
+    def visits(self, value):
+        self.entry[0] = value
+
+    @property
+    def wins(self):
+        return self.entry[1]
+
+    @wins.setter
+    def wins(self, value):
+        self.entry[1] = value
+
+
+def stats_identity(node):
+    """
+    Identifiant des statistiques d'un nœud : deux nœuds transposés partagent le même.
+    Sert à ne mettre à jour qu'une fois une entrée rencontrée plusieurs fois sur un chemin
+    (répétition de position).
+    """
+    entry = getattr(node, "entry", None)
+    return id(node) if entry is None else id(entry)
+
+
+class TranspositionTable:
+    """
+    Table de transposition du MCTS : clé Zobrist -> entrée de statistiques [visits, wins].
+
+    L'arbre reste un arbre (chaque nœud garde son parent et son coup), mais les nœuds
+    d'une même position partagent leurs statistiques : une transposition découverte hérite
+    immédiatement des simulations déjà faites, ce qui fait de l'arbre un DAG du point de vue
+    des statistiques.
+    """
+
+    def __init__(self, max_entries=200000, replacement="lru", sample_size=8):
+        """
+        :param max_entries: nombre maximal d'entrées conservées
+        :param replacement: politique de remplacement quand la table est pleine :
+                            "lru" (l'entrée la moins récemment utilisée), "visits" (la moins visitée
+                            parmi les `sample_size` plus anciennes) ou "keep" (on ne stocke plus rien)
+        :param sample_size: taille de l'échantillon examiné par la politique "visits"
+        """
+        if replacement not in REPLACEMENT_POLICIES:
+            raise ValueError(f"Politique de remplacement inconnue : {replacement}")
+        self.max_entries = max_entries
+        self.replacement = replacement
+        self.sample_size = sample_size
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rollouts_saved = 0     # Simulations héritées par les nœuds transposés
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, key):
+        """
+        Renvoie l'entrée associée à la clé, ou None (les compteurs hits/misses sont mis à jour).
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.rollouts_saved += entry[0]
+        if self.replacement == "lru":
+            self.entries.move_to_end(key)
+        return entry
+
+    def store(self, key, entry):
+        """
+        Ajoute une entrée, en appliquant la politique de remplacement si la table est pleine.
+
+        :return: True si l'entrée a été stockée
+        """
+        if len(self.entries) >= self.max_entries:
+            if self.replacement == "keep":
+                return False
+            self._evict()
+        self.entries[key] = entry
+        return True
+
+    def _evict(self):
+        if self.replacement == "lru":
+            self.entries.popitem(last=False)
+        else:
+            oldest = []
+            for key, entry in self.entries.items():
+                oldest.append((entry[0], key))
+                if len(oldest) == self.sample_size:
+                    break
+            del self.entries[min(oldest)[1]]
+        self.evictions += 1
+
+    def attach(self, node, board):
+        """
+        Rattache un nœud tout juste créé à l'entrée de sa position, ou enregistre la sienne.
+
+        :param node: nœud à statistiques partagées (SharedStatsMixin), encore jamais visité
+        :param board: plateau dans la position du nœud
+        """
+        key = position_key(board)
+        entry = self.lookup(key)
+        if entry is None:
+            self.store(key, node.entry)
+        else:
+            node.entry = entry
+        return node
+
+    def stats(self):
+        """
+        Compteurs de la table, par exemple pour mesurer les simulations économisées par coup.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "rollouts_saved": self.rollouts_saved,
+        }
+
+    def reset_counters(self):
+        self.hits = self.misses = self.evictions = self.rollouts_saved = 0
@@ -0,0 +1,259 @@
+import os
+import struct
+import time
+
+import numpy as np
+
+from transposition import position_key
+
+# En-tête du fichier : signature, version, demi-coup maximal des positions stockées, nombre d'entrées
+MAGIC = b"MCTSTREE"
+VERSION = 1
+_HEADER = struct.Struct("<8sIIQ8x")
+HEADER_SIZE = _HEADER.size      # 32 octets : les colonnes qui suivent restent alignées
+
+# Octets par entrée : clé (uint64), visites (uint32), gains (float32)
+BYTES_PER_ENTRY = 16
+
+# Plafond par défaut des visites héritées par un nœud : une fraction d'une recherche de 1000 itérations
+DEFAULT_MAX_VISITS = 100
+
+
+def collect_tree(root, board, depth=4, min_visits=1):
+    """
+    Statistiques des depth premiers niveaux d'un arbre MCTS, indexées par clé Zobrist.
+    Fonctionne avec tous les types de nœuds (children, move, visits, wins) : les coups sont
+    rejoués sur une copie de board, y compris pour les nœuds qui ne gardent pas de plateau.
+
+    :param root: racine de l'arbre
+    :param board: plateau dans la position de la racine
+    :param depth: profondeur maximale (0 : la racine seule)
+    :param min_visits: les nœuds moins visités sont ignorés, ainsi que leur sous-arbre
+    :return: (clés, visites, gains, demi-coup maximal), les trois premiers en tableaux NumPy
+    """
+    board = board.copy()
+    keys, visits, wins = [], [], []
+    max_ply = board.ply()
+    # Parcours en profondeur avec push/pop : (nœud, profondeur) ou None pour dépiler un coup
+    stack = [(root, 0)]
+    while stack:
+        item = stack.pop()
+        if item is None:
+            board.pop()
+            continue
+        node, level = item
+        if node is not root:
+            board.push(node.move)
+            stack.append(None)
+        keys.append(position_key(board))
+        visits.append(node.visits)
+        wins.append(node.wins)
+        max_ply = max(max_ply, board.ply())
+        if level < depth:
+            for child in node.children:
+                if child.visits >= min_visits:
+                    stack.append((child, level + 1))
+    return (np.array(keys, dtype=np.uint64), np.array(visits, dtype=np.uint32),
+            np.array(wins, dtype=np.float32), max_ply)
+
+
+def write_store(path, keys, visits, wins, max_ply):
+    """
+    Écrit un fichier de statistiques (remplacement atomique du fichier existant).
+    Les colonnes sont rangées l'une après l'autre, triées par clé.
+    """
+    order = np.argsort(keys, kind="stable")
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as stream:
+        stream.write(_HEADER.pack(MAGIC, VERSION, max_ply, len(keys)))
+        stream.write(np.ascontiguousarray(keys[order], dtype="<u8").tobytes())
+        stream.write(np.ascontiguousarray(visits[order], dtype="<u4").tobytes())
+        stream.write(np.ascontiguousarray(wins[order], dtype="<f4").tobytes())
+    os.replace(temporary, path)
+
+
+class TreeStore:
+    """
+    Connaissances d'ouverture persistantes : statistiques (visites, gains) des premiers niveaux
+    des arbres MCTS des parties précédentes, dans un fichier binaire compact indexé par clé
+    Zobrist (16 octets par position).
+
+    Le fichier est projeté en mémoire (np.memmap) : l'ouvrir ne lit que l'en-tête, quelle que
+    soit sa taille, et chaque recherche (dichotomie sur la colonne des clés, triée) ne touche
+    que quelques pages. Les nœuds créés dans une position connue démarrent avec ses statistiques
+    (seed) ; seules les positions jusqu'au demi-coup max_ply sont cherchées, le reste de la
+    partie ne coûte qu'une comparaison.
+
+    Seules les visites faites pendant la partie sont enregistrées (celles héritées du fichier
+    sont retranchées) et ajoutées au fichier : une partie n'y recompte pas les statistiques des
+    précédentes. Les gains sont stockés tels que l'arbre les compte : un fichier ne doit servir
+    qu'à des recherches de même convention (même programme, même couleur, même mode d'évaluation).
+    """
+
+    def __init__(self, path, max_visits=DEFAULT_MAX_VISITS):
+        """
+        :param path: fichier de statistiques (créé au premier flush s'il n'existe pas), hors des
+                     sources du paquet
+        :param max_visits: plafond des visites héritées par un nœud (les gains sont réduits
+                           dans la même proportion) ; None : statistiques reprises telles quelles
+        """
+        self.path = path
+        self.max_visits = max_visits
+        self._seeded = {}       # Clé -> (visites, gains) déjà comptés dans le fichier ou donnés aux nœuds
+        self._pending = []
+        self._pending_max_ply = -1
+        self.hits = 0
+        self.misses = 0
+        self.seeded_visits = 0
+        self.load_seconds = 0.0
+        self.open()
+
+    def open(self):
+        """
+        Projette le fichier en mémoire (sans rien lire d'autre que l'en-tête).
+        """
+        start = time.perf_counter()
+        self.keys = self.visits = self.wins = None
+        self.max_ply = -1
+        self.count = 0
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as stream:
+                magic, version, max_ply, count = _HEADER.unpack(stream.read(HEADER_SIZE))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"Fichier de statistiques invalide : {self.path}")
+            self.max_ply = max_ply
+            self.count = count
+            if count:
+                self.keys = np.memmap(self.path, dtype="<u8", mode="r", offset=HEADER_SIZE, shape=(count,))
+                self.visits = np.memmap(self.path, dtype="<u4", mode="r",
+                                        offset=HEADER_SIZE + 8 * count, shape=(count,))
+                self.wins = np.memmap(self.path, dtype="<f4", mode="r",
+                                      offset=HEADER_SIZE + 12 * count, shape=(count,))
+        self.load_seconds = time.perf_counter() - start
+        return self
+
+    def close(self):
+        self.keys = self.visits = self.wins = None
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, board):
+        """
+        :return: (visites, gains) de la position de board, ou None si elle n'est pas connue
+        """
+        found = self._find(board)
+        return None if found is None else found[1:]
+
+    def _find(self, board):
+        """
+        :return: (clé, visites, gains) de la position de board, ou None si elle n'est pas connue
+        """
+        if self.keys is None or board.ply() > self.max_ply:
+            return None
+        key = position_key(board)
+        index = int(self.keys.searchsorted(np.uint64(key)))
+        if index == self.count or self.keys[index] != key:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return key, int(self.visits[index]), float(self.wins[index])
+
+    def seed(self, node, board):
+        """
+        Donne à un nœud encore jamais visité les statistiques connues de sa position.
+
+        :param board: plateau dans la position du nœud
+        :return: True si le nœud a hérité de statistiques
+        """
+        if node.visits:
+            return False        # Par exemple une entrée de transposition déjà partagée
+        found = self._find(board)
+        if found is None:
+            return False
+        key, visits, wins = found
+        if self.max_visits is not None and visits > self.max_visits:
+            wins *= self.max_visits / visits
+            visits = self.max_visits
+        node.visits = visits
+        node.wins = wins
+        self._seeded[key] = (visits, wins)
+        self.seeded_visits += visits
+        return True
+
+    def record(self, root, board, depth=4, min_visits=1):
+        """
+        Met de côté les depth premiers niveaux d'un arbre (voir collect_tree), écrits au
+        prochain flush, sans les statistiques héritées du fichier (seed). Une position
+        enregistrée plusieurs fois garde ses dernières statistiques.
+        """
+        keys, visits, wins, max_ply = collect_tree(root, board, depth, min_visits)
+        if self._seeded:
+            visits = visits.astype(np.int64)
+            for index, key in enumerate(keys.tolist()):
+                seeded = self._seeded.get(key)
+                if seeded is not None:
+                    visits[index] -= seeded[0]
+                    wins[index] -= seeded[1]
+            fresh = visits > 0
+            keys, visits, wins = keys[fresh], visits[fresh].astype(np.uint32), wins[fresh]
+        self._pending.append((keys, visits, wins))
+        self._pending_max_ply = max(self._pending_max_ply, max_ply)
+        return len(keys)
+
+    def flush(self):
+        """
+        Ajoute les statistiques enregistrées à celles du fichier, puis réécrit le fichier. Pour
+        une position enregistrée plusieurs fois, seul l'enregistrement le plus récent compte
+        (l'arbre a continué de grandir entre les deux). Les statistiques ajoutées sont ensuite
+        retranchées des enregistrements suivants, comme celles héritées du fichier.
+
+        :return: nombre d'entrées du fichier
+        """
+        if not self._pending:
+            return self.count
+        # Du plus récent au plus ancien : np.unique garde la première occurrence de chaque clé
+        columns = list(reversed(self._pending))
+        keys = np.concatenate([column[0] for column in columns])
+        visits = np.concatenate([column[1] for column in columns])
+        wins = np.concatenate([column[2] for column in columns])
+        del columns
+        keys, first = np.unique(keys, return_index=True)
+        visits, wins = visits[first], wins[first]
+        for key, added_visits, added_wins in zip(keys.tolist(), visits.tolist(), wins.tolist()):
+            seeded_visits, seeded_wins = self._seeded.get(key, (0, 0.0))
+            self._seeded[key] = (seeded_visits + added_visits, seeded_wins + added_wins)
+        if self.keys is not None:
+            # Somme, position par position, des statistiques du fichier et de la partie
+            keys, inverse = np.unique(np.concatenate([self.keys, keys]), return_inverse=True)
+            visits = np.bincount(inverse, np.concatenate([self.visits, visits]), len(keys))
+            wins = np.bincount(inverse, np.concatenate([self.wins, wins]), len(keys))
+        visits = np.minimum(visits, np.iinfo(np.uint32).max).astype(np.uint32)
+        wins = np.asarray(wins, dtype=np.float32)
+        max_ply = max(self.max_ply, self._pending_max_ply)
+        # Le fichier projeté doit être libéré avant d'être remplacé
+        self.close()
+        write_store(self.path, keys, visits, wins, max_ply)
+        self._pending = []
+        self._pending_max_ply = -1
+        self.open()
+        return self.count
+
+    def report(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": self.count,
+            "bytes": HEADER_SIZE + self.count * BYTES_PER_ENTRY,
+            "max_ply": self.max_ply,
+            "load_ms": self.load_seconds * 1e3,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "seeded_visits": self.seeded_visits,
+        }
+
+
+def format_store_report(report):
+    return (f"{report['entries']} positions ({report['bytes'] / 2**20:.1f} Mo, ouvert en {report['load_ms']:.1f} ms), "
+            f"{report['hits']} positions reconnues sur {report['hits'] + report['misses']}, "
+            f"{report['seeded_visits']} visites héritées")
@@ -0,0 +1,269 @@
+import sys
+import threading
+import time
+
+import chess
+
+from mcts import MCTS
+from main import update_mcts_root
+from playout import BitboardRollout
+from budget import EarlyStop
+
+ENGINE_NAME = "MCTS Chess/final"
+ENGINE_AUTHOR = "Chess/final"
+INFO_INTERVAL = 0.5         # Secondes entre deux lignes info pendant une recherche
+DEFAULT_MOVES_TO_GO = 30    # Coups restants supposés pour répartir wtime/btime
+
+
+def principal_variation(root, max_length=32, first_move=None):
+    """
+    Variation principale : à partir de la racine, l'enfant le plus visité à chaque niveau.
+
+    :param first_move: premier coup imposé, celui du bestmove (avec le solveur, un coup prouvé
+                       gagnant peut ne pas être le plus visité de la racine)
+    """
+    moves = []
+    node = root
+    if first_move is not None:
+        node = root.child_for(first_move)
+        moves.append(first_move)
+        if node is None:
+            return moves
+    while node.children and len(moves) < max_length:
+        node = max(node.children, key=lambda child: child.visits)
+        moves.append(node.move)
+    return moves
+
+
+class UCIEngine:
+    """
+    Moteur UCI autour de mcts.MCTS, utilisable depuis un GUI ou depuis python-chess
+    (chess.engine.SimpleEngine.popen_uci([sys.executable, "uci.py"])).
+
+    Commandes : uci, isready, ucinewgame, setoption (Iterations, Ponder), position, go (movetime,
+    nodes, wtime/btime/winc/binc/movestogo, infinite, ponder), stop, ponderhit, quit. La recherche
+    tourne dans un thread ; un second thread envoie toutes les INFO_INTERVAL secondes une ligne
+    « info depth nodes nps time pv », où nodes compte les nœuds créés (la limite de go nodes).
+
+    L'arbre est gardé d'une commande position à la suivante quand la nouvelle position prolonge
+    la précédente avec le même camp au trait (les gains sont comptés pour ce camp). Une recherche
+    limitée s'arrête dès que le meilleur coup ne peut plus être rattrapé (budget.EarlyStop) : le
+    temps non utilisé reste à la pendule.
+    """
+
+    def __init__(self, output=sys.stdout, iterations=1000, info_interval=INFO_INTERVAL):
+        """
+        :param output: flux où sont écrites les réponses du moteur
+        :param iterations: itérations d'un go sans limite (option UCI Iterations)
+        :param info_interval: secondes entre deux lignes info
+        """
+        self.output = output
+        self.iterations = iterations
+        self.info_interval = info_interval
+        self.board = chess.Board()
+        self.mcts = None
+        self.tree_board = None      # Position de la racine de self.mcts
+        self.search_thread = None
+        self.stop_event = threading.Event()
+        self.pondering = False
+        self.ponder_seconds = None  # Temps de réflexion à appliquer au ponderhit
+        self._ponder_timer = None
+        self._output_lock = threading.Lock()
+
+    def send(self, line):
+        with self._output_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def handle(self, line):
+        """
+        Traite une commande UCI.
+
+        :return: False après quit, True sinon
+        """
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, arguments = tokens[0], tokens[1:]
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send(f"option name Iterations type spin default {self.iterations} min 1 max 100000000")
+            self.send("option name Ponder type check default false")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "ucinewgame":
+            self.stop()
+            self.mcts = None
+        elif command == "setoption":
+            self.set_option(arguments)
+        elif command == "position":
+            self.stop()
+            self.set_position(arguments)
+        elif command == "go":
+            self.stop()
+            self.go(arguments)
+        elif command == "stop":
+            self.stop()
+        elif command == "ponderhit":
+            self.ponderhit()
+        elif command == "quit":
+            self.stop()
+            return False
+        return True
+
+    def set_option(self, arguments):
+        # setoption name <nom> [value <valeur>]
+        if "name" not in arguments:
+            return
+        rest = arguments[arguments.index("name") + 1:]
+        name = " ".join(rest[:rest.index("value")] if "value" in rest else rest)
+        value = " ".join(rest[rest.index("value") + 1:]) if "value" in rest else None
+        if name.lower() == "iterations" and value is not None:
+            self.iterations = max(int(value), 1)
+
+    def set_position(self, arguments):
+        # position startpos|fen <FEN> [moves <coups>...]
+        if not arguments:
+            return
+        moves = arguments[arguments.index("moves") + 1:] if "moves" in arguments else []
+        if arguments[0] == "startpos":
+            board = chess.Board()
+        else:
+            end = arguments.index("moves") if "moves" in arguments else len(arguments)
+            board = chess.Board(" ".join(arguments[1:end]))
+        for uci in moves:
+            board.push_uci(uci)
+        self.board = board
+
+    def _tree(self):
+        """
+        MCTS dont la racine est self.board : l'arbre précédent re-enraciné si la position le
+        prolonge, sinon un nouvel arbre.
+        """
+        board = self.board
+        previous = self.tree_board
+        if (self.mcts is not None and board.turn == self.mcts.color_player
+                and board.root() == previous.root()
+                and board.move_stack[:len(previous.move_stack)] == previous.move_stack):
+            current = previous.copy()
+            for move in board.move_stack[len(previous.move_stack):]:
+                current.push(move)
+                self.mcts = update_mcts_root(self.mcts, move, current)
+        else:
+            self.mcts = MCTS(board, color_player=board.turn, iterations=self.iterations, rollout=BitboardRollout(),
+                             solver=True, early_stop=EarlyStop())
+        self.tree_board = board.copy()
+        return self.mcts
+
+    def go(self, arguments):
+        limits = {}
+        for name in ("movetime", "nodes", "wtime", "btime", "winc", "binc", "movestogo"):
+            if name in arguments:
+                limits[name] = int(arguments[arguments.index(name) + 1])
+        seconds = limits["movetime"] / 1000 if "movetime" in limits else None
+        own_time = limits.get("wtime" if self.board.turn == chess.WHITE else "btime")
+        if seconds is None and own_time is not None:
+            # Part du temps restant, plus l'incrément, sans jamais dépasser la moitié de la pendule
+            increment = limits.get("winc" if self.board.turn == chess.WHITE else "binc", 0)
+            seconds = min(own_time / limits.get("movestogo", DEFAULT_MOVES_TO_GO) + increment, own_time / 2) / 1000
+        nodes = limits.get("nodes")
+        iterations = self.iterations if seconds is None and nodes is None else None
+
+        self.pondering = "ponder" in arguments
+        until_stop = "infinite" in arguments or self.pondering
+        if until_stop:
+            # Sans limite jusqu'à stop ; au ponderhit, la limite de temps s'applique à partir de ce moment
+            self.ponder_seconds = seconds
+            seconds = nodes = iterations = None
+
+        mcts = self._tree()
+        self.stop_event.clear()
+        self.search_thread = threading.Thread(target=self._search, args=(mcts, iterations, seconds, nodes, until_stop),
+                                              daemon=True)
+        self.search_thread.start()
+
+    def _search(self, mcts, iterations, seconds, nodes, until_stop):
+        """
+        :param until_stop: go infinite ou go ponder : le bestmove n'est envoyé qu'après stop (ou ponderhit)
+        """
+        done = threading.Event()
+        first_node = mcts.nodes_created
+        start = time.perf_counter()
+        reporter = threading.Thread(target=self._report_until, args=(done, mcts, first_node, start), daemon=True)
+        reporter.start()
+        if mcts.root.is_terminal_node():
+            move = None
+            if until_stop:
+                self.stop_event.wait()
+        else:
+            move = mcts.best_move(iterations=iterations, seconds=seconds, nodes=nodes, stop_event=self.stop_event)
+            if until_stop:
+                # Racine prouvée (voir solver.py) : la recherche s'est arrêtée d'elle-même, le bestmove attend stop
+                self.stop_event.wait()
+        done.set()
+        reporter.join()
+        self._info(mcts, first_node, start, move)
+        if move is None:
+            self.send("bestmove 0000")
+            return
+        pv = principal_variation(mcts.root, 2, move)
+        ponder = f" ponder {pv[1].uci()}" if len(pv) > 1 else ""
+        self.send(f"bestmove {move.uci()}{ponder}")
+
+    def _report_until(self, done, mcts, first_node, start):
+        while not done.wait(self.info_interval):
+            self._info(mcts, first_node, start)
+
+    def _info(self, mcts, first_node, start, move=None):
+        """
+        :param move: bestmove de la recherche terminée, premier coup de la pv (None pendant la recherche)
+        """
+        elapsed = time.perf_counter() - start
+        nodes = mcts.nodes_created - first_node
+        pv = principal_variation(mcts.root, first_move=move)
+        line = (f"info depth {max(len(pv), 1)} nodes {nodes} nps {int(nodes / elapsed) if elapsed > 0 else 0} "
+                f"time {int(elapsed * 1000)}")
+        if pv:
+            line += " pv " + " ".join(move.uci() for move in pv)
+        self.send(line)
+
+    def ponderhit(self):
+        """
+        Le coup attendu a été joué : la réflexion devient une recherche normale, limitée par le
+        temps du go ponder (compté à partir de maintenant), ou arrêtée tout de suite sans limite de temps.
+        """
+        if self.search_thread is None or not self.pondering:
+            return
+        self.pondering = False
+        if self.ponder_seconds is None:
+            self.stop_event.set()
+        else:
+            self._ponder_timer = threading.Timer(self.ponder_seconds, self.stop_event.set)
+            self._ponder_timer.daemon = True
+            self._ponder_timer.start()
+
+    def stop(self):
+        """
+        Arrête la recherche en cours (qui envoie alors son bestmove) et attend sa fin.
+        """
+        if self.search_thread is None:
+            return
+        self.stop_event.set()
+        self.search_thread.join()
+        self.search_thread = None
+        if self._ponder_timer is not None:
+            self._ponder_timer.cancel()
+            self._ponder_timer = None
+
+
+def main():
+    engine = UCIEngine()
+    for line in sys.stdin:
+        if not engine.handle(line):
+            break
+
+
+if __name__ == "__main__":
+    main()
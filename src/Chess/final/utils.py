@@ -11,6 +11,11 @@ PV = {
 DRAW_VALUE = 0
 
 def material_score(board, color_player):
+    # Plateau à bilan incrémental (evaluation.MaterialBoard) : score en O(1), identique
+    incremental_score = getattr(board, "material_score", None)
+    if incremental_score is not None:
+        return incremental_score(color_player)
+
     if board.is_insufficient_material():
         return DRAW_VALUE
 
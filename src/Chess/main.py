@@ -1,6 +1,7 @@
 import chess
 from Chess._MCTS import MCTS
 from Chess._Node import Node 
+from nodecache import format_cache_report
 import random
 
 def print_tree(node, indent=0, max_depth=2):
@@ -32,6 +33,9 @@ def main():
     print("\nLancement du MCTS...")
     best_move_found, best_child = mcts.best_move(root)
     print("\n✔ 1000 simulations effectuées.")
+    print(f"Simulations : longueur moyenne {mcts.stats['avg_rollout_length']:.1f} demi-coups, "
+          f"{mcts.stats['rollouts_per_sec']:.1f} simulations/s")
+    print("Cache des nœuds :", format_cache_report(mcts.stats["node_cache"]))
     print(f"Meilleur coup trouvé par le MCTS : {best_move_found}")
 
     print("\n🌳 Arbre partiel de recherche MCTS :")
@@ -45,7 +49,7 @@ def main():
     if best_child is not None:
         root = best_child
     else:
-        root = Node(board.copy())
+        root = Node(board)
     
     print("\nNouvel état de l'échiquier après le coup du MCTS :")
     print(board)
@@ -62,14 +66,8 @@ def main():
         board.push(move)
         
         # Mise à jour de l'arbre : si le sous-arbre correspondant existe, on le récupère.
-        found = False
-        for child in root.children:
-            if child.move == move:
-                root = child
-                found = True
-                break
-        if not found:
-            root = Node(board.copy())
+        child = root.child_for(move)
+        root = child if child is not None else Node(board)
         
         print(board, "\n")
     
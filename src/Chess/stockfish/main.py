@@ -1,11 +1,57 @@
+import argparse
 import chess
 import numpy as np
 import random
 import math
+import os
+import sys
 
-class MCTSNode:
-    def __init__(self, board, parent=None, move=None):
-        self.board = board.copy()
+# Lancé comme script (python main.py), le paquet Chess n'ajoute pas Chess/final au chemin
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "final"))
+from selection import ArrayStatsMixin
+from evaluation import MaterialBoard
+from budget import SearchBudget, format_report
+from rollout import Rollout, format_rollout_report
+from memory import TreeBudget, format_memory_report
+from treestore import TreeStore, format_store_report
+from opponent import HeuristicOpponent
+from nodecache import CachedStateMixin, ChildIndexMixin, COUNTERS as CACHE_COUNTERS, format_cache_report
+
+# Valeurs de material_diff indexées par type de pièce, pour le bilan incrémental des MaterialBoard
+MATERIAL_DIFF_VALUES = (0, 1, 3, 3, 5, 9, 0)
+
+# Tables de la politique de simulation biaisée par les prises, indexées par type de pièce :
+# gain matériel d'une prise (valeur de la victime, MVV) et d'une promotion (pièce promue moins le pion)
+CAPTURE_GAINS = MATERIAL_DIFF_VALUES
+PROMOTION_GAINS = tuple(value - 1 if value else 0 for value in MATERIAL_DIFF_VALUES)
+
+def capture_gains(board):
+    """
+    Gain matériel immédiat de chaque coup légal pour le camp au trait (comme la différence de
+    material_diff avant et après le coup), sans jouer les coups.
+
+    :return: (coups légaux, gains en tableau NumPy)
+    """
+    legal_moves = list(board.legal_moves)
+    them = board.occupied_co[not board.turn]
+    piece_type_at = board.piece_type_at
+    # Case de prise en passant, si un pion peut y aller (la prise rapporte un pion)
+    en_passant = board.ep_square if board.ep_square is not None else -1
+    pawns = board.pawns
+    gains = [CAPTURE_GAINS[piece_type_at(move.to_square)] if chess.BB_SQUARES[move.to_square] & them
+             else 1 if move.to_square == en_passant and pawns & chess.BB_SQUARES[move.from_square]
+             else 0
+             for move in legal_moves]
+    for index, move in enumerate(legal_moves):
+        if move.promotion:
+            gains[index] += PROMOTION_GAINS[move.promotion]
+    return legal_moves, np.array(gains, dtype=np.float64)
+
+
+class MCTSNode(CachedStateMixin, ChildIndexMixin):
+    def __init__(self, board, parent=None, move=None, copy_board=True):
+        # copy_board=False : le plateau fourni est déjà une copie propre à ce nœud
+        self.board = board.copy() if copy_board else board
         self.parent = parent
         self.move = move  # Coup qui a mené à cet état
         self.children = []
@@ -25,29 +71,68 @@ class MCTSNode:
         move = self.untried_moves.pop()
         new_board = self.board.copy()
         new_board.push(move)
-        child_node = MCTSNode(new_board, parent=self, move=move)
-        self.children.append(child_node)
-        return child_node
+        child_node = type(self)(new_board, parent=self, move=move, copy_board=False)
+        return self.add_child(child_node)
         
     def is_fully_expanded(self):
         """Vérifie si tous les coups possibles ont été essayés"""
         return len(self.untried_moves) == 0
         
+    def _has_moves(self, board):
+        # Coups légaux = coups non essayés + coups des enfants
+        return bool(self.untried_moves or self.children)
+
     def is_terminal_node(self):
-        """Vérifie si le nœud est terminal (partie terminée)"""
-        return self.board.is_game_over()
+        """Vérifie si le nœud est terminal (partie terminée), calculé une seule fois par nœud"""
+        return self.is_terminal()
+
+
+class VectorMCTSNode(ArrayStatsMixin, MCTSNode):
+    """
+    MCTSNode dont la sélection UCT (même formule que MCTSNode.uct_select_child) est calculée
+    en un seul appel vectorisé (tableaux NumPy). Pas plus rapide à une vingtaine d'enfants,
+    voir selection.ChildStats ; l'élagage de TreeBudget ne s'applique pas à ces nœuds.
+    """
+
+    def uct_select_child(self, c_param=1.41, formula=None):
+        return self.select_child(c_param, formula)
 
 class MCTS:
-    def __init__(self, board):
+    def __init__(self, board, node_class=MCTSNode, rollout=None, tree_budget=None, tree_store=None, rng=None):
         """
         Initialise le MCTS avec un échiquier
+
+        :param node_class: MCTSNode, ou VectorMCTSNode pour la sélection vectorisée
+        :param rollout: Rollout (Chess/final/rollout.py) : profondeur maximale, évaluateur et adjudication
+                        des simulations (None : parties jouées jusqu'au bout)
+        :param tree_budget: TreeBudget (Chess/final/memory.py) bornant le nombre de nœuds gardés
+                            d'un coup à l'autre (MCTSNode seulement)
+        :param tree_store: TreeStore (Chess/final/treestore.py) dont les statistiques servent
+                           de point de départ aux nœuds créés dans une position connue
+        :param rng: np.random.Generator des tirages de capture_biased_move (None : générateur
+                    initialisé depuis le module random, que random.seed rend donc reproductible)
         """
-        self.root = MCTSNode(board)
+        self.node_class = node_class
+        self.rng = rng if rng is not None else np.random.default_rng(random.getrandbits(64))
+        self.rollout = rollout or Rollout()
+        self.tree_store = tree_store
+        self.root = node_class(board)
+        if tree_store is not None:
+            tree_store.seed(self.root, self.root.board)
+        self.tree_budget = tree_budget
+        if tree_budget is not None:
+            tree_budget.reset(self.root)
+        self.nodes_created = 0  # Nœuds créés par expansion depuis la création de l'instance
+        self.stats = {}
         
     def material_diff(self, board):
         """
         Calcule la différence de matériel du point de vue des blancs
+        (en O(1) pour un evaluation.MaterialBoard, sinon en parcourant les 64 cases)
         """
+        if isinstance(board, MaterialBoard):
+            return board.material(MATERIAL_DIFF_VALUES)
+
         piece_values = {
             chess.PAWN: 1,
             chess.KNIGHT: 3, 
@@ -71,6 +156,47 @@ class MCTS:
         
         return white_material - black_material
     
+    def capture_biased_move(self, board):
+        """
+        Coup de simulation aléatoire mais légèrement biaisé par la capture de pièces.
+        Même loi que material_biased_move, sans jouer les coups : le gain matériel de chaque coup
+        est lu dans les tables CAPTURE_GAINS / PROMOTION_GAINS, et le tirage pondéré est vectorisé.
+        """
+        legal_moves, gains = capture_gains(board)
+        # Même bruit d'exploration et même plancher que material_biased_move
+        rng = self.rng
+        weights = np.maximum(gains + rng.random(len(gains)) * 0.1, 0.01).cumsum()
+        return legal_moves[int(weights.searchsorted(rng.random() * weights[-1], side="right"))]
+
+    def material_biased_move(self, board):
+        """
+        Version de référence de capture_biased_move : chaque coup est joué (push/pop) et son
+        gain mesuré par material_diff. Beaucoup plus lente, elle sert à vérifier la loi des coups.
+        """
+        legal_moves = list(board.legal_moves)
+        # Simuler chaque coup (push/pop sur le plateau de la simulation) et évaluer le matériel
+        move_values = []
+        material_before = self.material_diff(board)
+        for move in legal_moves:
+            board.push(move)
+            # Si le coup capture une pièce, il est plus probable d'être choisi
+            material_after = self.material_diff(board)
+            board.pop()
+            # Pour les blancs, un gain matériel est positif
+            # Pour les noirs, un gain matériel est négatif par rapport à la fonction material_diff
+            if board.turn == chess.WHITE:
+                material_gain = material_after - material_before
+            else:
+                material_gain = material_before - material_after
+            
+            # Ajouter un peu de bruit pour l'exploration
+            move_values.append(material_gain + random.uniform(0, 0.1))
+        
+        # Sélectionner un coup avec plus de chance pour les coups ayant un gain matériel
+        total = sum(max(val, 0.01) for val in move_values)  # Éviter les divisions par zéro
+        move_probs = [max(val, 0.01)/total for val in move_values]
+        return random.choices(legal_moves, weights=move_probs, k=1)[0]
+    
     def selection(self):
         """Phase de sélection: parcourir l'arbre jusqu'à un nœud non complètement développé"""
         node = self.root
@@ -81,7 +207,13 @@ class MCTS:
     def expansion(self, node):
         """Phase d'expansion: ajoute un nouveau nœud à l'arbre"""
         if not node.is_terminal_node() and not node.is_fully_expanded():
-            return node.expand()
+            self.nodes_created += 1
+            child = node.expand()
+            if self.tree_budget is not None:
+                self.tree_budget.node_added(child)
+            if self.tree_store is not None:
+                self.tree_store.seed(child, child.board)
+            return child
         return node
     
     def simulation(self, node):
@@ -92,33 +224,11 @@ class MCTS:
         board = node.board.copy()
         
         try:
-            # Jouer la partie jusqu'à la fin avec des coups aléatoires
-            while not board.is_game_over():
-                legal_moves = list(board.legal_moves)
-                if legal_moves:
-                    # Simuler chaque coup et évaluer le matériel
-                    move_values = []
-                    for move in legal_moves:
-                        board_copy = board.copy()
-                        board_copy.push(move)
-                        # Si le coup capture une pièce, il est plus probable d'être choisi
-                        material_after = self.material_diff(board_copy)
-                        material_before = self.material_diff(board)
-                        # Pour les blancs, un gain matériel est positif
-                        # Pour les noirs, un gain matériel est négatif par rapport à la fonction material_diff
-                        if board.turn == chess.WHITE:
-                            material_gain = material_after - material_before
-                        else:
-                            material_gain = material_before - material_after
-                        
-                        # Ajouter un peu de bruit pour l'exploration
-                        move_values.append(material_gain + random.uniform(0, 0.1))
-                    
-                    # Sélectionner un coup avec plus de chance pour les coups ayant un gain matériel
-                    total = sum(max(val, 0.01) for val in move_values)  # Éviter les divisions par zéro
-                    move_probs = [max(val, 0.01)/total for val in move_values]
-                    selected_move = random.choices(legal_moves, weights=move_probs, k=1)[0]
-                    board.push(selected_move)
+            # Jouer la partie jusqu'à la fin (ou jusqu'à la troncature de self.rollout) avec des coups biaisés
+            value, _ = self.rollout.play(board, self.capture_biased_move)
+            if value is not None:
+                # Simulation tronquée ou adjugée : valeur déjà du point de vue des blancs
+                return value
                 
             # Évaluation du résultat du point de vue des blancs
             if board.is_checkmate():
@@ -146,11 +256,24 @@ class MCTS:
             node.wins += result
             node = node.parent
     
-    def get_best_move(self, simulations=10):
+    def get_best_move(self, simulations=10, seconds=None, nodes=None, stop_event=None):
         """
-        Exécute le MCTS et retourne le meilleur coup
+        Exécute le MCTS dans la limite du budget et retourne le meilleur coup.
+        Le bilan (itérations, nœuds créés, nœuds/s, simulations, cache, arbre) est rangé dans self.stats.
+
+        :param simulations: nombre maximal de simulations (ignoré si seconds ou nodes est donné)
+        :param seconds: temps de réflexion maximal en secondes
+        :param nodes: nombre maximal de nœuds créés
+        :param stop_event: threading.Event ; la recherche s'arrête, entre deux simulations, dès qu'il est levé
         """
-        for _ in range(simulations):
+        if seconds is not None or nodes is not None:
+            simulations = None
+        budget = SearchBudget(simulations, seconds, nodes, stop_event).start()
+        self.rollout.reset()
+        cache_snapshot = CACHE_COUNTERS.snapshot()
+        first_node = self.nodes_created
+        done = 0
+        while not budget.exhausted(done, self.nodes_created - first_node):
             # Phase 1: Sélection
             node = self.selection()
             
@@ -163,6 +286,18 @@ class MCTS:
             
             # Phase 4: Rétropropagation
             self.backpropagation(node, result)
+            if self.tree_budget is not None:
+                # Élagage incrémental : une tranche bornée entre deux simulations
+                if self.tree_budget.policy == "recent":
+                    self.tree_budget.touch(node)
+                self.tree_budget.step(self.root)
+            done += 1
+
+        self.stats = budget.report(done, self.nodes_created - first_node)
+        self.stats["rollout"] = self.rollout.report()
+        self.stats["node_cache"] = CACHE_COUNTERS.since(cache_snapshot)
+        if self.tree_budget is not None:
+            self.stats["tree"] = self.tree_budget.report()
         
         # Retourner le coup qui a été le plus visité
         if not self.root.children:
@@ -181,17 +316,24 @@ class MCTS:
         """
         Met à jour la racine de l'arbre après que l'adversaire a joué
         """
-        # Chercher si le nœud existe déjà dans les enfants
-        for child in self.root.children:
-            if child.move == move:
-                self.root = child
-                self.root.parent = None  # Détacher de l'ancien parent
-                return
+        # Chercher si le nœud existe déjà dans les enfants (index coup -> enfant)
+        child = self.root.child_for(move)
+        if child is not None:
+            if self.tree_budget is not None:
+                # Les sous-arbres abandonnés sortent du compte de nœuds
+                self.tree_budget.rerooted(self.root, child)
+            self.root = child
+            self.root.parent = None  # Détacher de l'ancien parent
+            return
         
         # Si le coup n'a pas été exploré, créer un nouveau nœud racine
         new_board = self.root.board.copy()
         new_board.push(move)
-        self.root = MCTSNode(new_board)
+        self.root = self.node_class(new_board, copy_board=False)
+        if self.tree_store is not None:
+            self.tree_store.seed(self.root, new_board)
+        if self.tree_budget is not None:
+            self.tree_budget.reset(self.root)
 
 
 def get_smart_random_move(board):
@@ -200,70 +342,53 @@ def get_smart_random_move(board):
     - Priorise les captures
     - Évite de perdre du matériel si possible
     - Priorise les échecs
+    Le choix est fait par opponent.HeuristicOpponent, sans copie du plateau.
     """
-    legal_moves = list(board.legal_moves)
-    if not legal_moves:
-        return None
-    
-    # Évaluer chaque coup
-    move_scores = []
-    for move in legal_moves:
-        score = 0
-        # Capture ?
-        if board.is_capture(move):
-            captured_piece = board.piece_at(move.to_square)
-            if captured_piece:
-                piece_values = {
-                    chess.PAWN: 1,
-                    chess.KNIGHT: 3, 
-                    chess.BISHOP: 3,
-                    chess.ROOK: 5,
-                    chess.QUEEN: 9,
-                    chess.KING: 100  # Valeur arbitrairement élevée
-                }
-                score += piece_values.get(captured_piece.piece_type, 1)
-        
-        # Échec ?
-        board_copy = board.copy()
-        board_copy.push(move)
-        if board_copy.is_check():
-            score += 0.5
-        
-        # Évite de mettre sa pièce en prise
-        moving_piece = board.piece_at(move.from_square)
-        board_copy = board.copy()
-        board_copy.push(move)
-        if board_copy.is_attacked_by(not board.turn, move.to_square):
-            piece_values = {
-                chess.PAWN: 1,
-                chess.KNIGHT: 3, 
-                chess.BISHOP: 3,
-                chess.ROOK: 5,
-                chess.QUEEN: 9,
-                chess.KING: 100
-            }
-            score -= piece_values.get(moving_piece.piece_type, 0) * 0.8
-        
-        # Un peu d'aléatoire
-        score += random.uniform(0, 0.2)
-        
-        move_scores.append((move, score))
-    
-    # Trier par score
-    move_scores.sort(key=lambda x: x[1], reverse=True)
-    
-    # 70% du temps prendre le meilleur coup, 30% prendre un coup aléatoire
-    if random.random() < 0.7:
-        return move_scores[0][0]
-    else:
-        return random.choice(legal_moves)
+    return _SMART_OPPONENT.choose_move(board)
+
+
+_SMART_OPPONENT = HeuristicOpponent()
+
+
+def print_search_stats(stats):
+    """
+    Affiche le bilan d'une recherche (MCTS.stats, rempli par get_best_move).
+    """
+    print("Recherche :", format_report(stats))
+    print("Simulations :", format_rollout_report(stats["rollout"]))
+    print("Cache des nœuds :", format_cache_report(stats["node_cache"]))
+    if "tree" in stats:
+        print("Arbre :", format_memory_report(stats["tree"]))
+
 
+def main(tree_store_path=None, max_tree_nodes=None, incremental_evaluation=False, vector_selection=False):
+    """
+    Partie MCTS (blancs) contre get_smart_random_move (noirs). Les modes optionnels sont désactivés
+    par défaut (comportement d'origine) et s'activent par paramètre ou par option de la ligne de commande.
 
-def main():
-    board = chess.Board()
+    :param tree_store_path: fichier des statistiques d'ouverture gardées d'une partie à l'autre
+                            (None : aucune, voir Chess/final/treestore.py)
+    :param max_tree_nodes: nombre maximal de nœuds gardés d'un coup à l'autre (None : illimité,
+                           voir Chess/final/memory.py)
+    :param incremental_evaluation: bilan matériel tenu à jour à chaque coup, material_diff en O(1)
+                                   pendant les simulations (voir Chess/final/evaluation.py)
+    :param vector_selection: nœuds VectorMCTSNode (sélection UCT vectorisée, incompatible avec max_tree_nodes)
+    """
+    if vector_selection and max_tree_nodes:
+        raise ValueError("max_tree_nodes ne s'applique qu'aux nœuds MCTSNode")
+    board = MaterialBoard() if incremental_evaluation else chess.Board()
     
     # Créer le MCTS
-    mcts = MCTS(board)
+    # Statistiques d'ouverture gardées d'une partie à l'autre (gains du point de vue des blancs)
+    tree_store = TreeStore(tree_store_path) if tree_store_path is not None else None
+    store_plies = 16  # Les arbres des 16 premiers demi-coups sont enregistrés sur 3 niveaux
+    if tree_store is not None:
+        print("Statistiques d'ouverture :", format_store_report(tree_store.report()))
+    # Élagage incrémental des sous-arbres peu visités au-delà de max_tree_nodes nœuds
+    mcts = MCTS(board, node_class=VectorMCTSNode if vector_selection else MCTSNode,
+                tree_budget=TreeBudget(max_tree_nodes) if max_tree_nodes else None, tree_store=tree_store)
+    move_time = None  # Temps de réflexion maximal par coup, en secondes (None : 1000 simulations)
+    # Pour des simulations plus courtes : MCTS(board, rollout=Rollout(max_depth=80, adjudication_margin=900))
     
     # Ouverture prédéfinie pour les blancs (par exemple, l'ouverture italienne)
     opening_moves = ["e2e4", "g1f3", "f1c4"]  # e4, Nf3, Bc4
@@ -284,10 +409,16 @@ def main():
             else:
                 # Utiliser MCTS pour trouver le meilleur coup
                 print("MCTS réfléchit...")
-                move = mcts.get_best_move(simulations=1000)  # Ajustez le nombre de simulations
+                # Ajustez le nombre de simulations, ou fixez un temps de réflexion (move_time)
+                move = mcts.get_best_move(simulations=1000, seconds=move_time)
+                print_search_stats(mcts.stats)
                 print(f"MCTS a choisi: {move}")
+                if tree_store is not None and board.ply() < store_plies:
+                    tree_store.record(mcts.root, board, depth=3)
             
             board.push(move)
+            # La racine suit aussi les coups des blancs (sinon le coup noir suivant ne serait pas trouvé)
+            mcts.update_root(move)
         else:
             # Adversaire "semi-intelligent" pour les noirs
             move = get_smart_random_move(board)
@@ -300,8 +431,23 @@ def main():
         print(board)
         print("-------------------")
     
+    if tree_store is not None:
+        tree_store.flush()
+        print("Statistiques d'ouverture enregistrées :", format_store_report(tree_store.report()))
     print("Partie terminée")
     print(f"Résultat: {board.result()}")
 
+def parse_args(arguments=None):
+    parser = argparse.ArgumentParser(description="Partie MCTS contre un adversaire heuristique.")
+    parser.add_argument("--tree-store", dest="tree_store_path", metavar="PATH", default=None,
+                        help="fichier des statistiques d'ouverture gardées d'une partie à l'autre")
+    parser.add_argument("--max-tree-nodes", type=int, default=None,
+                        help="nombre maximal de nœuds gardés d'un coup à l'autre (voir Chess/final/memory.py)")
+    parser.add_argument("--incremental-evaluation", action="store_true",
+                        help="bilan matériel tenu à jour à chaque coup (voir Chess/final/evaluation.py)")
+    parser.add_argument("--vector-selection", action="store_true",
+                        help="sélection UCT vectorisée (VectorMCTSNode, voir Chess/final/selection.py)")
+    return parser.parse_args(arguments)
+
 if __name__ == "__main__":
-    main()
+    main(**vars(parse_args()))
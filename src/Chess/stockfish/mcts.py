@@ -11,11 +11,13 @@ from node import MCTSNode
 stockfish_path = os.path.join("/Applications/Stockfish.app/Contents/MacOS", "stockfish")
 
 class MCTS:
-    def __init__(self, board, stockfish_path="stockfish"):
+    def __init__(self, board, stockfish_path="stockfish", node_class=MCTSNode):
         """
         Initialise le MCTS avec un échiquier et le chemin vers Stockfish
+
+        :param node_class: MCTSNode, ou node.VectorMCTSNode pour la sélection vectorisée
         """
-        self.root = MCTSNode(board)
+        self.root = node_class(board)
         self.stockfish_path = stockfish_path
         self.engine = None
         self.external_engine = None  # Pour utiliser un moteur déjà ouvert
@@ -2,10 +2,17 @@ import chess
 import numpy as np
 import random
 import math
+import os
+import sys
+
+# Modules partagés de Chess/final (importés à plat, comme dans ce dossier)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "final"))
+from selection import ArrayStatsMixin
 
 class MCTSNode:
-    def __init__(self, board, parent=None, move=None):
-        self.board = board.copy()
+    def __init__(self, board, parent=None, move=None, copy_board=True):
+        # copy_board=False : le plateau fourni est déjà une copie propre à ce nœud
+        self.board = board.copy() if copy_board else board
         self.parent = parent
         self.move = move
         self.children = []
@@ -25,7 +32,7 @@ class MCTSNode:
         move = self.untried_moves.pop()
         new_board = self.board.copy()
         new_board.push(move)
-        child_node = MCTSNode(new_board, parent=self, move=move)
+        child_node = type(self)(new_board, parent=self, move=move, copy_board=False)
         self.children.append(child_node)
         return child_node
         
@@ -36,3 +43,13 @@ class MCTSNode:
     def is_terminal_node(self):
         """Vérifie si le nœud est terminal (partie terminée)"""
         return self.board.is_game_over()
+
+
+class VectorMCTSNode(ArrayStatsMixin, MCTSNode):
+    """
+    MCTSNode dont la sélection UCT (même formule que uct_select_child) est calculée en un seul
+    appel vectorisé (tableaux NumPy). Pas plus rapide à une vingtaine d'enfants, voir selection.ChildStats.
+    """
+
+    def uct_select_child(self, c_param=1.41, formula=None):
+        return self.select_child(c_param, formula)
@@ -1,12 +1,25 @@
 import chess
 import random
 import math
+import os
+import sys
+
+# Lancé comme script (python test_vs_bot.py), le paquet Chess n'ajoute pas Chess/final au chemin
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "final"))
+from treestore import TreeStore, format_store_report
+from nodecache import CachedStateMixin, ChildIndexMixin
+
+# Fichier des statistiques d'ouverture gardées d'une partie à l'autre, hors des sources du paquet
+# (None : chaque partie repart d'un arbre vide)
+TREE_STORE_PATH = None
+STORE_PLIES = 16    # Les arbres des STORE_PLIES premiers demi-coups sont enregistrés...
+STORE_DEPTH = 3     # ... sur STORE_DEPTH niveaux
 
 # =============================================================================
 # Classes MCTS et Node
 # =============================================================================
 
-class Node:
+class Node(CachedStateMixin, ChildIndexMixin):
     def __init__(self, board, parent=None, move=None):
         self.board = board.copy()    # Copie de l'état de l'échiquier
         self.parent = parent         # Nœud parent
@@ -16,8 +29,9 @@ class Node:
         self.wins = 0                # Récompense cumulée
 
     def is_fully_expanded(self):
-        # Un nœud est entièrement développé lorsque tous les coups légaux ont été explorés.
-        return len(self.children) == len(list(self.board.legal_moves))
+        # Un nœud est entièrement développé lorsque tous les coups légaux ont été explorés
+        # (liste générée une seule fois par nœud, voir Chess/final/nodecache.py).
+        return len(self.children) == len(self.legal_move_list())
 
     def best_child(self, exploration_weight=math.sqrt(2)):
         best = None
@@ -33,15 +47,26 @@ class Node:
 
 
 class MCTS:
-    def __init__(self, simulations=1000):
+    def __init__(self, simulations=1000, tree_store=None):
+        """
+        :param tree_store: TreeStore (Chess/final/treestore.py) dont les statistiques servent
+                           de point de départ aux nœuds créés dans une position connue
+        """
         self.simulations = simulations
+        self.tree_store = tree_store
+
+    def new_root(self, board):
+        root = Node(board)
+        if self.tree_store is not None:
+            self.tree_store.seed(root, root.board)
+        return root
 
     def selection(self, node):
         """
         Descend dans l'arbre à partir de 'node' tant que ce nœud n'est pas terminal
         et est entièrement développé.
         """
-        while not node.board.is_game_over() and node.is_fully_expanded():
+        while not node.is_terminal() and node.is_fully_expanded():
             node = node.best_child()
         return node
 
@@ -49,17 +74,17 @@ class MCTS:
         """
         Ajoute un enfant représentant un coup non encore exploré tant que le nœud n'est pas terminal.
         """
-        if node.board.is_game_over():
+        if node.is_terminal():
+            return None
+        # File des coups non explorés, mélangée une fois pour introduire de la diversité
+        move = node.pop_untried_move()
+        if move is None:
             return None
-        legal_moves = list(node.board.legal_moves)
-        random.shuffle(legal_moves)  # Pour introduire de la diversité
-        for move in legal_moves:
-            if not any(child.move == move for child in node.children):
-                child = Node(node.board, parent=node, move=move)
-                child.board.push(move)
-                node.children.append(child)
-                return child
-        return None
+        child = Node(node.board, parent=node, move=move)
+        child.board.push(move)
+        if self.tree_store is not None:
+            self.tree_store.seed(child, child.board)
+        return node.add_child(child)
 
     def simulation(self, node):
         """
@@ -115,7 +140,10 @@ class MCTS:
 
 def main():
     board = chess.Board()
-    mcts = MCTS(simulations=1000)
+    tree_store = TreeStore(TREE_STORE_PATH) if TREE_STORE_PATH else None
+    if tree_store is not None:
+        print("Statistiques d'ouverture :", format_store_report(tree_store.report()))
+    mcts = MCTS(simulations=1000, tree_store=tree_store)
 
     # Choix de la couleur par l'utilisateur
     user_color = None
@@ -124,7 +152,7 @@ def main():
     player_color = chess.WHITE if user_color == "W" else chess.BLACK
 
     # La racine de l'arbre MCTS est basée sur l'état du plateau courant.
-    root = Node(board)
+    root = mcts.new_root(board)
 
     print("\nEntrez votre coup en notation UCI (ex: e2e4).")
     print(board, "\n")
@@ -143,28 +171,28 @@ def main():
                     print("Format invalide, réessayez.")
             board.push(move)
 
-            # Mise à jour de l'arbre MCTS
-            found = False
-            for child in root.children:
-                if child.move == move:
-                    root = child
-                    found = True
-                    break
-            if not found:
-                root = Node(board.copy())
+            # Mise à jour de l'arbre MCTS (index coup -> enfant de la racine)
+            child = root.child_for(move)
+            root = child if child is not None else mcts.new_root(board)
         else:
             # Tour de l'IA
             print("Tour de l'IA...")
             ai_move, ai_child = mcts.best_move(root)
+            if tree_store is not None and board.ply() < STORE_PLIES:
+                tree_store.record(root, board, depth=STORE_DEPTH)
             print(f"L'IA joue : {ai_move}")
             board.push(ai_move)
             if ai_child is not None:
                 root = ai_child
             else:
-                root = Node(board.copy())
+                root = mcts.new_root(board)
 
         print("\n" + str(board) + "\n")
 
+    if tree_store is not None:
+        tree_store.flush()
+        print("Statistiques d'ouverture enregistrées :", format_store_report(tree_store.report()))
+
     outcome = board.outcome()
     print("🎉 Partie terminée !")
     if outcome.winner is None:
@@ -0,0 +1,307 @@
+import argparse
+import contextlib
+import importlib
+import io
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+import chess
+import chess.pgn
+
+# Les variantes s'importent comme des modules du paquet Chess (src/ dans le chemin),
+# et les modules partagés de Chess/final à plat, comme dans ce dossier
+CHESS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(CHESS_DIR))
+sys.path.append(os.path.join(CHESS_DIR, "final"))
+from opponent import HeuristicOpponent
+from playout import BitboardRollout
+from rollout import Rollout
+
+
+# Joueurs : chacun reçoit (itérations, profondeur maximale des simulations, graine) et renvoie
+# une fonction plateau -> coup. Les recherches repartent d'un arbre neuf à chaque coup.
+
+def _player_final(iterations, max_depth, seed):
+    # Chess/final/mcts.py, simulations sur bitboards
+    variant = importlib.import_module("mcts")
+
+    def choose(board):
+        mcts = variant.MCTS(board, color_player=board.turn, iterations=iterations,
+                            rollout=BitboardRollout(max_depth=max_depth))
+        return mcts.best_move()
+    return choose
+
+
+def _player_stockfish(iterations, max_depth, seed):
+    variant = importlib.import_module("Chess.stockfish.main")
+
+    def choose(board):
+        mcts = variant.MCTS(variant.MaterialBoard.from_board(board), rollout=Rollout(max_depth=max_depth))
+        return mcts.get_best_move(simulations=iterations)
+    return choose
+
+
+def _player_mcts(iterations, max_depth, seed):
+    # Chess/_MCTS.py (avec Chess/_Node.py), tel qu'utilisé par Chess/main.py
+    variant = importlib.import_module("Chess._MCTS")
+    node_module = importlib.import_module("Chess._Node")
+
+    def choose(board):
+        mcts = variant.MCTS(simulations=iterations, rollout=Rollout(max_depth=max_depth))
+        return mcts.best_move(node_module.Node(board))[0]
+    return choose
+
+
+def _player_all(iterations, max_depth, seed):
+    variant = importlib.import_module("Chess.all")
+
+    def choose(board):
+        return variant.MCTSPlayer(iterations=iterations, rollout=Rollout(max_depth=max_depth)).get_move(board)
+    return choose
+
+
+def _player_test_vs_bot(iterations, max_depth, seed):
+    # Chess/test_vs_bot.py, sans statistiques d'ouverture (ses simulations vont toujours jusqu'au bout)
+    variant = importlib.import_module("Chess.test_vs_bot")
+
+    def choose(board):
+        mcts = variant.MCTS(simulations=iterations)
+        return mcts.best_move(mcts.new_root(board))[0]
+    return choose
+
+
+def _player_heuristic(iterations, max_depth, seed):
+    # get_smart_random_move de Chess/stockfish/main.py (Chess/final/opponent.py), avec la graine de la partie
+    return HeuristicOpponent(seed).choose_move
+
+
+def _player_random(iterations, max_depth, seed):
+    rng = random.Random(seed)
+    return lambda board: rng.choice(list(board.legal_moves))
+
+
+PLAYERS = {
+    "final": _player_final,
+    "stockfish": _player_stockfish,
+    "_MCTS": _player_mcts,
+    "all": _player_all,
+    "test_vs_bot": _player_test_vs_bot,
+    "heuristic": _player_heuristic,
+    "random": _player_random,
+}
+
+
+def parse_player(spec):
+    """
+    :param spec: "variante[:itérations[:profondeur]]", par exemple "final:200:80", "heuristic" ou "random"
+    :return: (variante, itérations, profondeur maximale des simulations ou None)
+    """
+    parts = spec.split(":")
+    if parts[0] not in PLAYERS:
+        raise ValueError(f"Joueur inconnu : {parts[0]} (choix : {', '.join(PLAYERS)})")
+    iterations = int(parts[1]) if len(parts) > 1 else 100
+    max_depth = int(parts[2]) if len(parts) > 2 else None
+    return parts[0], iterations, max_depth
+
+
+def play_game(white, black, seed, max_plies=300):
+    """
+    Une partie entre deux joueurs, dans un processus du pool. Les graines de random, de NumPy et
+    des joueurs sont fixées par seed : une partie se rejoue à l'identique.
+
+    :param white: spécification du joueur des blancs (voir parse_player)
+    :param max_plies: au-delà, la partie est arrêtée et comptée nulle
+    :return: résultat, coups (UCI), raison de la fin, temps de réflexion de chaque camp
+    """
+    random.seed(seed)
+    players = {}
+    for color, spec in ((chess.WHITE, white), (chess.BLACK, black)):
+        variant, iterations, max_depth = parse_player(spec)
+        players[color] = PLAYERS[variant](iterations, max_depth, seed * 2 + color)
+    seconds = {chess.WHITE: 0.0, chess.BLACK: 0.0}
+    moves = {chess.WHITE: 0, chess.BLACK: 0}
+    board = chess.Board()
+    # Les variantes affichent leur progression et leurs statistiques : on les fait taire
+    with contextlib.redirect_stdout(io.StringIO()):
+        while board.outcome() is None and board.ply() < max_plies:
+            start = time.perf_counter()
+            move = players[board.turn](board)
+            seconds[board.turn] += time.perf_counter() - start
+            moves[board.turn] += 1
+            board.push(move)
+    outcome = board.outcome()
+    return {
+        "white": white,
+        "black": black,
+        "seed": seed,
+        "result": outcome.result() if outcome is not None else "1/2-1/2",
+        "termination": outcome.termination.name.lower() if outcome is not None else "max_plies",
+        "moves": [move.uci() for move in board.move_stack],
+        "seconds": {"white": seconds[chess.WHITE], "black": seconds[chess.BLACK]},
+        "move_counts": {"white": moves[chess.WHITE], "black": moves[chess.BLACK]},
+    }
+
+
+def schedule(players, games, seed=0):
+    """
+    Parties de chaque paire de joueurs (games par paire), en alternant les couleurs.
+
+    :return: liste de (blancs, noirs, graine)
+    """
+    pairings = []
+    index = 0
+    for first, second in itertools.combinations(players, 2):
+        for game in range(games):
+            white, black = (first, second) if game % 2 == 0 else (second, first)
+            pairings.append((white, black, seed + index))
+            index += 1
+    return pairings
+
+
+def elo_ratings(games, iterations=200):
+    """
+    Estimation Elo (maximum de vraisemblance du modèle de Bradley-Terry, nulles comptées pour
+    un demi-point), centrée sur 0. Chaque joueur fait en plus une nulle fictive contre un joueur
+    de classement 0, pour que les scores parfaits gardent un classement fini.
+
+    :return: joueur -> Elo
+    """
+    players = sorted({game["white"] for game in games} | {game["black"] for game in games})
+    ratings = dict.fromkeys(players, 0.0)
+    scores = {"1-0": 1.0, "0-1": 0.0, "1/2-1/2": 0.5}
+
+    def expected(rating, opponent):
+        return 1 / (1 + 10 ** ((opponent - rating) / 400))
+
+    # Pas de Newton joueur par joueur : dérivée de l'espérance de score par point Elo
+    slope = math.log(10) / 400
+    for _ in range(iterations):
+        gradient, curvature = {}, {}
+        for player in players:
+            probability = expected(ratings[player], 0.0)
+            gradient[player] = 0.5 - probability
+            curvature[player] = probability * (1 - probability)
+        for game in games:
+            score = scores[game["result"]]
+            white, black = game["white"], game["black"]
+            probability = expected(ratings[white], ratings[black])
+            gradient[white] += score - probability
+            gradient[black] -= score - probability
+            curvature[white] += probability * (1 - probability)
+            curvature[black] += probability * (1 - probability)
+        for player in players:
+            ratings[player] += gradient[player] / (slope * curvature[player])
+        if max(abs(value) for value in gradient.values()) < 1e-9:
+            break
+    mean = sum(ratings.values()) / len(ratings)
+    return {player: rating - mean for player, rating in ratings.items()}
+
+
+def results_table(games, wall_seconds):
+    """
+    Bilan par joueur : parties, victoires, nulles, défaites, score, Elo et temps moyen par coup.
+    """
+    ratings = elo_ratings(games)
+    table = {player: {"games": 0, "wins": 0, "draws": 0, "losses": 0, "seconds": 0.0, "moves": 0}
+             for player in ratings}
+    for game in games:
+        for side, player in (("white", game["white"]), ("black", game["black"])):
+            row = table[player]
+            row["games"] += 1
+            row["seconds"] += game["seconds"][side]
+            row["moves"] += game["move_counts"][side]
+            if game["result"] == "1/2-1/2":
+                row["draws"] += 1
+            elif (game["result"] == "1-0") == (side == "white"):
+                row["wins"] += 1
+            else:
+                row["losses"] += 1
+    for player, row in table.items():
+        row["score"] = (row["wins"] + 0.5 * row["draws"]) / row["games"]
+        row["elo"] = ratings[player]
+        row["ms_per_move"] = row["seconds"] / row["moves"] * 1e3 if row["moves"] else 0.0
+    return {
+        "games": len(games),
+        "seconds": wall_seconds,
+        "games_per_sec": len(games) / wall_seconds if wall_seconds > 0 else 0.0,
+        "players": table,
+    }
+
+
+def format_table(report):
+    lines = [f"{'joueur':24s} {'parties':>7s} {'+':>4s} {'=':>4s} {'-':>4s} {'score':>6s} {'Elo':>7s} {'ms/coup':>9s}"]
+    for player, row in sorted(report["players"].items(), key=lambda item: -item[1]["elo"]):
+        lines.append(f"{player:24s} {row['games']:7d} {row['wins']:4d} {row['draws']:4d} {row['losses']:4d} "
+                     f"{row['score']:6.1%} {round(row['elo']):+7d} {row['ms_per_move']:9.1f}")
+    lines.append(f"{report['games']} parties en {report['seconds']:.1f} s ({report['games_per_sec']:.2f} parties/s)")
+    return "\n".join(lines)
+
+
+def write_pgn(games, path, event="Tournoi MCTS"):
+    with open(path, "w") as stream:
+        for round_number, game in enumerate(games, start=1):
+            board = chess.Board()
+            for uci in game["moves"]:
+                board.push_uci(uci)
+            pgn = chess.pgn.Game.from_board(board)
+            pgn.headers["Event"] = event
+            pgn.headers["Round"] = str(round_number)
+            pgn.headers["White"] = game["white"]
+            pgn.headers["Black"] = game["black"]
+            pgn.headers["Result"] = game["result"]
+            pgn.headers["Termination"] = game["termination"]
+            pgn.headers["Seed"] = str(game["seed"])
+            print(pgn, file=stream, end="\n\n")
+
+
+def run_tournament(players, games, workers=None, seed=0, max_plies=300):
+    """
+    Joue toutes les parties du tournoi sur un pool de processus.
+
+    :return: (parties dans l'ordre du calendrier, durée totale en secondes)
+    """
+    pairings = schedule(players, games, seed)
+    results = [None] * len(pairings)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as executor:
+        futures = {executor.submit(play_game, white, black, game_seed, max_plies): index
+                   for index, (white, black, game_seed) in enumerate(pairings)}
+        for future in as_completed(futures):
+            game = results[futures[future]] = future.result()
+            print(f"{game['white']} - {game['black']} : {game['result']} ({game['termination']}, "
+                  f"{len(game['moves'])} demi-coups)", flush=True)
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tournoi entre joueurs d'échecs (variantes MCTS, heuristique, hasard).")
+    parser.add_argument("players", nargs="+",
+                        help="joueurs variante[:itérations[:profondeur]], variantes : " + ", ".join(PLAYERS))
+    parser.add_argument("--games", type=int, default=2, help="parties par paire de joueurs (couleurs alternées)")
+    parser.add_argument("--workers", type=int, default=None, help="processus du pool (par défaut : un par cœur)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-plies", type=int, default=300, help="au-delà, la partie est nulle")
+    parser.add_argument("--pgn", default="tournament.pgn", help="fichier PGN des parties")
+    parser.add_argument("--output", default="tournament_results.json", help="fichier JSON du bilan")
+    args = parser.parse_args()
+    for spec in args.players:
+        parse_player(spec)
+
+    games, seconds = run_tournament(args.players, args.games, args.workers, args.seed, args.max_plies)
+    report = results_table(games, seconds)
+    print(format_table(report))
+    write_pgn(games, args.pgn)
+    with open(args.output, "w") as stream:
+        json.dump({"report": report, "games": games}, stream, indent=2)
+    print(f"Parties écrites dans {args.pgn}, bilan dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
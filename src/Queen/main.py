@@ -1,11 +1,21 @@
+import os
+import sys
+
 import gymnasium as gym
 import ale_py
-from _MCTS import MCTS
+
+# MCTS commun (modules partagés de Chess/final, importés à plat)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Chess", "final"))
+from core import MCTSCore
+from games import ALEGame
 
 environment_name = "ALE/VideoCheckers-v5"
 
 env = gym.make(environment_name, render_mode="human")
-mcts = MCTS(env)  # Passer l'environnement à MCTS
+# La recherche joue sur un second environnement : la partie réelle n'est jamais modifiée par les simulations
+env_sim = gym.make(environment_name)
+env_sim.reset()
+mcts = MCTSCore(ALEGame(env_sim), iterations=1000)
 
 episodes = 1
 for episode in range(1, episodes+1):
@@ -18,8 +28,9 @@ for episode in range(1, episodes+1):
         iteration += 1
         env.render()
 
-        # Sélection de l’action avec MCTS
-        action = mcts.best_move(state)
+        # Sélection de l’action avec MCTS, depuis l'état réel de la partie
+        mcts.sync(env.unwrapped.clone_state())
+        action = mcts.best_action()
 
         # Exécution de l'action
         state, reward, terminated, truncated, info = env.step(action)
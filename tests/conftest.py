@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Les modules de Chess/final s'importent à plat, comme dans ce dossier ; les variantes de Chess
+# comme des modules du paquet Chess (src/ dans le chemin)
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.append(SRC_DIR)
+sys.path.append(os.path.join(SRC_DIR, "Chess", "final"))
@@ -0,0 +1,26 @@
+import chess
+
+from Chess import benchmark_suite
+
+
+def test_every_variant_runs_and_reports():
+    # Une recherche courte par variante, chacune dans son processus comme une vraie exécution
+    report = benchmark_suite.run_suite(list(benchmark_suite.VARIANTS), ["mate-in-1"], iterations=20, seeds=[0])
+    assert report["meta"]["iterations"] == 20
+    assert [result["variant"] for result in report["results"]] == list(benchmark_suite.VARIANTS)
+    board = chess.Board(benchmark_suite.POSITIONS["mate-in-1"])
+    for result in report["results"]:
+        assert chess.Move.from_uci(result["move"]) in board.legal_moves, result["variant"]
+        assert result["nodes"] > 1, result["variant"]
+        assert result["rollouts"] > 0, result["variant"]
+        assert set(result["phases"]) <= set(benchmark_suite.PHASES) | {"other"}, result["variant"]
+
+
+def test_compare_matches_runs_by_variant_position_and_seed(capsys):
+    previous = {"results": [{"variant": "final", "position": "start", "seed": 0, "iterations_per_sec": 100.0}]}
+    current = {"results": [{"variant": "final", "position": "start", "seed": 0, "iterations_per_sec": 150.0},
+                           {"variant": "core", "position": "start", "seed": 0, "iterations_per_sec": 200.0}]}
+    benchmark_suite.compare(previous, current)
+    output = capsys.readouterr().out
+    assert "x1.50" in output
+    assert "core" not in output
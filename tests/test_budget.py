@@ -0,0 +1,99 @@
+import random
+import threading
+from types import SimpleNamespace
+
+import chess
+import pytest
+
+from budget import EarlyStop, SearchBudget
+from mcts import MCTS
+from playout import BitboardRollout
+
+
+def new_search(core):
+    random.seed(0)
+    return MCTS(chess.Board(), color_player=chess.WHITE, rollout=BitboardRollout(max_depth=10), core=core)
+
+
+def test_budget_needs_a_limit():
+    with pytest.raises(ValueError):
+        SearchBudget()
+
+
+@pytest.mark.parametrize("core", (True, False))
+def test_iteration_and_node_limits(core):
+    mcts = new_search(core)
+    mcts.best_move(iterations=50)
+    assert (mcts.stats["stop_reason"], mcts.stats["iterations"]) == ("iterations", 50)
+    assert mcts.stats["remaining_iterations"] == 0
+    # Une itération développe au plus un nœud
+    mcts.best_move(nodes=30, iterations=10000)
+    assert (mcts.stats["stop_reason"], mcts.stats["nodes"]) == ("nodes", 30)
+
+
+@pytest.mark.parametrize("core", (True, False))
+def test_time_limit(core):
+    mcts = new_search(core)
+    mcts.best_move(seconds=0.05)
+    assert mcts.stats["stop_reason"] == "time"
+    assert mcts.stats["seconds"] >= 0.05
+    assert mcts.stats["iterations"] > 0
+    assert mcts.stats["remaining_iterations"] is None
+
+
+@pytest.mark.parametrize("core", (True, False))
+def test_stop_event(core):
+    mcts = new_search(core)
+    stop_event = threading.Event()
+    stop_event.set()
+    # Événement déjà levé : aucune itération, un coup légal quand même
+    assert mcts.best_move(stop_event=stop_event) in chess.Board().legal_moves
+    assert (mcts.stats["stop_reason"], mcts.stats["iterations"]) == ("stopped", 0)
+
+    stop_event.clear()
+    timer = threading.Timer(0.05, stop_event.set)
+    timer.start()
+    mcts.best_move(stop_event=stop_event)
+    timer.join()
+    assert mcts.stats["stop_reason"] == "stopped"
+    assert mcts.stats["iterations"] > 0
+
+
+def fake_root(*visits):
+    children = [SimpleNamespace(move=index, visits=count) for index, count in enumerate(visits)]
+    return SimpleNamespace(children=children, visits=sum(visits))
+
+
+def test_decided_bound_is_the_remaining_budget():
+    early_stop = EarlyStop()
+    budget = SearchBudget(iterations=100).start()
+    early_stop.start(budget)
+    root = fake_root(60, 10, 5)
+    # 50 visites d'avance : rattrapable avec 60 itérations restantes, plus avec 25
+    assert early_stop.check(root, budget, 40) is None
+    assert early_stop.check(fake_root(35, 10, 5), budget, 50) is None      # 25 d'avance, 50 restantes
+    assert early_stop.check(root, budget, 75) == "decided"
+    # Avance égale au budget restant : le second pourrait encore égaler le premier
+    assert early_stop.check(fake_root(60, 35), budget, 75) is None
+    # Deux visites à la racine par itération (rollouts_per_leaf=2) : le budget restant compte double
+    assert early_stop.check(root, budget, 75, visits_per_iteration=2) is None
+    assert early_stop.report()["decided"] == 1 and early_stop.report()["saved_iterations"] == 25
+
+
+@pytest.mark.parametrize("core", (True, False))
+def test_decided_stop_never_changes_the_move(core):
+    # Mat en un coup : l'enfant du mat prend vite une avance que le budget restant ne peut combler
+    random.seed(0)
+    board = chess.Board("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+    early_stop = EarlyStop()
+    mcts = MCTS(board, color_player=chess.WHITE, rollout=BitboardRollout(max_depth=10), early_stop=early_stop,
+                core=core)
+    move = mcts.best_move(iterations=3000)
+    remaining = mcts.stats["remaining_iterations"]
+    assert mcts.stats["stop_reason"] == "decided"
+    assert remaining > 0 and mcts.stats["iterations"] + remaining == 3000
+    assert early_stop.report()["saved_iterations"] == remaining
+    # Budget complet : le coup le plus visité ne change pas
+    mcts.early_stop = None
+    mcts.best_move(iterations=remaining)
+    assert mcts.current_best_move() == move
@@ -0,0 +1,47 @@
+import random
+
+import chess
+import pytest
+
+from Chess.stockfish import main as stockfish
+
+FENS = (
+    chess.STARTING_FEN,
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "8/P1k5/8/3pP3/8/8/6p1/4K3 w - d6 0 1",     # Promotions et prise en passant
+)
+
+
+@pytest.mark.parametrize("fen", FENS)
+def test_capture_gains_match_material_diff(fen):
+    # Les gains des tables doivent être ceux que la version de référence obtient en jouant chaque coup
+    mcts = stockfish.MCTS(stockfish.MaterialBoard())
+    rng = random.Random(0)
+    for _ in range(5):
+        board = chess.Board(fen)
+        while not board.is_game_over() and board.ply() < 200:
+            moves, gains = stockfish.capture_gains(board)
+            assert sorted(moves, key=chess.Move.uci) == sorted(board.legal_moves, key=chess.Move.uci)
+            before = mcts.material_diff(board)
+            sign = 1 if board.turn == chess.WHITE else -1
+            for move, gain in zip(moves, gains):
+                board.push(move)
+                assert sign * (mcts.material_diff(board) - before) == gain, (board.fen(), move)
+                board.pop()
+            board.push(rng.choice(moves))
+
+
+def test_capture_biased_move_is_reproducible_with_random_seed():
+    # Le générateur de l'instance est tiré du module random : random.seed suffit à rejouer une simulation
+    def moves():
+        random.seed(5)
+        mcts = stockfish.MCTS(stockfish.MaterialBoard())
+        board = chess.Board()
+        played = []
+        for _ in range(40):
+            move = mcts.capture_biased_move(board)
+            played.append(move)
+            board.push(move)
+        return played
+
+    assert moves() == moves()
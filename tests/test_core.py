@@ -0,0 +1,82 @@
+import random
+
+import chess
+import pytest
+
+from core import GameAdapter, MCTSCore
+from games import ALEGame, ChessGame
+from mcts import MCTS
+from playout import BitboardRollout
+
+
+def test_chess_game_search_returns_to_root():
+    board = chess.Board("r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3")
+    random.seed(0)
+    search = MCTSCore(ChessGame(board), iterations=50)
+    move = search.best_action()
+    assert move in board.legal_moves
+    assert search.stats["iterations"] == 50
+    assert sum(child.visits for child in search.root.children) == 50
+    # L'état de travail est ramené à la racine après chaque itération
+    assert search.game.board == board
+
+
+@pytest.mark.parametrize("fen", (chess.STARTING_FEN,
+                                 "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+                                 "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1"))
+def test_core_builds_the_same_tree_as_final(fen):
+    # Mêmes enfants de la racine, mêmes visites et mêmes gains que la boucle de mcts.MCTS à graine égale
+    board = chess.Board(fen)
+    random.seed(0)
+    mcts = MCTS(board, color_player=board.turn, rollout=BitboardRollout(max_depth=20), core=False)
+    mcts.best_move(iterations=300)
+    random.seed(0)
+    core = MCTSCore(ChessGame(board, rollout=BitboardRollout(max_depth=20)))
+    core.best_action(iterations=300)
+    assert ([(child.move, child.visits, child.wins) for child in mcts.root.children]
+            == [(child.move, child.visits, child.value) for child in core.root.children])
+
+
+def test_game_adapter_requires_every_method():
+    class Partial(GameAdapter):
+        def legal_actions(self):
+            return []
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_chess_game_sync_keeps_subtree():
+    board = chess.Board()
+    random.seed(0)
+    search = MCTSCore(ChessGame(board), iterations=200)
+    move = search.best_action()
+    child = search.root.child_for(move)
+    board.push(move)
+    assert search.sync(board)
+    assert search.root is child
+
+
+def test_ale_game_search_smoke():
+    gym = pytest.importorskip("gymnasium")
+    ale_py = pytest.importorskip("ale_py")
+    if hasattr(gym, "register_envs"):
+        gym.register_envs(ale_py)
+    real = gym.make("ALE/TicTacToe3D-v5")
+    simulation = gym.make("ALE/TicTacToe3D-v5")
+    real.reset(seed=0)
+    simulation.reset(seed=0)
+    try:
+        game = ALEGame(simulation, max_rollout_steps=20, rng=random.Random(0))
+        search = MCTSCore(game, iterations=10)
+        search.sync(real.unwrapped.clone_state())
+        root_key = game.key()
+        action = search.best_action()
+        assert 0 <= action < real.action_space.n
+        assert search.stats["iterations"] == 10
+        # Les simulations ne touchent ni l'environnement réel ni l'état de la racine
+        assert game.key() == root_key
+        real.step(action)
+    finally:
+        real.close()
+        simulation.close()
@@ -0,0 +1,56 @@
+import random
+
+import chess
+import pytest
+
+from evaluation import PIECE_SQUARE_TABLES, MaterialBoard
+from utils import material_score
+
+
+def random_walk(rng, steps):
+    """Suite de push / pop au hasard : (coup joué, ou None pour un pop) à chaque pas."""
+    board = chess.Board()
+    for _ in range(steps):
+        moves = list(board.legal_moves)
+        if board.move_stack and (not moves or rng.random() < 0.3):
+            board.pop()
+            yield None
+        elif moves:
+            move = rng.choice(moves)
+            board.push(move)
+            yield move
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_material_board_score_matches_full_recount(seed):
+    rng = random.Random(seed)
+    board = chess.Board()
+    incremental = MaterialBoard()
+    for move in random_walk(rng, 300):
+        if move is None:
+            board.pop()
+            incremental.pop()
+        else:
+            board.push(move)
+            incremental.push(move)
+        for color in chess.COLORS:
+            # board est un chess.Board : utils.material_score recompte tout l'échiquier
+            assert incremental.material_score(color) == material_score(board, color)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_piece_square_term_matches_recomputation(seed):
+    rng = random.Random(seed)
+    incremental = MaterialBoard(piece_square_tables=PIECE_SQUARE_TABLES)
+    for move in random_walk(rng, 200):
+        if move is None:
+            incremental.pop()
+        else:
+            incremental.push(move)
+        rebuilt = MaterialBoard(incremental.fen(), piece_square_tables=PIECE_SQUARE_TABLES)
+        assert (incremental.balance, incremental.positional) == (rebuilt.balance, rebuilt.positional)
+        # Les copies gardent le bilan, y compris après pop
+        copy = incremental.copy()
+        if copy.move_stack:
+            copy.pop()
+            assert copy.positional == MaterialBoard(copy.fen(), piece_square_tables=PIECE_SQUARE_TABLES).positional
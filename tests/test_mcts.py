@@ -0,0 +1,158 @@
+import random
+
+import chess
+import pytest
+
+from arena import ArenaNode
+from main import update_mcts_root
+from mcts import MCTS, SearchConfig
+from playout import BitboardRollout
+
+MIDDLEGAME_FEN = "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4"
+
+TREE_MODES = (("objects", "copy"), ("objects", "replay"), ("arena", "copy"), ("arena", "replay"))
+
+
+def tree_signature(root, depth=2):
+    """Coups, visites et gains des depth premiers niveaux, dans l'ordre de création des enfants."""
+    if depth == 0:
+        return []
+    return [(child.move, child.visits, round(child.wins, 9), tree_signature(child, depth - 1))
+            for child in root.children]
+
+
+def search(tree, board_mode, iterations=300, **options):
+    random.seed(0)
+    mcts = MCTS(chess.Board(MIDDLEGAME_FEN), color_player=chess.WHITE, iterations=iterations, tree=tree,
+                board_mode=board_mode, rollout=BitboardRollout(max_depth=10), **options)
+    move = mcts.best_move()
+    return move, mcts
+
+
+@pytest.mark.parametrize("use_heuristic", (False, True))
+@pytest.mark.parametrize("tree, board_mode", TREE_MODES[1:])
+def test_tree_modes_build_the_same_tree(tree, board_mode, use_heuristic):
+    # Plateau copié par nœud ou rejoué le long du chemin, objets ou arène : même arbre à graine égale
+    reference_move, reference = search("objects", "copy", use_heuristic=use_heuristic)
+    move, mcts = search(tree, board_mode, use_heuristic=use_heuristic)
+    assert move == reference_move
+    assert tree_signature(mcts.root) == tree_signature(reference.root)
+
+
+@pytest.mark.parametrize("tree, core", (("objects", False), ("arena", False), ("objects", True)))
+def test_replay_board_returns_to_root(tree, core):
+    _, mcts = search(tree, "replay", core=core)
+    # Chaque itération dépile les coups joués sur le plateau de travail
+    board = mcts.core.game.board if core else mcts.board
+    assert board.fen() == MIDDLEGAME_FEN
+
+
+def test_default_search_runs_on_the_core_and_keeps_the_subtree():
+    board = chess.Board(MIDDLEGAME_FEN)
+    move, mcts = search("objects", "copy")
+    assert mcts.core is not None
+    assert mcts.stats["iterations"] == 300
+    assert mcts.stats["avg_rollout_length"] > 0
+    child = mcts.root.child_for(move)
+    board.push(move)
+    assert update_mcts_root(mcts, move, board) is mcts
+    assert mcts.root is child and child.parent is None
+    assert mcts.core.game.board == board
+    # Options propres aux nœuds de node.py : boucle de MCTS
+    assert search("objects", "copy", iterations=10, solver=True)[1].core is None
+    assert search("objects", "copy", iterations=10, core=False)[1].core is None
+
+
+def test_arena_reroot_keeps_only_the_played_subtree():
+    trees = {}
+    for tree in ("objects", "arena"):
+        random.seed(0)
+        board = chess.Board(MIDDLEGAME_FEN)
+        mcts = MCTS(board, color_player=chess.WHITE, iterations=200, tree=tree, use_heuristic=True,
+                    rollout=BitboardRollout(max_depth=10))
+        signatures = []
+        for _ in range(3):
+            move = mcts.best_move()
+            board.push(move)
+            mcts = update_mcts_root(mcts, move, board)
+            signatures.append(tree_signature(mcts.root))
+            if tree == "arena":
+                arena = mcts.root.arena
+                # Les branches abandonnées et les plateaux des anciennes racines sont libérés
+                assert mcts.root.index == 0
+                assert arena.size == 1 + sum(1 for _ in _descendants(mcts.root))
+                assert list(arena.root_boards) == [0]
+                assert arena.root_boards[0].fen() == board.fen()
+        trees[tree] = signatures
+    assert trees["arena"] == trees["objects"]
+
+
+def _descendants(node):
+    for child in node.children:
+        yield child
+        yield from _descendants(child)
+
+
+def test_arena_child_index_matches_sibling_links():
+    _, mcts = search("arena", "copy")
+    arena = mcts.root.arena
+    checked = 0
+    for index in range(arena.size):
+        node = ArenaNode(arena, index)
+        for child in arena.children_of(index):
+            move = ArenaNode(arena, child).move
+            assert node.child_for(move).index == child
+            checked += 1
+    assert checked == arena.size - 1
+    assert mcts.root.child_for(chess.Move.from_uci("a1a8")) is None
+
+
+@pytest.mark.parametrize("options", ({"tree": "arena", "rave": True},
+                                     {"rave": True, "batch_size": 4},
+                                     {"rave": True, "use_heuristic": True},
+                                     {"tree": "objects", "selection_formula": "puct"},
+                                     {"board_mode": "swap"}))
+def test_search_config_rejects_incompatible_options(options):
+    with pytest.raises(ValueError):
+        SearchConfig(**options)
+
+
+def test_config_and_keyword_options_build_the_same_tree():
+    _, keywords = search("objects", "replay", iterations=100)
+    random.seed(0)
+    config = SearchConfig(board_mode="replay", rollout=BitboardRollout(max_depth=10))
+    mcts = MCTS(chess.Board(MIDDLEGAME_FEN), color_player=chess.WHITE, iterations=100, config=config)
+    mcts.best_move()
+    assert tree_signature(mcts.root) == tree_signature(keywords.root)
+    with pytest.raises(TypeError):
+        MCTS(chess.Board(), config=config, batch_size=2)
+
+
+@pytest.mark.parametrize("tree", ("objects", "arena"))
+def test_virtual_loss_is_undone_after_each_batch(tree):
+    _, mcts = search(tree, "copy", iterations=200, batch_size=8, rollouts_per_leaf=2)
+    assert mcts.stats["rollouts"] == 400
+    # Il ne reste que les visites des simulations : 2 par feuille sélectionnée, aucune perte virtuelle
+    assert mcts.root.visits == sum(child.visits for child in mcts.root.children) == 400
+    for node in _descendants(mcts.root):
+        if not node.is_terminal_node():
+            assert node.visits == 2 + sum(child.visits for child in node.children)
+
+
+def _amaf_signature(node, depth=2):
+    amaf = getattr(node, "amaf", None) or {}
+    own = sorted((code, tuple(round(value, 9) for value in stats)) for code, stats in amaf.items())
+    if depth == 0:
+        return own
+    return [own, [_amaf_signature(child, depth - 1) for child in node.children]]
+
+
+def test_rave_copy_and_replay_build_the_same_tree():
+    copy_move, copy = search("objects", "copy", rave=True)
+    replay_move, replay = search("objects", "replay", rave=True)
+    assert copy.core is None and replay.core is None
+    assert replay_move == copy_move
+    assert tree_signature(replay.root) == tree_signature(copy.root)
+    # Mêmes statistiques AMAF : mêmes coups de simulation vus dans les deux modes
+    assert _amaf_signature(replay.root) == _amaf_signature(copy.root)
+    assert copy.root.amaf
@@ -0,0 +1,33 @@
+import random
+
+import chess
+import pytest
+
+from memory import TreeBudget, subtree_size
+from stubs import StatsOnlyMCTS
+
+
+@pytest.mark.parametrize("policy", ("visits", "recent"))
+def test_tree_budget_counts_and_bounds_nodes(policy):
+    random.seed(0)
+    budget = TreeBudget(2000, policy=policy)
+    mcts = StatsOnlyMCTS(chess.Board(), iterations=5000, tree_budget=budget)
+    mcts.best_move()
+    report = budget.report()
+    # Le compte tenu au fil des créations et des élagages est celui de l'arbre réel
+    assert report["nodes"] == subtree_size(mcts.root)
+    assert report["evicted"] > 0
+    assert report["nodes"] <= 2000 + budget.work_per_iteration
+
+
+def test_tree_budget_follows_reroot():
+    random.seed(0)
+    board = chess.Board()
+    budget = TreeBudget(2000)
+    mcts = StatsOnlyMCTS(board, iterations=3000, tree_budget=budget)
+    move = mcts.best_move()
+    child = mcts.root.child_for(move)
+    budget.rerooted(mcts.root, child)
+    child.parent = None
+    mcts.root = child
+    assert budget.report()["nodes"] == subtree_size(child)
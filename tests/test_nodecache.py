@@ -0,0 +1,76 @@
+import random
+
+import chess
+import pytest
+
+from core import MCTSCore
+from games import ChessGame
+from node import Node
+from nodecache import position_outcome
+from stubs import StatsOnlyMCTS
+
+
+@pytest.mark.parametrize("fen", (chess.STARTING_FEN,
+                                 "4k3/8/8/8/8/8/8/4K2R w K - 0 1",
+                                 "7k/8/8/8/8/8/8/K7 w - - 140 1"))       # Règle des 75 coups
+def test_position_outcome_matches_board_outcome(fen):
+    # Issue calculée sans génération de coups supplémentaire, comparée à board.outcome()
+    rng = random.Random(0)
+    for _ in range(10):
+        board = chess.Board(fen)
+        while True:
+            moves = list(board.legal_moves)
+            assert position_outcome(board, bool(moves)) == board.outcome(), board.fen()
+            if not moves or board.outcome() is not None:
+                break
+            board.push(rng.choice(moves))
+
+
+def _descendants(node):
+    for child in node.children:
+        yield child
+        yield from _descendants(child)
+
+
+@pytest.mark.parametrize("board_mode", ("copy", "replay"))
+def test_child_index_matches_children(board_mode):
+    random.seed(0)
+    mcts = StatsOnlyMCTS(chess.Board(), iterations=500, board_mode=board_mode, core=False)
+    mcts.best_move()
+    checked = 0
+    for node in [mcts.root, *_descendants(mcts.root)]:
+        for child in node.children:
+            assert node.child_for(child.move) is child
+            checked += 1
+    assert checked == sum(1 for _ in _descendants(mcts.root))
+    assert mcts.root.child_for(chess.Move.from_uci("a1a8")) is None
+    # Enfant élagué (memory.TreeBudget) : il sort de l'index
+    child = mcts.root.children[0]
+    mcts.root.forget_child(child)
+    assert mcts.root.child_for(child.move) is None
+
+
+def test_core_node_child_index():
+    random.seed(0)
+    search = MCTSCore(ChessGame(chess.Board()), iterations=200)
+    search.best_action()
+    for child in search.root.children:
+        assert search.root.child_for(child.move) is child
+    assert not hasattr(search.root, "__dict__")
+
+
+def test_pop_untried_move_returns_each_unexplored_move_once():
+    random.seed(0)
+    board = chess.Board()
+    node = Node(board)
+    explored = node.expand()
+    moves = []
+    while True:
+        move = node.pop_untried_move()
+        if move is None:
+            break
+        moves.append(move)
+    # Chaque coup légal non développé, une seule fois, dans un ordre mélangé
+    assert sorted(moves, key=chess.Move.uci) == sorted(set(board.legal_moves) - {explored.move}, key=chess.Move.uci)
+    assert moves != sorted(moves, key=chess.Move.uci)
+    assert node.pop_untried_move() is None
@@ -0,0 +1,36 @@
+import chess
+import pytest
+
+from opponent import HeuristicOpponent
+
+# Notes attendues de HeuristicOpponent.score : (FEN, coup, note)
+OPPONENT_SCORES = (
+    ("4k3/8/8/3p4/4P3/8/8/4K3 w - - 0 1", "e4d5", 1.0),                   # Prise d'un pion non défendu
+    ("4k3/2p5/3p4/8/8/8/8/3QK3 w - - 0 1", "d1d6", 1.0 - 0.8 * 9),       # La dame prend un pion défendu
+    ("4k3/2p5/3p4/8/8/8/3R4/3QK3 w - - 0 1", "d2d6", 1.0 - 0.8 * 4),     # Tour soutenue par la dame : c7xd6, Qxd6
+    ("4k3/8/8/8/8/8/8/3RK3 w - - 0 1", "d1d8", 0.5 - 0.8 * 5),           # Échec, mais la tour est prise par le roi
+    ("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1", "e5d6", 1.0),                  # Prise en passant
+)
+
+
+@pytest.mark.parametrize("fen, uci, expected", OPPONENT_SCORES)
+def test_score(fen, uci, expected):
+    score = HeuristicOpponent(0).score(chess.Board(fen), chess.Move.from_uci(uci))
+    assert score == pytest.approx(expected, abs=1e-9)
+
+
+def test_choose_move_plays_legal_games():
+    opponent = HeuristicOpponent(0)
+    board = chess.Board()
+    while not board.is_game_over() and board.ply() < 200:
+        move = opponent.choose_move(board)
+        assert move in board.legal_moves
+        board.push(move)
+
+
+def test_get_smart_random_move_uses_the_heuristic_opponent():
+    from Chess.stockfish.main import get_smart_random_move
+    board = chess.Board("4k3/8/8/3p4/4P3/8/8/4K3 w - - 0 1")
+    assert get_smart_random_move(board) in board.legal_moves
+    # Le plateau n'est pas modifié
+    assert board.fen() == "4k3/8/8/3p4/4P3/8/8/4K3 w - - 0 1"
@@ -0,0 +1,31 @@
+import chess
+
+from parallel import RootParallelMCTS, _root_search
+from playout import BitboardRollout
+
+MIDDLEGAME_FEN = "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4"
+
+
+def test_root_parallel_merge_is_the_sum_of_worker_visits():
+    board = chess.Board(MIDDLEGAME_FEN)
+    options = {"rollout": BitboardRollout(max_depth=10)}
+    with RootParallelMCTS(workers=2, iterations=60, seed=7, **options) as search:
+        move = search.best_move(board)
+        merged = search.stats["root_stats"]
+
+    # Mêmes recherches (même graine par processus) refaites dans ce processus
+    expected = {}
+    for worker in range(2):
+        task = (board, 7 + worker, 60, {"seconds": None, "nodes": None}, {**options, "color_player": board.turn})
+        root_stats, iterations, _ = _root_search(task)
+        assert iterations == 60
+        for uci, (visits, wins) in root_stats.items():
+            total_visits, total_wins = expected.get(uci, (0, 0))
+            expected[uci] = (total_visits + visits, total_wins + wins)
+
+    assert merged.keys() == expected.keys()
+    for uci, (visits, wins) in expected.items():
+        assert merged[uci][0] == visits
+        assert abs(merged[uci][1] - wins) < 1e-9
+    assert sum(visits for visits, _ in merged.values()) == search.stats["iterations"] == 120
+    assert move.uci() == max(merged, key=lambda uci: merged[uci][0])
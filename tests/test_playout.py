@@ -0,0 +1,44 @@
+import chess
+import pytest
+
+from playout import board_perft, differential_check, from_board, perft
+
+# Positions de perft et nombres de parties de référence, profondeur 1, 2, 3...
+PERFT_POSITIONS = {
+    chess.STARTING_FEN: (20, 400, 8902, 197281),
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1": (48, 2039, 97862),
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1": (14, 191, 2812, 43238),
+    "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1": (6, 264, 9467, 422333),
+    "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8": (44, 1486, 62379),
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10": (46, 2079, 89890),
+}
+
+# Finales de départ du test différentiel (répétitions, règle des 75 coups, matériel insuffisant)
+ENDGAME_FENS = (
+    "8/8/4k3/8/8/3K4/8/R7 w - - 0 1",
+    "4k3/8/8/8/8/8/8/4K2Q w - - 0 1",
+    "8/8/3k4/8/8/8/2BN4/4K3 w - - 0 1",
+    "r3k3/8/8/8/8/8/8/4K2R w Kq - 0 1",
+    "4k3/4p3/8/3P4/8/8/8/4K3 w - - 0 1",
+)
+
+
+@pytest.mark.parametrize("fen, expected", PERFT_POSITIONS.items())
+def test_perft_matches_reference(fen, expected):
+    counts = tuple(perft(from_board(chess.Board(fen)), depth) for depth in range(1, len(expected) + 1))
+    assert counts == expected
+
+
+@pytest.mark.parametrize("fen", PERFT_POSITIONS)
+def test_perft_matches_python_chess(fen):
+    for depth in (1, 2):
+        assert perft(from_board(chess.Board(fen)), depth) == board_perft(chess.Board(fen), depth)
+
+
+def test_random_games_match_python_chess():
+    assert differential_check(games=40, seed=0) > 0
+
+
+def test_endgames_match_python_chess():
+    # Parties jouées jusqu'à leur fin : répétitions, règle des 75 coups, matériel insuffisant
+    assert differential_check(games=40, seed=0, fens=ENDGAME_FENS) > 0
@@ -0,0 +1,39 @@
+import random
+import time
+
+import chess
+import pytest
+
+from main import update_mcts_root
+from mcts import MCTS
+from playout import BitboardRollout
+from ponder import Ponderer
+
+
+@pytest.mark.parametrize("core", (True, False))
+def test_pondering_warms_the_played_subtree(core):
+    random.seed(0)
+    board = chess.Board()
+    board.push_uci("e2e4")
+    # L'IA (blancs) vient de jouer : l'arbre est enraciné dans la position où l'humain réfléchit
+    mcts = MCTS(board, color_player=chess.WHITE, iterations=50, rollout=BitboardRollout(max_depth=10), core=core)
+    mcts.best_move()
+    before = mcts.root.visits
+
+    ponderer = Ponderer(mcts).start()
+    time.sleep(0.2)
+    iterations = ponderer.stop()
+    assert iterations > 0
+    assert not ponderer.thread.is_alive()
+    assert mcts.stats["stop_reason"] == "stopped"
+    assert mcts.root.visits == before + iterations
+
+    # Réponse de l'humain : la plus explorée pendant la réflexion
+    reply = max(mcts.root.children, key=lambda child: child.visits)
+    warmed = reply.visits
+    assert ponderer.pondered_visits(reply.move) > 0
+    assert sum(ponderer.pondered_visits(child.move) for child in mcts.root.children) == iterations
+    board.push(reply.move)
+    mcts = update_mcts_root(mcts, reply.move, board)
+    # Le sous-arbre réchauffé devient la racine : ses visites sont autant d'itérations gagnées
+    assert mcts.root is reply and mcts.root.visits == warmed
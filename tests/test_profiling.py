@@ -0,0 +1,45 @@
+import random
+
+import chess
+
+from mcts import MCTS
+from profiling import SearchProfiler
+
+
+class Searcher:
+    def outer(self):
+        return self.inner() + 1
+
+    def inner(self):
+        return 1
+
+
+def test_instrumented_phases_are_exclusive_and_restored():
+    searcher = Searcher()
+    profiler = SearchProfiler(chess_primitives=False).instrument(searcher, {"outer": "outer", "inner": "inner"})
+    profiler.start()
+    for _ in range(10):
+        assert searcher.outer() == 2
+    profiler.stop()
+    report = profiler.report()
+    assert report["phases"]["outer"]["calls"] == 10
+    assert report["phases"]["inner"]["calls"] == 10
+    # Temps exclusif : la somme des phases ne dépasse pas la durée de la recherche
+    assert sum(values["seconds"] for values in report["phases"].values()) <= report["seconds"]
+    # Après stop(), les méthodes d'origine sont rendues
+    assert "outer" not in vars(searcher) and "inner" not in vars(searcher)
+
+
+def test_search_profile_counts_phases_and_primitives():
+    board = chess.Board()
+    push = chess.Board.push
+    random.seed(0)
+    profiler = SearchProfiler()
+    mcts = MCTS(board, color_player=chess.WHITE, iterations=30, profiler=profiler)
+    mcts.best_move()
+    report = profiler.report()
+    assert report["phases"]["simulation"]["calls"] == 30
+    assert report["phases"]["backpropagation"]["calls"] == 30
+    assert report["primitives"]["push"]["calls"] > 0
+    # Les primitives de python-chess sont rendues après la recherche
+    assert chess.Board.push is push
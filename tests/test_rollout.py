@@ -0,0 +1,55 @@
+import random
+
+import chess
+import pytest
+
+from mcts import MCTS
+from playout import BitboardRollout
+from rollout import Rollout, squash, white_material
+
+ROLLOUTS = (Rollout, BitboardRollout)
+
+# Les blancs ont une dame de plus
+QUEEN_UP_FEN = "4k3/pppp4/8/8/8/8/PPPP4/3QK3 w - - 0 1"
+
+
+@pytest.mark.parametrize("rollout_class", ROLLOUTS)
+def test_cutoff_at_max_depth(rollout_class):
+    random.seed(0)
+    rollout = rollout_class(max_depth=6)
+    board = chess.Board()
+    value, plies = rollout.play(board)
+    assert plies == 6
+    assert (rollout.rollouts, rollout.cutoffs, rollout.adjudications) == (1, 1, 0)
+    assert 0.0 <= value <= 1.0
+
+
+@pytest.mark.parametrize("rollout_class", ROLLOUTS)
+def test_adjudication_margin(rollout_class):
+    rollout = rollout_class(adjudication_margin=800)
+    board = chess.Board(QUEEN_UP_FEN)
+    assert white_material(board) >= 800
+    # Écart déjà atteint : partie adjugée aux blancs sans jouer un coup
+    assert rollout.play(board) == (1.0, 0)
+    assert (rollout.cutoffs, rollout.adjudications) == (0, 1)
+    rollout.reset()
+    assert (rollout.rollouts, rollout.cutoffs, rollout.adjudications) == (0, 0, 0)
+
+
+def test_cutoff_uses_the_evaluator():
+    rollout = Rollout(max_depth=0)
+    board = chess.Board(QUEEN_UP_FEN)
+    assert rollout.play(board) == (squash(white_material(board)), 0)
+
+
+@pytest.mark.parametrize("core", (True, False))
+def test_search_reports_rollout_counters(core):
+    random.seed(0)
+    mcts = MCTS(chess.Board(), color_player=chess.WHITE, iterations=100, rollout=BitboardRollout(max_depth=4),
+                core=core)
+    mcts.best_move()
+    stats = mcts.stats
+    assert stats["rollouts"] == 100
+    # Aucune partie ne se termine en 4 demi-coups ici : toutes les simulations sont tronquées
+    assert stats["cutoffs"] == 100 and stats["adjudications"] == 0
+    assert 0 < stats["avg_rollout_length"] <= 4
@@ -0,0 +1,90 @@
+import random
+
+import chess
+import pytest
+
+from Chess import all as all_module
+from Chess.stockfish import main as stockfish_main
+from Chess.stockfish import node as stockfish_node
+
+MIDDLEGAME_FEN = "r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP2BPPP/R2QKB1R w KQ - 0 9"
+
+
+def random_stats(count, rng, unvisited):
+    # Peu de visites : c'est là que les variantes de UCB1 (ln(N) ou ln(N + 1), lissage) divergent
+    visits = [rng.randint(1, 8) for _ in range(count)]
+    for index in rng.sample(range(count), unvisited):
+        visits[index] = 0
+    wins = [rng.uniform(0, visits) for visits in visits]
+    return visits, wins
+
+
+def fill(root, stats):
+    for child, child_visits, child_wins in zip(root.children, *stats):
+        child.visits = child_visits
+        child.wins = child_wins
+    root.visits = sum(stats[0])
+
+
+def all_roots(board, moves):
+    roots = []
+    for node_class in (all_module.Node, all_module.VectorNode):
+        root = node_class(board)
+        for move in moves:
+            child_board = board.copy()
+            child_board.push(move)
+            root.children.append(node_class(child_board, parent=root, move=move))
+        roots.append(root)
+    return roots
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_all_vector_node_matches_scalar_best_child(seed):
+    board = chess.Board(MIDDLEGAME_FEN)
+    rng = random.Random(seed)
+    roots = all_roots(board, list(board.legal_moves))
+    stats = random_stats(len(roots[0].children), rng, unvisited=seed % 3)
+    for root in roots:
+        fill(root, stats)
+    scalar, vector = roots
+    assert vector.best_child().move == scalar.best_child().move
+
+
+def test_all_vector_node_uses_ln_parent_visits():
+    # 5 visites à la racine : ln(5) (Node.best_child) choisit le second enfant, ln(6) (UCB1 lissé
+    # de Chess/_Node.py) choisirait le premier
+    board = chess.Board()
+    roots = all_roots(board, list(board.legal_moves)[:2])
+    for root in roots:
+        fill(root, ([1, 4], [0.0, 3.68]))
+    scalar, vector = roots
+    assert scalar.best_child() is scalar.children[1]
+    assert vector.best_child() is vector.children[1]
+
+
+@pytest.mark.parametrize("module", (stockfish_main, stockfish_node))
+@pytest.mark.parametrize("seed", range(20))
+def test_stockfish_vector_node_matches_scalar_uct_select_child(module, seed):
+    board = chess.Board(MIDDLEGAME_FEN)
+    rng = random.Random(seed)
+    roots = []
+    for node_class in (module.MCTSNode, module.VectorMCTSNode):
+        root = node_class(board)
+        while not root.is_fully_expanded():
+            root.expand()
+        roots.append(root)
+    stats = random_stats(len(roots[0].children), rng, unvisited=seed % 3)
+    for root in roots:
+        fill(root, stats)
+    scalar, vector = roots
+    assert [child.move for child in vector.children] == [child.move for child in scalar.children]
+    assert vector.uct_select_child().move == scalar.uct_select_child().move
+
+
+def test_stockfish_search_with_vector_nodes():
+    random.seed(0)
+    board = chess.Board(MIDDLEGAME_FEN)
+    mcts = stockfish_main.MCTS(board, node_class=stockfish_main.VectorMCTSNode)
+    move = mcts.get_best_move(simulations=40)
+    assert move in board.legal_moves
+    assert mcts.root.visits == sum(child.visits for child in mcts.root.children)
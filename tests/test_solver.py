@@ -0,0 +1,39 @@
+import random
+
+import chess
+import pytest
+
+from mcts import MCTS
+from playout import BitboardRollout
+from solver import PROVEN_LOSS, PROVEN_WIN, UNPROVEN
+
+# Mat en un coup pour les blancs (Ta8#)
+MATE_IN_ONE_FEN = "6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1"
+MATE = chess.Move.from_uci("a1a8")
+
+
+@pytest.mark.parametrize("tree, board_mode", (("objects", "copy"), ("objects", "replay"),
+                                              ("arena", "copy"), ("arena", "replay")))
+def test_mate_in_one_proves_the_root(tree, board_mode):
+    random.seed(0)
+    mcts = MCTS(chess.Board(MATE_IN_ONE_FEN), color_player=chess.WHITE, iterations=2000, tree=tree,
+                board_mode=board_mode, solver=True, rollout=BitboardRollout(max_depth=20))
+    assert mcts.best_move() == MATE
+    # Valeur du point de vue du camp qui a joué le coup : le mat est gagné pour les blancs,
+    # la racine (les noirs viennent de jouer) est perdue pour eux
+    assert mcts.root.child_for(MATE).proven == PROVEN_WIN
+    assert mcts.root.proven == PROVEN_LOSS
+    report = mcts.stats["solver"]
+    assert report["root"] == PROVEN_WIN
+    # La recherche s'arrête dès la preuve
+    assert mcts.stats["stop_reason"] == "proven"
+    assert report["saved_iterations"] == 2000 - mcts.stats["iterations"] > 0
+
+
+def test_without_solver_nothing_is_proven():
+    random.seed(0)
+    mcts = MCTS(chess.Board(MATE_IN_ONE_FEN), color_player=chess.WHITE, iterations=200, core=False,
+                rollout=BitboardRollout(max_depth=20))
+    mcts.best_move()
+    assert mcts.root.proven == UNPROVEN
+    assert mcts.stats["iterations"] == 200
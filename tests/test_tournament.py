@@ -0,0 +1,57 @@
+import math
+
+import pytest
+
+from Chess import tournament
+
+
+def game(white, black, result):
+    return {"white": white, "black": black, "result": result, "seconds": {"white": 1.0, "black": 1.0},
+            "move_counts": {"white": 10, "black": 10}}
+
+
+def test_schedule_alternates_colours():
+    pairings = tournament.schedule(["a", "b", "c"], games=2, seed=10)
+    assert pairings == [("a", "b", 10), ("b", "a", 11), ("a", "c", 12), ("c", "a", 13),
+                        ("b", "c", 14), ("c", "b", 15)]
+
+
+def test_elo_of_a_fixed_schedule():
+    # a marque 3 points sur 4 contre b : par symétrie, a = +d et b = -d, où d annule le gradient de
+    # la vraisemblance de a (ses 4 parties, plus la nulle fictive contre un joueur classé 0)
+    games = [game("a", "b", "1-0"), game("b", "a", "0-1"), game("a", "b", "1/2-1/2"), game("b", "a", "1/2-1/2")]
+    ratings = tournament.elo_ratings(games)
+
+    def expected(difference):
+        return 1 / (1 + 10 ** (-difference / 400))
+
+    d = ratings["a"]
+    assert ratings["b"] == pytest.approx(-d)
+    assert 0.5 - expected(d) + 3 - 4 * expected(2 * d) == pytest.approx(0, abs=1e-9)
+    # Sans la nulle fictive, 3 sur 4 donnerait 400 log10(3) ≈ 191 points d'écart : elle tire vers 0
+    assert 0 < 2 * d < 400 * math.log10(3)
+
+
+def test_elo_orders_players_and_stays_finite():
+    games = [game("a", "b", "1-0"), game("b", "c", "1-0"), game("a", "c", "1-0"), game("c", "a", "0-1")]
+    ratings = tournament.elo_ratings(games)
+    assert ratings["a"] > ratings["b"] > ratings["c"]
+    assert sum(ratings.values()) == pytest.approx(0)
+    report = tournament.results_table(games, wall_seconds=2.0)
+    assert report["players"]["a"] == {"games": 3, "wins": 3, "draws": 0, "losses": 0, "seconds": 3.0, "moves": 30,
+                                      "score": 1.0, "elo": ratings["a"], "ms_per_move": 100.0}
+    assert report["games_per_sec"] == 2.0
+
+
+def test_games_replay_from_their_seed():
+    first = tournament.play_game("random", "heuristic", seed=3, max_plies=30)
+    second = tournament.play_game("random", "heuristic", seed=3, max_plies=30)
+    assert first["moves"] == second["moves"]
+    assert len(first["moves"]) <= 30
+
+
+def test_run_tournament_keeps_schedule_order():
+    games, _ = tournament.run_tournament(["random", "heuristic"], games=2, workers=1, seed=5, max_plies=20)
+    assert [(game["white"], game["black"], game["seed"]) for game in games] == tournament.schedule(
+        ["random", "heuristic"], 2, 5)
+    assert games[0]["moves"] == tournament.play_game("random", "heuristic", seed=5, max_plies=20)["moves"]
@@ -0,0 +1,69 @@
+import random
+
+import chess
+
+from mcts import MCTS
+from node import TranspositionNode
+from playout import BitboardRollout
+from stubs import StatsOnlyMCTS
+from transposition import TranspositionTable, position_key
+
+
+def board_after(*moves):
+    board = chess.Board()
+    for move in moves:
+        board.push_uci(move)
+    return board
+
+
+def test_transposed_nodes_share_their_statistics():
+    table = TranspositionTable()
+    first = board_after("g1f3", "g8f6", "b1c3")
+    second = board_after("b1c3", "g8f6", "g1f3")
+    assert position_key(first) == position_key(second)
+    node = table.attach(TranspositionNode(first), first)
+    node.visits += 3
+    node.wins += 2
+    transposed = table.attach(TranspositionNode(second), second)
+    # La seconde suite de coups hérite immédiatement des simulations de la première
+    assert transposed.entry is node.entry
+    assert (transposed.visits, transposed.wins) == (3, 2)
+    assert table.stats()["hits"] == 1 and table.stats()["rollouts_saved"] == 3
+
+
+def _nodes(root):
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(node.children)
+
+
+def test_search_shares_stats_across_transpositions():
+    random.seed(0)
+    table = TranspositionTable()
+    mcts = StatsOnlyMCTS(chess.Board(), iterations=3000, transposition_table=table)
+    mcts.best_move()
+    entries = {}
+    shared = 0
+    for node in _nodes(mcts.root):
+        key = position_key(node.board)
+        if key in entries:
+            assert node.entry is entries[key]
+            shared += 1
+        else:
+            entries[key] = node.entry
+    assert shared > 0
+    assert table.stats()["hits"] == shared
+
+
+def test_repeated_position_is_counted_once_per_iteration():
+    # Pions bloqués, rois seuls à bouger : la racine réapparaît vite dans l'arbre (aller-retour des
+    # rois), et son entrée ne doit être mise à jour qu'une fois par itération
+    random.seed(0)
+    board = chess.Board("k7/p7/P7/8/8/8/8/7K w - - 0 1")
+    mcts = MCTS(board, color_player=chess.WHITE, iterations=300, transposition_table=TranspositionTable(),
+                rollout=BitboardRollout(max_depth=10))
+    mcts.best_move()
+    assert any(node.entry is mcts.root.entry for node in _nodes(mcts.root) if node is not mcts.root)
+    assert mcts.root.visits == 300
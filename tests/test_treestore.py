@@ -0,0 +1,37 @@
+import random
+
+import chess
+
+from stubs import StatsOnlyMCTS
+from treestore import DEFAULT_MAX_VISITS, TreeStore
+
+
+def play_game(path, iterations):
+    store = TreeStore(path)
+    mcts = StatsOnlyMCTS(chess.Board(), iterations=iterations, tree_store=store)
+    seeded = mcts.root.visits
+    mcts.best_move()
+    # Enregistrée deux fois (deux coups de la même partie) : seul le dernier état compte
+    store.record(mcts.root, chess.Board())
+    store.record(mcts.root, chess.Board())
+    store.flush()
+    store.close()
+    return seeded
+
+
+def test_each_game_adds_only_its_own_visits(tmp_path):
+    path = str(tmp_path / "opening.mcts")
+    random.seed(0)
+    assert play_game(path, 300) == 0
+    # Les visites héritées sont plafonnées, et ne sont pas réenregistrées
+    assert play_game(path, 300) == DEFAULT_MAX_VISITS
+    assert play_game(path, 300) == DEFAULT_MAX_VISITS
+    store = TreeStore(path)
+    assert store.lookup(chess.Board())[0] == 900
+    store.close()
+
+
+def test_missing_file_is_empty(tmp_path):
+    store = TreeStore(str(tmp_path / "absent.mcts"))
+    assert store.lookup(chess.Board()) is None
+    assert not store.seed(StatsOnlyMCTS(chess.Board(), iterations=1).root, chess.Board())
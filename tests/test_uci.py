@@ -0,0 +1,33 @@
+import os
+import sys
+
+import chess
+import chess.engine
+
+FINAL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "Chess", "final")
+
+# Mat en un coup (Ta8#)
+MATE_IN_ONE_FEN = "6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1"
+
+
+def test_uci_engine_plays_through_python_chess():
+    engine = chess.engine.SimpleEngine.popen_uci([sys.executable, "uci.py"], cwd=FINAL_DIR)
+    try:
+        assert engine.id["name"] == "MCTS Chess/final"
+        engine.configure({"Iterations": 50})
+        board = chess.Board()
+        for _ in range(4):
+            result = engine.play(board, chess.engine.Limit(nodes=100), info=chess.engine.INFO_ALL)
+            assert result.move in board.legal_moves
+            board.push(result.move)
+        # Sans limite : l'option Iterations
+        assert engine.play(board, chess.engine.Limit()).move in board.legal_moves
+
+        # Le solveur prouve le mat : bestmove et pv commencent par lui, même s'il n'est pas le plus visité
+        mate = chess.Board(MATE_IN_ONE_FEN)
+        info = engine.analyse(mate, chess.engine.Limit(time=2))
+        assert info["pv"][0] == chess.Move.from_uci("a1a8")
+        assert info["nodes"] > 0
+        assert engine.play(mate, chess.engine.Limit(time=2)).move == chess.Move.from_uci("a1a8")
+    finally:
+        engine.quit()